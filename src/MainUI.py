@@ -1,20 +1,149 @@
 import sys
+import os
+import tempfile
+import time
+from functools import partial
 from PySide2.QtWidgets import (QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QTabWidget, QHBoxLayout, QWidget, QSplitter,
                                QVBoxLayout, QGroupBox, QSlider, QFormLayout, QSizePolicy)
-from PySide2.QtCore import Qt,Signal,QEvent
+from PySide2.QtCore import Qt,Signal,QEvent,QTimer
 
 
 
 
 
+def remove_snapshot(path):
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+
+
+class LazyTab:
+    # A tab's page factory and state; page is None until built or after being unloaded.
+    # restore_factory(snapshot) builds a page straight from a snapshot; discard(snapshot)
+    # frees one that is never restored (temporary files, say).
+    def __init__(self, factory, restore_factory=None, discard=None):
+        self.factory = factory
+        self.restore_factory = restore_factory
+        self.discard = discard
+        self.page = None
+        self.snapshot = None
+        self.last_used = 0.0
+
+    def discard_snapshot(self):
+        if self.snapshot is not None and self.discard is not None:
+            self.discard(self.snapshot)
+        self.snapshot = None
+
+
+def discard_snapshots(lazy_tabs):
+    for tab in lazy_tabs.values():
+        tab.discard_snapshot()
+
+
 class CustomTabWidget(QTabWidget):
     tabClicked = Signal(int)
     tabHovered = Signal(int)
+    tabMaterialized = Signal(int)
+    tabUnloaded = Signal(int)
 
-    def __init__(self, parent=None):
+    # Pages added with add_lazy_tab are built on first activation. Inactive pages are
+    # unloaded after `idle_timeout_ms`, or least recently used first while the loaded pages
+    # exceed `memory_budget` bytes. A page may implement snapshot() -> state, restore(state)
+    # and memory_estimate() -> bytes; unloading keeps only the snapshot. Snapshots still
+    # held when a tab is removed or the widget is destroyed are discarded.
+    def __init__(self, parent=None, idle_timeout_ms=120000, memory_budget=None):
         super().__init__(parent)
         self.tabBar().setMouseTracking(True)
         self.tabBar().installEventFilter(self)
+        self.idle_timeout = idle_timeout_ms / 1000.0
+        self.memory_budget = memory_budget
+        self.lazy_tabs = {}  # placeholder widget -> LazyTab
+        self.currentChanged.connect(self.materialize)
+        self.tabClicked.connect(self.materialize)
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setInterval(max(1000, int(idle_timeout_ms / 4)))
+        self._idle_timer.timeout.connect(self.unload_idle)
+        self._idle_timer.start()
+        # destroyed fires after the Python side is gone, so the handler only gets the tabs
+        self.destroyed.connect(partial(discard_snapshots, self.lazy_tabs))
+
+    def add_lazy_tab(self, factory, label, restore_factory=None, discard=None):
+        placeholder = QWidget()
+        layout = QVBoxLayout(placeholder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.lazy_tabs[placeholder] = LazyTab(factory, restore_factory, discard)
+        index = self.addTab(placeholder, label)
+        if index == self.currentIndex():
+            self.materialize(index)
+        return index
+
+    def removeTab(self, index):
+        tab = self.lazy_tabs.pop(self.widget(index), None)
+        if tab is not None:
+            tab.discard_snapshot()
+        super().removeTab(index)
+
+    def lazy_tab(self, index):
+        return self.lazy_tabs.get(self.widget(index))
+
+    def is_loaded(self, index):
+        tab = self.lazy_tab(index)
+        return tab is None or tab.page is not None
+
+    def page(self, index):
+        tab = self.lazy_tab(index)
+        return self.widget(index) if tab is None else tab.page
+
+    def materialize(self, index):
+        tab = self.lazy_tab(index)
+        if tab is None:
+            return
+        tab.last_used = time.monotonic()
+        if tab.page is not None:
+            return
+        if tab.snapshot is not None and tab.restore_factory is not None:
+            tab.page = tab.restore_factory(tab.snapshot)
+        else:
+            tab.page = tab.factory()
+            if tab.snapshot is not None and hasattr(tab.page, "restore"):
+                tab.page.restore(tab.snapshot)
+        tab.snapshot = None
+        self.widget(index).layout().addWidget(tab.page)
+        self.tabMaterialized.emit(index)
+        self.enforce_memory_budget()
+
+    def unload(self, index):
+        tab = self.lazy_tab(index)
+        if tab is None or tab.page is None or index == self.currentIndex():
+            return False
+        page = tab.page
+        tab.snapshot = page.snapshot() if hasattr(page, "snapshot") else None
+        tab.page = None
+        page.setParent(None)
+        page.deleteLater()
+        self.tabUnloaded.emit(index)
+        return True
+
+    def loaded_memory(self):
+        return sum(tab.page.memory_estimate() for tab in self.lazy_tabs.values()
+                   if tab.page is not None and hasattr(tab.page, "memory_estimate"))
+
+    def enforce_memory_budget(self):
+        if self.memory_budget is None:
+            return
+        candidates = sorted((tab.last_used, index) for index in range(self.count())
+                            for tab in [self.lazy_tab(index)]
+                            if tab is not None and tab.page is not None and index != self.currentIndex())
+        for _, index in candidates:
+            if self.loaded_memory() <= self.memory_budget:
+                break
+            self.unload(index)
+
+    def unload_idle(self):
+        now = time.monotonic()
+        for index in range(self.count()):
+            tab = self.lazy_tab(index)
+            if tab is not None and tab.page is not None and now - tab.last_used > self.idle_timeout:
+                self.unload(index)
 
     def eventFilter(self, watched, event):
         if watched == self.tabBar():
@@ -22,7 +151,6 @@ class CustomTabWidget(QTabWidget):
                 tab_index = self.tabBar().tabAt(event.pos())
                 if tab_index != -1:
                     self.tabHovered.emit(tab_index)
-                    print(f"You are hovering over tab {tab_index + 1}")
             
             if event.type() == QEvent.MouseButtonPress:
                 mouse_event = event  # Cast QEvent to QMouseEvent
@@ -30,11 +158,74 @@ class CustomTabWidget(QTabWidget):
                     tab_index = self.tabBar().tabAt(event.pos())
                     if tab_index != -1:
                         self.tabClicked.emit(tab_index)
-                        print(f"You are Press over tab {tab_index + 1}")
             
         return super().eventFilter(watched, event)
 
 
+class SliderGroupBox(QGroupBox):
+    def __init__(self, title, count=3, parent=None):
+        super().__init__(title, parent)
+        form_layout = QFormLayout(self)
+        self.sliders = []
+        for j in range(count):
+            slider = QSlider(Qt.Horizontal)
+            form_layout.addRow(f"Slider {j + 1}:", slider)
+            self.sliders.append(slider)
+
+    def snapshot(self):
+        return [slider.value() for slider in self.sliders]
+
+    def restore(self, values):
+        for slider, value in zip(self.sliders, values):
+            slider.setValue(value)
+
+
+class PickerPage(QWidget):
+    # One character/body-part picker. Its snapshot is the scene's control model saved to a
+    # temporary .npz, which restore() puts back whole (ids, rotation, scale and groups
+    # included) and then deletes; a .upk layout would keep none of those.
+    # Build restored pages with PickerPage(snapshot=path) so the original layout is not
+    # loaded first, e.g.
+    #   tabs.add_lazy_tab(lambda: PickerPage(path), "Body",
+    #                     lambda snapshot: PickerPage(snapshot=snapshot), remove_snapshot)
+    ITEM_BYTES = 2048  # rough per-control cost of a PolygonItems with its index entry
+
+    def __init__(self, layout_path=None, parent=None, snapshot=None):
+        super().__init__(parent)
+        # polygons pulls in numpy and the loaders; only import it once a picker is shown
+        from polygons import CustomGraphicsScene, CustomGraphicsView
+        self.scene = CustomGraphicsScene(self)
+        self.scene.clear_controls()
+        self.view = CustomGraphicsView(self.scene)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.view)
+        if snapshot is not None:
+            self.restore(snapshot)
+        elif layout_path is not None:
+            self.scene.load_layout(layout_path, self.view)
+
+    def memory_estimate(self):
+        return len(self.scene.spatial_index) * self.ITEM_BYTES
+
+    def snapshot(self):
+        # Stops a load in progress; what was already streamed in is kept
+        if self.scene.loader is not None:
+            self.scene.loader.cancel(remove_loaded=False)
+        handle, path = tempfile.mkstemp(suffix=".npz", prefix="picker_")
+        os.close(handle)
+        self.scene.control_model().save(path)
+        return path
+
+    def restore(self, path):
+        from controlModel import ControlModel
+        self.scene.clear_controls()
+        try:
+            self.scene.restore_model(ControlModel.load(path))
+        finally:
+            remove_snapshot(path)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -59,16 +250,9 @@ class MainWindow(QMainWindow):
         self.tab_widget.setTabPosition(QTabWidget.East)  # Set tab position to the right side
         self.tab_widget.setMinimumWidth(35)  # Set minimum width to keep the tab border visible
         self.tab_widget.sizeHint()
-        # Create the group boxes with sliders for each tab
+        # Group boxes with sliders per tab, built when a tab is first shown
         for i in range(2):
-            group_box = QGroupBox(f"Group Box {i + 1}")
-            form_layout = QFormLayout(group_box)
-
-            for j in range(3):
-                slider = QSlider(Qt.Horizontal)
-                form_layout.addRow(f"Slider {j + 1}:", slider)
-
-            self.tab_widget.addTab(group_box, f"Tab {i + 1}")
+            self.tab_widget.add_lazy_tab(lambda i=i: SliderGroupBox(f"Group Box {i + 1}"), f"Tab {i + 1}")
 
         # Apply custom style sheet for rounded tabs
         self.tab_widget.setStyleSheet("""
@@ -3,32 +3,22 @@ from PySide2.QtWidgets import (QApplication, QGraphicsView, QGraphicsScene, QMai
                                QVBoxLayout, QLabel, QPushButton, QSpinBox, QGroupBox, QWidget, QToolBar)
 from PySide2.QtGui import QPainter, QPen, QColor
 from PySide2.QtCore import Qt
+from gridRenderer import GridRenderer
+from frameProfiler import FrameProfiler, ProfiledViewMixin
 
-class GridGraphicsView(QGraphicsView):
+class GridGraphicsView(ProfiledViewMixin, QGraphicsView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.grid_enabled = True
         self.grid_color = QColor(200, 200, 255, 125)
         self.grid_thickness = 1
+        self.grid_renderer = GridRenderer(spacing=20)
         self.pan_enabled = False
         self.last_pos = None
 
     def drawForeground(self, painter, rect):
         if self.grid_enabled:
-            grid_size = 20
-            left = int(rect.left()) - (int(rect.left()) % grid_size)
-            top = int(rect.top()) - (int(rect.top()) % grid_size)
-
-            lines = []
-            for x in range(left, int(rect.right()), grid_size):
-                lines.append((x, rect.top(), x, rect.bottom()))
-            for y in range(top, int(rect.bottom()), grid_size):
-                lines.append((rect.left(), y, rect.right(), y))
-
-            grid_pen = QPen(self.grid_color, self.grid_thickness, Qt.SolidLine)
-            painter.setPen(grid_pen)
-            for line in lines:
-                painter.drawLine(*line)
+            self.grid_renderer.draw(painter, rect, self.grid_color, self.grid_thickness)
 
         super().drawForeground(painter, rect)
 
@@ -86,6 +76,9 @@ class MainWindow(QMainWindow):
         self.zoom_out_action.triggered.connect(self.zoom_out)
         self.bg_color_action = QAction("Background Color", self)
         self.bg_color_action.triggered.connect(self.select_bg_color)
+        self.profiler_action = QAction("Frame Profiler", self)
+        self.profiler_action.setCheckable(True)
+        self.profiler_action.toggled.connect(self.toggle_profiler)
 
     def init_menu(self):
         view_menu = self.menuBar().addMenu("options")
@@ -93,6 +86,7 @@ class MainWindow(QMainWindow):
         view_menu.addAction(self.zoom_in_action)
         view_menu.addAction(self.zoom_out_action)
         view_menu.addAction(self.bg_color_action)
+        view_menu.addAction(self.profiler_action)
 
     def init_toolbox(self):
         grid_toolbox = QGroupBox("Grid Options")
@@ -127,6 +121,9 @@ class MainWindow(QMainWindow):
         self.addToolBar(Qt.RightToolBarArea, tool_bar)
 
 
+    def toggle_profiler(self, enabled):
+        self.view.set_profiler(FrameProfiler() if enabled else None)
+
     def toggle_grid(self):
         self.view.grid_enabled = not self.view.grid_enabled
         self.view.viewport().update()
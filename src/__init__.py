@@ -1,29 +1,50 @@
-
 ## https://docs.unrealengine.com/5.0/en-US/control-rig-python-scripting-in-unreal-engine/
 
-from importlib import reload as __reload
+import importlib
+import os
 import sys
-import  unreal
-unreal.log(" go to control rig packages")
-import BrowserActions
-# reload(BrowserActions)
+from .hotReload import HotReloader
+
+# Fast startup: importing the package loads neither Qt, the picker modules nor the engine.
+# Submodules and BrowserActions are imported on first attribute access, and `unreal` is
+# only imported when something actually talks to the engine.
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _module_names():
+    return {name[:-3] for name in os.listdir(_package_dir) if name.endswith(".py") and not name.startswith("__")}
+
+
+def __getattr__(name):
+    if name == "BrowserActions":
+        module = importlib.import_module("BrowserActions")
+    elif name in _module_names():
+        # The modules import each other by plain name (from spatialIndex import ...), so
+        # they are loaded the same way, from this folder on sys.path
+        if _package_dir not in sys.path:
+            sys.path.insert(0, _package_dir)
+        module = importlib.import_module(name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = module
+    return module
 
-def reload(done={},number=0):
-    for k,v in sys.modules.items():
-        if k not in done:
-            if k.startswith('control_rig'):
-                number+=1
-                unreal.log(f'<-->{number}------> reload module :{k}   --at--   {v} ')
-                __reload(v)
-                done[k]=v
-                reload(done,number)
-                break
-        else:
-            pass
+
+def log(message):
+    import unreal
+    unreal.log(message)
+
+
+# Reloads only the control_rig modules (and modules from this folder) that changed since
+# they were loaded, plus their importers, in dependency order. The reloader survives
+# reloads of this package so its file snapshot is kept.
+if "_reloader" not in globals():
+    _reloader = HotReloader(prefixes=("control_rig",), roots=(__path__[0],), log=log)
+
+def reload(force=False):
+    return _reloader.reload(force)
 
 # reload(BrowserActions)
 # def package_contents(control_rig):
 #   package = __import__('control_rig')
 #   return [module_name for module_name in dir(package) if not module_name.startswith("__")]
-
-
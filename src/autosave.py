@@ -0,0 +1,269 @@
+import io
+import os
+import queue
+import struct
+import time
+import zlib
+import numpy as np
+from PySide2.QtCore import QObject, QThread, QTimer, Signal
+from controlModel import ControlModel
+
+# Write-ahead log next to the main layout (<path>.wal), append-only:
+#   record   RECORD header (magic, kind, payload length, crc32 of payload), then the payload
+#   payload  an .npz of the record's arrays
+# UPSERT carries whole rows (and the shapes/groups registered since the last record), so
+# replaying it is idempotent; REMOVE carries ids. A torn or corrupt tail stops the replay.
+# The main file is a ControlModel.save snapshot (.npz); compaction rewrites it and empties
+# the log. It is not a .upk layout, which keeps neither rotation, scale nor groups.
+RECORD = struct.Struct("<4sBxxxII")
+RECORD_MAGIC = b"UPKW"
+UPSERT = 1
+REMOVE = 2
+
+
+def log_path(path):
+    return path + ".wal"
+
+
+def sync_file(path):
+    with open(path, "r+b") as file:
+        os.fsync(file.fileno())
+
+
+def sync_directory(path):
+    # Makes a rename in the directory durable; not possible (nor needed) on Windows
+    if os.name == "posix":
+        descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def encode_record(kind, arrays):
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    payload = buffer.getvalue()
+    return RECORD.pack(RECORD_MAGIC, kind, len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(path):
+    # Yields (kind, arrays) up to the first incomplete or damaged record
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return
+    position = 0
+    while position + RECORD.size <= len(data):
+        magic, kind, length, crc = RECORD.unpack_from(data, position)
+        payload = data[position + RECORD.size:position + RECORD.size + length]
+        if magic != RECORD_MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+            return
+        position += RECORD.size + length
+        with np.load(io.BytesIO(payload)) as arrays:
+            yield kind, {name: arrays[name] for name in arrays.files}
+
+
+def replay_log(model, path):
+    # Applies the log on top of `model` (the main file's contents); returns the record count.
+    # Shape and group ids in the log are the writer's, so they are mapped to `model`'s.
+    shape_map = list(range(len(model.shapes)))
+    group_map = list(range(len(model.groups)))
+    count = 0
+    for kind, arrays in read_records(path):
+        count += 1
+        if kind == REMOVE:
+            ids = arrays["ids"][np.fromiter((control_id in model for control_id in arrays["ids"].tolist()),
+                                            dtype=bool, count=len(arrays["ids"]))]
+            if len(ids):
+                model.remove_controls(ids)
+            continue
+        start = 0
+        for index, vertex_count in enumerate(arrays["vertex_counts"].tolist()):
+            shape_id = model.register_shape(arrays["vertices"][start:start + vertex_count])
+            start += vertex_count
+            global_id = int(arrays["shape_start"]) + index
+            shape_map.extend([None] * (global_id + 1 - len(shape_map)))
+            shape_map[global_id] = shape_id
+        for index, name in enumerate(arrays["groups"].tolist()):
+            global_id = int(arrays["group_start"]) + index
+            group_map.extend([None] * (global_id + 1 - len(group_map)))
+            group_map[global_id] = model.group_id(name)
+        ids = arrays["ids"]
+        shapes = np.array([shape_map[shape_id] for shape_id in arrays["shape"].tolist()], dtype=np.int32)
+        groups = np.array([group_map[group] if group >= 0 else -1 for group in arrays["group"].tolist()],
+                          dtype=np.int32)
+        names = arrays["names"].tolist()
+        known = np.fromiter((control_id in model for control_id in ids.tolist()), dtype=bool, count=len(ids))
+        new = ~known
+        if known.any():
+            model.update_controls(ids[known], arrays["pos"][known], arrays["color"][known], shapes[known],
+                                  arrays["flags"][known], groups[known], arrays["rotation"][known],
+                                  arrays["scale"][known], [name for name, old in zip(names, known) if old])
+        if new.any():
+            model.add_controls(shapes[new], arrays["pos"][new], arrays["color"][new], arrays["flags"][new],
+                               [name for name, added in zip(names, new) if added], groups[new],
+                               arrays["rotation"][new], arrays["scale"][new], ids[new])
+    return count
+
+
+def recover(path):
+    # The layout as it was at the last logged change: main file plus log, or None when
+    # there is nothing to recover (no log, or an empty one after a clean shutdown)
+    if not any(True for _ in read_records(log_path(path))):
+        return None
+    model = ControlModel.load(path) if os.path.exists(path) else ControlModel()
+    replay_log(model, log_path(path))
+    return model
+
+
+class AutosaveWriter(QThread):
+    # Owns the files: serializes, appends and fsyncs records, and writes compacted
+    # snapshots, so the GUI thread only ever copies arrays into the queue
+    compacted = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.log_bytes = os.path.getsize(log_path(path)) if os.path.exists(log_path(path)) else 0
+        self.queue = queue.Queue()
+
+    def run(self):
+        while True:
+            task = self.queue.get()
+            if task is None:
+                return
+            try:
+                if task[0] == "append":
+                    self.append(task[1])
+                else:
+                    self.compact(task[1])
+            except (OSError, ValueError) as error:
+                self.failed.emit(f"{self.path}: {error}")
+
+    def append(self, records):
+        data = b"".join(encode_record(kind, arrays) for kind, arrays in records)
+        with open(log_path(self.path), "ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        self.log_bytes += len(data)
+
+    def compact(self, snapshot):
+        # The snapshot holds every record queued before it, so the log can start over. The
+        # snapshot is on disk before the log is emptied; a crash in between only leaves
+        # records that replay idempotently.
+        temporary = self.path + ".tmp"
+        snapshot.save(temporary)
+        sync_file(temporary)
+        os.replace(temporary, self.path)
+        sync_directory(self.path)
+        with open(log_path(self.path), "wb") as file:
+            os.fsync(file.fileno())
+        self.log_bytes = 0
+        self.compacted.emit(self.path)
+
+
+class AutosaveService(QObject):
+    # Logs every change of a ControlModel. Changes are collected as ids per frame-sized
+    # interval; each tick copies the touched rows and hands them to the writer thread.
+    # The log is compacted into the main file once it grows past compact_bytes or has not
+    # been compacted for compact_ms. `flush` is called first on every tick, so changes still
+    # staged outside the model (e.g. CustomGraphicsScene.control_model) are included.
+    def __init__(self, model, path, flush=None, interval_ms=1000, compact_bytes=8 * 1024 * 1024,
+                 compact_ms=5 * 60 * 1000, parent=None):
+        super().__init__(parent)
+        if os.path.splitext(path)[1].lower() != ".npz":
+            raise ValueError(f"autosave writes ControlModel snapshots and needs a .npz path, not {path}")
+        self.model = model
+        self.path = path
+        self.flush = flush
+        self.compact_bytes = compact_bytes
+        self.compact_ms = compact_ms
+        self.records = 0
+        self._dirty = {}  # control id -> True (upsert) / False (remove), last change wins
+        self._shapes_logged = len(model.shapes)
+        self._groups_logged = len(model.groups)
+        self._last_compact = time.monotonic()
+        self.writer = AutosaveWriter(path)
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        # Compacts right away so the main file matches the model the log is relative to
+        self.model.listeners.append(self.model_changed)
+        self.writer.start()
+        self.compact()
+        self.timer.start()
+
+    def close(self):
+        # Final compaction: after a clean shutdown there is no log left to recover
+        if not self.writer.isRunning():
+            return
+        self.timer.stop()
+        self.tick()
+        self.compact()
+        self.model.listeners.remove(self.model_changed)
+        self.writer.queue.put(None)
+        self.writer.wait()
+
+    def model_changed(self, event, ids):
+        if event == "selected":
+            return
+        upsert = event != "removed"
+        dirty = self._dirty
+        for control_id in ids.tolist():
+            dirty[control_id] = upsert
+
+    def tick(self):
+        if self.flush is not None:
+            self.flush()
+        records = self.take_records()
+        if records:
+            self.records += len(records)
+            self.writer.queue.put(("append", records))
+        if self.writer.log_bytes > self.compact_bytes or (
+                self.records and (time.monotonic() - self._last_compact) * 1000.0 > self.compact_ms):
+            self.compact()
+
+    def take_records(self):
+        if not self._dirty:
+            return []
+        model = self.model
+        dirty, self._dirty = self._dirty, {}
+        records = []
+        removed = [control_id for control_id, upsert in dirty.items() if not upsert]
+        if removed:
+            records.append((REMOVE, {"ids": np.array(removed, dtype=np.int64)}))
+        ids = [control_id for control_id, upsert in dirty.items() if upsert and control_id in model]
+        if ids:
+            rows = model.rows(ids)
+            shapes = model.shapes[self._shapes_logged:]
+            records.append((UPSERT, {
+                "ids": model.ids[rows], "shape": model.shape[rows], "pos": model.pos[rows],
+                "rotation": model.rotation[rows], "scale": model.scale[rows], "color": model.color[rows],
+                "flags": model.flags[rows], "group": model.group[rows],
+                "names": np.array(model.names[rows].tolist(), dtype=str),
+                "shape_start": np.int64(self._shapes_logged),
+                "vertex_counts": np.array([len(points) for points in shapes], dtype=np.int64),
+                "vertices": np.concatenate(shapes) if shapes else np.zeros((0, 2), dtype=np.float32),
+                "group_start": np.int64(self._groups_logged),
+                "groups": np.array(model.groups[self._groups_logged:], dtype=str),
+            }))
+            self._shapes_logged = len(model.shapes)
+            self._groups_logged = len(model.groups)
+        return records
+
+    def compact(self):
+        # Everything pending goes into the snapshot instead of the log
+        if self.flush is not None:
+            self.flush()
+        self._dirty = {}
+        self._shapes_logged = len(self.model.shapes)
+        self._groups_logged = len(self.model.groups)
+        self.records = 0
+        self._last_compact = time.monotonic()
+        self.writer.queue.put(("compact", self.model.copy()))
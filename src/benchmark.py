@@ -0,0 +1,372 @@
+import sys
+import os
+import inspect
+import json
+import math
+import tempfile
+import random
+import re
+import subprocess
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide2.QtWidgets import QApplication
+from PySide2.QtCore import Qt, QEvent, QPoint, QPointF, QRect, QRectF
+from PySide2.QtGui import QImage, QMouseEvent, QPainter, QTransform, QWheelEvent
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def populate_scene(scene, count, seed=0):
+    # Spread count stars over a square sized so density stays constant as count grows
+    random.seed(seed)
+    side = 120 * math.sqrt(count)
+    scene.setSceneRect(QRectF(0, 0, side, side))
+    for _ in range(count):
+        scene.add_star_polygon_item(random.uniform(0, side), random.uniform(0, side))
+    return side
+
+
+def bench_spatial_index(counts=(1000, 5000, 10000), queries=100):
+    from polygons import CustomGraphicsScene
+
+    results = []
+    for count in counts:
+        scene = CustomGraphicsScene()
+        side = populate_scene(scene, count)
+        random.seed(1)
+        rects = [QRectF(random.uniform(0, side), random.uniform(0, side), 600, 400) for _ in range(queries)]
+        points = [QPointF(random.uniform(0, side), random.uniform(0, side)) for _ in range(queries)]
+
+        rect_iter = iter(rects * 2)
+        point_iter = iter(points * 2)
+        qt_rect = timed(lambda: scene.items(next(rect_iter), Qt.IntersectsItemBoundingRect), queries)
+        qt_point = timed(lambda: scene.itemAt(next(point_iter), QTransform()), queries)
+        rect_iter = iter(rects * 2)
+        point_iter = iter(points * 2)
+        index_rect = timed(lambda: scene.items_in_rect(next(rect_iter)), queries)
+        index_point = timed(lambda: scene.pick_item(next(point_iter)), queries)
+
+        results.append({
+            "name": "spatial_index",
+            "items": count,
+            "qt_rect_ms": qt_rect * 1000,
+            "index_rect_ms": index_rect * 1000,
+            "qt_point_ms": qt_point * 1000,
+            "index_point_ms": index_point * 1000,
+        })
+    return results
+
+
+def bench_paint(counts=(1000, 5000), repeat=5):
+    # Paint calls per second of PolygonItems.paint against a replica of the previous paint,
+    # which copied the style option and built a pen and a closed polyline every call
+    from PySide2.QtGui import QImage, QPainter, QPen, QColor
+    from PySide2.QtWidgets import QStyleOptionGraphicsItem
+    from polygons import PolygonItems
+
+    def legacy_paint(item, painter, option):
+        # The copied option is what costs; `option` here never has State_Selected to mask
+        no_selection_option = QStyleOptionGraphicsItem(option)
+        super(PolygonItems, item).paint(painter, no_selection_option, None)
+        painter.setRenderHint(QPainter.Antialiasing)
+        pen = QPen(QColor("green"))
+        pen.setWidth(2)
+        painter.setPen(pen)
+        polyline = item.polygon()
+        polyline.append(polyline.at(0))
+        painter.drawPolyline(polyline)
+
+    results = []
+    image = QImage(512, 512, QImage.Format_ARGB32_Premultiplied)
+    option = QStyleOptionGraphicsItem()
+    for count in counts:
+        items = [PolygonItems() for _ in range(count)]
+        for item in items:
+            item.set_hovered(True)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(256, 256)
+        legacy = timed(lambda: [legacy_paint(item, painter, option) for item in items], repeat)
+        current = timed(lambda: [item.paint(painter, option) for item in items], repeat)
+        painter.end()
+        hover = timed(lambda: [item.set_hovered(not item.state) for item in items], repeat)
+        results.append({
+            "name": "paint",
+            "items": count,
+            "legacy_paints_per_s": count / legacy,
+            "paints_per_s": count / current,
+            "speedup": legacy / current,
+            "hover_toggles_per_s": count / hover,
+        })
+    return results
+
+
+VIEW_SIZE = (1280, 720)
+
+
+def mouse_event(kind, pos, button=Qt.NoButton, buttons=Qt.NoButton):
+    return QMouseEvent(kind, QPointF(pos), button, buttons, Qt.NoModifier)
+
+
+def wheel_event(pos, steps):
+    return QWheelEvent(QPointF(pos), QPointF(pos), QPoint(0, 0), QPoint(0, 120 * steps),
+                       Qt.NoButton, Qt.NoModifier, Qt.NoScrollPhase, False)
+
+
+def render_view(view, image):
+    # One offscreen frame of the whole viewport
+    painter = QPainter(image)
+    view.render(painter, QRectF(image.rect()), view.viewport().rect())
+    painter.end()
+
+
+def empty_view_point(view):
+    # A viewport point with no control under it, to start a rubber band from
+    for x in range(2, view.viewport().width(), 7):
+        point = QPoint(x, 2)
+        if view.pick_item(point) is None:
+            return point
+    return QPoint(2, 2)
+
+
+def bench_picker(counts=(100, 1000, 10000, 50000), steps=30):
+    # Whole-picker timings on scenes of `count` PolygonItems over an unbounded Grid: build,
+    # offscreen render, pan (mouseMoveEvent) and zoom (wheelEvent) each followed by a frame,
+    # programmatic translate, rubber-band selection, hover sweep and scene.save_layout/load_layout.
+    from polygons import CustomGraphicsScene, CustomGraphicsView
+    from gridItem import Grid, CustomGraphicsView as NavigationView
+
+    app = QApplication.instance()
+    width, height = VIEW_SIZE
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    results = []
+    for count in counts:
+        start = time.perf_counter()
+        scene = CustomGraphicsScene()
+        side = populate_scene(scene, count)
+        grid = Grid(None, None, 50)
+        grid.setZValue(-1)
+        scene.addItem(grid)
+        build = time.perf_counter() - start
+
+        view = CustomGraphicsView(scene)
+        view.resize(width, height)
+        view.show()
+        view.centerOn(side / 2, side / 2)
+        app.processEvents()
+        render = timed(lambda: render_view(view, image), 5)
+
+        # gridItem's view owns the right-drag pan and wheel zoom; it is pointed at the same scene
+        navigation = NavigationView()
+        navigation.setScene(scene)
+        navigation.resize(width, height)
+        navigation.show()
+        navigation.centerOn(side / 2, side / 2)
+        app.processEvents()
+        centre = QPoint(width // 2, height // 2)
+        navigation.mousePressEvent(mouse_event(QEvent.MouseButtonPress, centre, Qt.RightButton, Qt.RightButton))
+        moves = iter([centre + QPoint(8 * step, 5 * step) for step in range(1, steps + 1)])
+
+        def pan_step():
+            navigation.mouseMoveEvent(mouse_event(QEvent.MouseMove, next(moves), Qt.NoButton, Qt.RightButton))
+            render_view(navigation, image)
+
+        pan = timed(pan_step, steps)
+        navigation.mouseReleaseEvent(mouse_event(QEvent.MouseButtonRelease, centre, Qt.RightButton, Qt.NoButton))
+        wheel_steps = iter([1, -1] * steps)
+
+        def zoom_step():
+            navigation.wheelEvent(wheel_event(centre, next(wheel_steps)))
+            render_view(navigation, image)
+
+        zoom = timed(zoom_step, steps)
+
+        def translate_step():
+            navigation.translate(-6, 4)
+            render_view(navigation, image)
+
+        translate = timed(translate_step, steps)
+        navigation.hide()
+
+        origin = empty_view_point(view)
+        view.mousePressEvent(mouse_event(QEvent.MouseButtonPress, origin, Qt.LeftButton, Qt.LeftButton))
+        band = iter([origin + QPoint(width * step // steps, height * step // steps) for step in range(1, steps + 1)])
+        rubber_band = timed(lambda: view.mouseMoveEvent(
+            mouse_event(QEvent.MouseMove, next(band), Qt.NoButton, Qt.LeftButton)), steps)
+        view.mouseReleaseEvent(mouse_event(QEvent.MouseButtonRelease, origin + QPoint(width, height),
+                                           Qt.LeftButton, Qt.NoButton))
+        selected = len(scene.selectedItems())
+        scene.clearSelection()
+
+        sweep = iter([QPoint(width * step // (steps * 4), height // 2) for step in range(steps * 4)])
+        hover = timed(lambda: view.mouseMoveEvent(mouse_event(QEvent.MouseMove, next(sweep))), steps * 4)
+
+        path = os.path.join(tempfile.mkdtemp(), "bench.upk")
+        start = time.perf_counter()
+        scene.save_layout(path)
+        save = time.perf_counter() - start
+
+        load_scene = CustomGraphicsScene()
+        start = time.perf_counter()
+        loader = load_scene.load_layout(path)
+        while loader.is_loading():
+            app.processEvents()
+        load = time.perf_counter() - start
+        loaded = len(loader.items)
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+        view.hide()
+        view.setScene(None)
+        navigation.setScene(None)
+        results.append({
+            "name": "picker",
+            "items": count,
+            "build_ms": build * 1000,
+            "render_ms": render * 1000,
+            "pan_frame_ms": pan * 1000,
+            "zoom_frame_ms": zoom * 1000,
+            "translate_frame_ms": translate * 1000,
+            "rubber_band_ms": rubber_band * 1000,
+            "rubber_band_selected": selected,
+            "hover_ms": hover * 1000,
+            "save_ms": save * 1000,
+            "load_ms": load * 1000,
+            "loaded": loaded,
+        })
+    return results
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_UNREAL_DIR = os.path.join(SRC_DIR, "fakeUnreal")
+
+# Cold import budgets (ms, cumulative `-X importtime` of the module). "package" is the
+# package itself, which must stay cheap because it is imported whenever the panel opens.
+STARTUP_BUDGET_MS = {
+    "package": 15.0,
+    "UI": 400.0,
+    "gridItem": 400.0,
+    "MainUI": 400.0,
+    "polygons": 500.0,
+}
+
+
+def import_time_ms(module, cwd, extra_path=()):
+    # Runs `python -X importtime -c "import module"` in a fresh interpreter and returns the
+    # cumulative import time of that module in milliseconds
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(list(extra_path) + [cwd])
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=cwd, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    pattern = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(\S+)\s*$")
+    for line in completed.stderr.splitlines():
+        match = pattern.match(line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1000.0
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def bench_startup(repeat=5):
+    # Median of `repeat` cold imports per module, checked against STARTUP_BUDGET_MS
+    package_parent, package_name = os.path.split(SRC_DIR)
+    results = []
+    for name, budget in STARTUP_BUDGET_MS.items():
+        if name == "package":
+            samples = [import_time_ms(package_name, package_parent, [FAKE_UNREAL_DIR]) for _ in range(repeat)]
+        else:
+            samples = [import_time_ms(name, SRC_DIR) for _ in range(repeat)]
+        median = sorted(samples)[len(samples) // 2]
+        results.append({
+            "name": "startup",
+            "module": name,
+            "import_ms": median,
+            "budget_ms": budget,
+            "over_budget": median > budget,
+        })
+    return results
+
+
+RESULT_KEY_FIELDS = ("name", "items", "module")
+
+
+def result_key(result):
+    # Identifies a result row across runs
+    return tuple((key, result[key]) for key in RESULT_KEY_FIELDS if key in result)
+
+
+def compare_results(results, baseline, tolerance=0.2):
+    # Marks every timing that got more than `tolerance` slower than the baseline run.
+    # "_ms" fields are lower-is-better, "_per_s" fields higher-is-better.
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        reference = previous.get(result_key(result))
+        if reference is None:
+            continue
+        for key, value in result.items():
+            old = reference.get(key)
+            if not isinstance(value, float) or not isinstance(old, float) or old <= 0 or value <= 0:
+                continue
+            if key.endswith("_ms"):
+                ratio = value / old
+            elif key.endswith("_per_s"):
+                ratio = old / value
+            else:
+                continue
+            if ratio > 1 + tolerance:
+                regressions.append({"name": result["name"], "key": dict(result_key(result)), "metric": key,
+                                    "baseline": old, "value": value, "ratio": ratio})
+    return regressions
+
+
+def print_results(results):
+    for result in results:
+        fields = "  ".join(f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+                           for key, value in result.items())
+        print(fields)
+
+
+if __name__ == "__main__":
+    # python benchmark.py [spatial|paint|startup|picker] [--json out.json] [--baseline base.json]
+    #                     [--tolerance 0.2] [--counts 100,1000]
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("suite", nargs="?", default="spatial", choices=("spatial", "paint", "startup", "picker"))
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--counts", help="comma separated item counts")
+    args = parser.parse_args()
+
+    if args.suite != "startup":
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+    suites = {"spatial": bench_spatial_index, "paint": bench_paint, "startup": bench_startup, "picker": bench_picker}
+    suite = suites[args.suite]
+    kwargs = {}
+    if args.counts and "counts" in inspect.signature(suite).parameters:  # startup has no item counts
+        kwargs["counts"] = tuple(int(count) for count in args.counts.split(","))
+    results = suite(**kwargs)
+    print_results(results)
+
+    failed = any(result.get("over_budget") for result in results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_results(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']} {regression['key']} {regression['metric']}: "
+                  f"{regression['baseline']:.4f} -> {regression['value']:.4f} ({regression['ratio']:.2f}x)")
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
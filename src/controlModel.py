@@ -0,0 +1,353 @@
+import sys
+import numpy as np
+
+# Control ids are unique across every model and item in the process
+_next_id = 1
+
+
+def new_control_id():
+    global _next_id
+    _next_id += 1
+    return _next_id - 1
+
+
+def new_control_ids(count):
+    global _next_id
+    ids = np.arange(_next_id, _next_id + count, dtype=np.int64)
+    _next_id += count
+    return ids
+
+
+def claim_control_ids(ids):
+    # Ids read back from disk must not be handed out again
+    global _next_id
+    if len(ids):
+        _next_id = max(_next_id, int(np.max(ids)) + 1)
+
+
+def stored_control_ids(ids, taken):
+    # Ids read back from a layout: kept, except ids already in `taken` or repeated in the
+    # file, which get new ones
+    ids = np.array(ids, dtype=np.int64).reshape(-1)
+    clash = np.fromiter((control_id in taken for control_id in ids.tolist()), dtype=bool, count=len(ids))
+    repeated = np.ones(len(ids), dtype=bool)
+    repeated[np.unique(ids, return_index=True)[1]] = False
+    clash |= repeated
+    claim_control_ids(ids)
+    ids[clash] = new_control_ids(int(clash.sum()))
+    return ids
+
+
+class ControlModel:
+    # Headless picker state: one row per control in parallel arrays (id, shape, position,
+    # rotation, scale, color, flags, group, rig-control name), with outlines stored once
+    # per shape. Loading, querying, bulk edits and saving need neither Qt nor items;
+    # Qt items are views that read and write rows by control id.
+    # Listeners are called as listener(event, ids) with event "added", "changed", "removed"
+    # or "selected".
+    COLUMNS = {
+        "ids": (np.int64, 0),
+        "shape": (np.int32, 0),
+        "rotation": (np.float32, 0.0),
+        "scale": (np.float32, 1.0),
+        "color": (np.uint32, 0xFF0000FF),
+        "flags": (np.uint32, 3),
+        "group": (np.int32, -1),
+        "selected": (np.bool_, False),
+    }
+    # update_controls keyword -> column attribute
+    EDIT_COLUMNS = {"positions": "pos", "colors": "color", "shapes": "shape", "flags": "flags",
+                    "groups": "group", "rotation": "rotation", "scale": "scale", "names": "names"}
+
+    def __init__(self, capacity=1024):
+        self.count = 0
+        for name, (dtype, default) in self.COLUMNS.items():
+            setattr(self, name, np.full(capacity, default, dtype=dtype))
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.names = np.full(capacity, "", dtype=object)
+        self.row_of_id = {}
+        self.shapes = []
+        self.shape_extent = np.zeros((0, 4), dtype=np.float32)  # left, top, right, bottom
+        self._shape_keys = {}
+        self.groups = []
+        self._group_ids = {}
+        self.listeners = []
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, control_id):
+        return control_id in self.row_of_id
+
+    def notify(self, event, ids):
+        for listener in self.listeners:
+            listener(event, ids)
+
+    # --- shapes and groups --------------------------------------------------------------
+
+    def register_shape(self, points):
+        # points: (n, 2) outline around the control origin; identical outlines share an id
+        points = np.array(points, dtype=np.float32).reshape(-1, 2)
+        key = points.tobytes()
+        shape_id = self._shape_keys.get(key)
+        if shape_id is None:
+            shape_id = self._shape_keys[key] = len(self.shapes)
+            self.shapes.append(points)
+            extent = np.concatenate((points.min(axis=0), points.max(axis=0))) if len(points) else np.zeros(4)
+            self.shape_extent = np.vstack((self.shape_extent, extent.astype(np.float32)))
+        return shape_id
+
+    def group_id(self, name):
+        group = self._group_ids.get(name)
+        if group is None:
+            group = self._group_ids[name] = len(self.groups)
+            self.groups.append(name)
+        return group
+
+    # --- rows ---------------------------------------------------------------------------
+
+    def _reserve(self, count):
+        capacity = len(self.ids)
+        if count <= capacity:
+            return
+        capacity = max(count, capacity * 2)
+        for name, (dtype, default) in self.COLUMNS.items():
+            grown = np.full(capacity, default, dtype=dtype)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+        grown = np.zeros((capacity, 2), dtype=np.float64)
+        grown[:self.count] = self.pos[:self.count]
+        self.pos = grown
+        grown = np.full(capacity, "", dtype=object)
+        grown[:self.count] = self.names[:self.count]
+        self.names = grown
+
+    def rows(self, ids):
+        row_of_id = self.row_of_id
+        try:
+            return np.fromiter((row_of_id[control_id] for control_id in np.asarray(ids, dtype=np.int64).tolist()),
+                               dtype=np.int64, count=len(ids))
+        except KeyError as error:
+            raise KeyError(f"unknown control id: {error.args[0]}") from None
+
+    def add_controls(self, shapes, positions, colors=None, flags=None, names=None, groups=None,
+                     rotation=None, scale=None, ids=None):
+        # shapes: (n,) shape ids, positions: (n, 2); returns the control ids. Given ids must
+        # be unique and not in the model yet.
+        shapes = np.asarray(shapes, dtype=np.int32).reshape(-1)
+        count = len(shapes)
+        if ids is None:
+            ids = new_control_ids(count)
+        else:
+            ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+            row_of_id = self.row_of_id
+            taken = [control_id for control_id in ids.tolist() if control_id in row_of_id]
+            if taken:
+                raise ValueError(f"control ids already in the model: {taken[:10]}")
+            if len(np.unique(ids)) != len(ids):
+                raise ValueError("duplicate control ids")
+            claim_control_ids(ids)
+        start = self.count
+        end = start + count
+        self._reserve(end)
+        self.ids[start:end] = ids
+        self.shape[start:end] = shapes
+        self.pos[start:end] = np.asarray(positions, dtype=np.float64).reshape(count, 2)
+        for name, values in (("color", colors), ("flags", flags), ("group", groups),
+                             ("rotation", rotation), ("scale", scale)):
+            getattr(self, name)[start:end] = self.COLUMNS[name][1] if values is None else values
+        self.names[start:end] = "" if names is None else list(names)
+        self.selected[start:end] = False
+        self.row_of_id.update(zip(ids.tolist(), range(start, end)))
+        self.count = end
+        self.notify("added", ids)
+        return ids
+
+    def update_controls(self, ids, positions=None, colors=None, shapes=None, flags=None, groups=None,
+                        rotation=None, scale=None, names=None):
+        rows = self.rows(ids)
+        if positions is not None:
+            self.pos[rows] = np.asarray(positions, dtype=np.float64).reshape(len(rows), 2)
+        for name, values in (("color", colors), ("shape", shapes), ("flags", flags), ("group", groups),
+                             ("rotation", rotation), ("scale", scale)):
+            if values is not None:
+                getattr(self, name)[rows] = values
+        if names is not None:
+            self.names[rows] = list(names)
+        self.notify("changed", np.asarray(ids, dtype=np.int64))
+
+    def values(self, name, rows):
+        # Current values of an update_controls keyword, e.g. values("positions", rows)
+        return getattr(self, self.EDIT_COLUMNS[name])[rows]
+
+    def snapshot(self, ids):
+        # Copies of everything add_controls needs to put these rows back, ids included
+        rows = self.rows(ids)
+        return {"ids": self.ids[rows], "shapes": self.shape[rows], "positions": self.pos[rows],
+                "colors": self.color[rows], "flags": self.flags[rows], "names": self.names[rows].tolist(),
+                "groups": self.group[rows], "rotation": self.rotation[rows], "scale": self.scale[rows]}
+
+    def move(self, ids, delta):
+        rows = self.rows(ids)
+        self.pos[rows] += np.asarray(delta, dtype=np.float64)
+        self.notify("changed", np.asarray(ids, dtype=np.int64))
+
+    def remove_controls(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = self.rows(ids)
+        keep = np.ones(self.count, dtype=bool)
+        keep[rows] = False
+        kept = int(keep.sum())
+        for name in self.COLUMNS:
+            array = getattr(self, name)
+            array[:kept] = array[:self.count][keep]
+        self.pos[:kept] = self.pos[:self.count][keep]
+        self.names[:kept] = self.names[:self.count][keep]
+        self.names[kept:self.count] = ""
+        self.count = kept
+        self.row_of_id = dict(zip(self.ids[:kept].tolist(), range(kept)))
+        self.notify("removed", ids)
+
+    def clear(self):
+        self.remove_controls(self.ids[:self.count].copy())
+
+    # --- queries ------------------------------------------------------------------------
+
+    def bounds(self, rows=None):
+        # (n, 4) scene-space left, top, right, bottom; rotated controls get a square around
+        # their outline radius
+        rows = slice(0, self.count) if rows is None else rows
+        extent = self.shape_extent[self.shape[rows]] * self.scale[rows, None]
+        rotated = self.rotation[rows] != 0
+        if rotated.any():
+            radius = np.abs(extent[rotated]).max(axis=1)
+            extent[rotated] = np.stack((-radius, -radius, radius, radius), axis=1)
+        pos = self.pos[rows]
+        return np.concatenate((pos + extent[:, :2], pos + extent[:, 2:]), axis=1)
+
+    def rows_in_rect(self, left, top, right, bottom, contained=False):
+        bounds = self.bounds()
+        if contained:
+            mask = ((bounds[:, 0] >= left) & (bounds[:, 2] <= right)
+                    & (bounds[:, 1] >= top) & (bounds[:, 3] <= bottom))
+        else:
+            mask = ((bounds[:, 2] >= left) & (bounds[:, 0] <= right)
+                    & (bounds[:, 3] >= top) & (bounds[:, 1] <= bottom))
+        return np.flatnonzero(mask)
+
+    def ids_in_rect(self, left, top, right, bottom, contained=False):
+        return self.ids[self.rows_in_rect(left, top, right, bottom, contained)]
+
+    def ids_in_group(self, name):
+        group = self._group_ids.get(name)
+        if group is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.ids[:self.count][self.group[:self.count] == group]
+
+    def ids_named(self, names):
+        wanted = set(names)
+        return self.ids[:self.count][np.fromiter((name in wanted for name in self.names[:self.count]),
+                                                 dtype=bool, count=self.count)]
+
+    def select(self, ids, add=False):
+        if not add:
+            self.selected[:self.count] = False
+        self.selected[self.rows(ids)] = True
+        self.notify("selected", np.asarray(ids, dtype=np.int64))
+
+    def deselect(self, ids=None):
+        if ids is None:
+            self.selected[:self.count] = False
+        else:
+            self.selected[self.rows(ids)] = False
+        self.notify("selected", np.zeros(0, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64))
+
+    def selected_ids(self):
+        return self.ids[:self.count][self.selected[:self.count]]
+
+    def copy(self):
+        # Independent copy of the rows; shape outlines are never modified, so they are shared
+        model = ControlModel(capacity=max(self.count, 1))
+        rows = slice(0, self.count)
+        for name in self.COLUMNS:
+            getattr(model, name)[rows] = getattr(self, name)[rows]
+        model.pos[rows] = self.pos[rows]
+        model.names[rows] = self.names[rows]
+        model.count = self.count
+        model.row_of_id = dict(self.row_of_id)
+        model.shapes = list(self.shapes)
+        model.shape_extent = self.shape_extent.copy()
+        model._shape_keys = dict(self._shape_keys)
+        model.groups = list(self.groups)
+        model._group_ids = dict(self._group_ids)
+        return model
+
+    def memory_bytes(self):
+        per_row = sum(np.dtype(dtype).itemsize for dtype, _ in self.COLUMNS.values()) + 16 + 8
+        names = sum(len(name) for name in self.names[:self.count])
+        shapes = sum(points.nbytes for points in self.shapes)
+        # the id -> row dict: its table plus an int object for each key and value
+        index = sys.getsizeof(self.row_of_id) + len(self.row_of_id) * 2 * sys.getsizeof(2 ** 40)
+        return self.count * per_row + names + shapes + index
+
+    # --- serialization ------------------------------------------------------------------
+
+    def save(self, path):
+        # Full-fidelity snapshot (.npz); .upk layouts (to_layout) carry no rotation/scale/group
+        rows = slice(0, self.count)
+        vertex_counts = np.array([len(points) for points in self.shapes], dtype=np.int64)
+        vertices = np.concatenate(self.shapes) if self.shapes else np.zeros((0, 2), dtype=np.float32)
+        with open(path, "wb") as file:
+            np.savez(file, ids=self.ids[rows], shape=self.shape[rows], pos=self.pos[rows],
+                     rotation=self.rotation[rows], scale=self.scale[rows], color=self.color[rows],
+                     flags=self.flags[rows], group=self.group[rows],
+                     names=np.array(self.names[rows].tolist(), dtype=str),
+                     groups=np.array(self.groups, dtype=str), vertex_counts=vertex_counts, vertices=vertices)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            model = cls(capacity=max(len(data["ids"]), 1))
+            start = 0
+            for vertex_count in data["vertex_counts"].tolist():
+                model.register_shape(data["vertices"][start:start + vertex_count])
+                start += vertex_count
+            for name in data["groups"].tolist():
+                model.group_id(name)
+            model.add_controls(data["shape"], data["pos"], data["color"], data["flags"], data["names"].tolist(),
+                               data["group"], data["rotation"], data["scale"], data["ids"])
+        return model
+
+    def to_layout(self, path):
+        # Control ids are kept, so id references (undo history, autosave logs) survive a
+        # save and reload; the layout stores them as uint32
+        from pickerLayout import write_layout
+        rows = slice(0, self.count)
+        ids = self.ids[rows]
+        if len(ids) and (ids.min() < 0 or ids.max() > 0xFFFFFFFF):
+            raise ValueError("control ids do not fit a .upk layout (uint32)")
+        write_layout(path, self.shapes, self.pos[rows], self.shape[rows], self.color[rows],
+                     self.flags[rows], self.names[rows].tolist(), ids)
+        return self.count
+
+    @classmethod
+    def from_layout(cls, path):
+        model = cls()
+        model.read_layout(path)
+        return model
+
+    def read_layout(self, path):
+        # Appends the controls of a .upk layout with the ids stored in it; controls whose id
+        # is already in the model (the same layout read twice, say) get new ids. Returns the ids.
+        from pickerLayout import PickerLayout
+        with PickerLayout(path) as layout:
+            self._reserve(self.count + len(layout))
+            shape_map = np.array([self.register_shape(layout.shape_points(shape_id))
+                                  for shape_id in range(len(layout.shapes))], dtype=np.int32)
+            controls = np.array(layout.controls)
+            names = [layout.control_name(row) for row in range(len(controls))]
+        if not len(controls):
+            return np.zeros(0, dtype=np.int64)
+        ids = stored_control_ids(controls["id"], self.row_of_id)
+        return self.add_controls(shape_map[controls["shape"]], np.stack((controls["x"], controls["y"]), axis=1),
+                                 controls["color"], controls["flags"], names, ids=ids)
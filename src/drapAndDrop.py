@@ -1,22 +1,157 @@
 import sys
-from PySide2.QtCore import Qt, QMimeData, QPointF
+import struct
+from collections import OrderedDict
+import numpy as np
+from PySide2.QtCore import Qt, QMimeData, QPointF, QByteArray
 from PySide2.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGraphicsView, QGraphicsScene, QGraphicsItem, QLabel
-from PySide2.QtGui import QPolygonF, QDrag, QPixmap, QPainter, QColor, QPen, QBrush
+from PySide2.QtGui import QPolygonF, QDrag, QPixmap, QPainter, QColor, QPen, QBrush, QKeySequence
+from shapeLibrary import points_to_polygon
+from editJournal import EditJournal, EDIT_OVERHEAD
+
+# Drag payload: header (magic, count) then per control its offset from the cursor, colour,
+# vertex count and float32 vertices
+MIME_TYPE = "application/x-upicker-controls"
+PAYLOAD_HEADER = struct.Struct("<4sI")
+PAYLOAD_ITEM = struct.Struct("<ffIH")
+PAYLOAD_MAGIC = b"UPKD"
+
+IDLE_PEN = QPen(Qt.black)
+SELECTED_PEN = QPen(QColor("yellow"), 2)
+MAX_PREVIEW_SIZE = 512  # longest side of a drag preview in pixels; larger selections are scaled down
+
+_outline_ids = {}  # outline vertex bytes -> shape id
+
+
+def outline_id(polygon):
+    # Controls with the same outline share an id, and so their preview pixmaps
+    points = np.array([(point.x(), point.y()) for point in polygon], dtype="<f4")
+    return _outline_ids.setdefault(points.tobytes(), len(_outline_ids))
+
+
+def encode_controls(items, origin):
+    chunks = [PAYLOAD_HEADER.pack(PAYLOAD_MAGIC, len(items))]
+    for item in items:
+        points = np.array([(point.x(), point.y()) for point in item.polygon], dtype="<f4")
+        offset = item.scenePos() - origin
+        chunks.append(PAYLOAD_ITEM.pack(offset.x(), offset.y(), item.color.rgba(), len(points)))
+        chunks.append(points.tobytes())
+    return QByteArray(b"".join(chunks))
+
+
+def decode_controls(data):
+    # Returns [(offset, polygon, color)]; raises ValueError on a malformed payload
+    if isinstance(data, QByteArray):
+        data = data.data()
+    data = bytes(data)
+    magic, count = PAYLOAD_HEADER.unpack_from(data, 0)
+    if magic != PAYLOAD_MAGIC:
+        raise ValueError("not an Upicker drag payload")
+    position = PAYLOAD_HEADER.size
+    records = []
+    for _ in range(count):
+        x, y, rgba, vertex_count = PAYLOAD_ITEM.unpack_from(data, position)
+        position += PAYLOAD_ITEM.size
+        points = np.frombuffer(data, dtype="<f4", count=vertex_count * 2, offset=position).reshape(-1, 2)
+        position += points.nbytes
+        records.append((QPointF(x, y), points_to_polygon(points), QColor.fromRgba(rgba)))
+    return records
+
+
+class PreviewCache:
+    # Drag preview pixmaps per (shape id, colour, selected) so starting a drag never repaints shapes
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._pixmaps = OrderedDict()
+
+    def pixmap(self, item):
+        key = (item.shape_id, item.color.rgba(), item.isSelected())
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        rect = item.boundingRect()
+        pixmap = QPixmap(rect.size().toSize())
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-rect.topLeft())
+        item.draw(painter)
+        painter.end()
+        self._pixmaps[key] = pixmap
+        while len(self._pixmaps) > self.max_entries:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+
+preview_cache = PreviewCache()
+
+
+def drag_preview(items, origin, max_size=MAX_PREVIEW_SIZE):
+    # One pixmap of the whole selection, scaled down to max_size on its longest side, and
+    # the hot spot of `origin` (scene coordinates) in it
+    bounds = items[0].sceneBoundingRect()
+    for item in items[1:]:
+        bounds = bounds.united(item.sceneBoundingRect())
+    scale = min(1.0, max_size / max(bounds.width(), bounds.height(), 1.0))
+    pixmap = QPixmap(max(1, int(bounds.width() * scale)), max(1, int(bounds.height() * scale)))
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform, scale < 1.0)
+    painter.scale(scale, scale)
+    for item in items:
+        painter.drawPixmap(item.sceneBoundingRect().topLeft() - bounds.topLeft(), preview_cache.pixmap(item))
+    painter.end()
+    return pixmap, ((origin - bounds.topLeft()) * scale).toPoint()
+
+
+class ItemsEdit:
+    # Controls dropped into (added=True) or dragged out of a view; the items themselves are
+    # kept so undo and redo put back the very same objects
+    def __init__(self, view, items, added):
+        self.view = view
+        self.items = list(items)
+        self.added = added
+
+    def nbytes(self):
+        return EDIT_OVERHEAD + sum(EDIT_OVERHEAD + 16 * item.polygon.size() for item in self.items)
+
+    def merge(self, edit):
+        return False
+
+    def undo(self):
+        if self.added:
+            self.view.remove_items(self.items)
+        else:
+            self.view.insert_items(self.items)
+
+    def redo(self):
+        if self.added:
+            self.view.insert_items(self.items)
+        else:
+            self.view.remove_items(self.items)
+
 
 class DraggablePolygon(QGraphicsItem):
-    def __init__(self, polygon, parent=None):
+    def __init__(self, polygon, color=QColor(Qt.red), parent=None):
         super(DraggablePolygon, self).__init__(parent)
         self.polygon = polygon
+        self.shape_id = outline_id(polygon)
+        self.color = QColor(color)
+        self.brush = QBrush(self.color)
         self.setFlag(QGraphicsItem.ItemIsMovable)
+        self.setFlag(QGraphicsItem.ItemIsSelectable)
 
     def boundingRect(self):
-        return self.polygon.boundingRect()
+        return self.polygon.boundingRect().adjusted(-1, -1, 1, 1)
 
-    def paint(self, painter, option, widget):
-        painter.setPen(QPen(Qt.black))
-        painter.setBrush(QBrush(Qt.red))
+    def draw(self, painter):
+        painter.setPen(SELECTED_PEN if self.isSelected() else IDLE_PEN)
+        painter.setBrush(self.brush)
         painter.drawPolygon(self.polygon)
 
+    def paint(self, painter, option, widget):
+        self.draw(painter)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.dragStartPosition = event.pos()
@@ -28,34 +163,39 @@ class DraggablePolygon(QGraphicsItem):
         if (event.pos() - self.dragStartPosition).manhattanLength() < QApplication.startDragDistance():
             return
 
-        drag = QDrag(self.scene().views()[0])
-        pixmap = QPixmap(self.boundingRect().size().toSize())
-        pixmap.fill(Qt.transparent)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-        self.paint(painter, None, None)
-        painter.end()
+        # The whole selection travels in one drag
+        items = [item for item in self.scene().selectedItems() if isinstance(item, DraggablePolygon)]
+        if self not in items:
+            items.append(self)
+        origin = event.scenePos()
+        view = self.scene().views()[0]
+
+        drag = QDrag(view)
+        pixmap, hot_spot = drag_preview(items, origin)
         drag.setPixmap(pixmap)
-        drag.setHotSpot(event.pos().toPoint())
+        drag.setHotSpot(hot_spot)
 
         mime_data = QMimeData()
+        mime_data.setData(MIME_TYPE, encode_controls(items, origin))
         drag.setMimeData(mime_data)
-        drag.exec_(Qt.MoveAction)
-
-        
+        # The drop and the removal from this view are one undo step
+        with view.journal.group():
+            action = drag.exec_(Qt.CopyAction | Qt.MoveAction, Qt.MoveAction)
+            if action == Qt.MoveAction and drag.target() != view.viewport():
+                view.remove_controls(items)
 
-    def mouseReleaseEvent(self, event):
-        super(DraggablePolygon, self).mouseReleaseEvent(event)
-        if self.scene() and self.scene().views():
-            if self.scene().views()[0].parent() == self.scene().views()[0].parent().source_view:
-                self.scene().views()[0].parent().source_view.create_polygon()
 
 class CustomGraphicsView(QGraphicsView):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, is_template=False, journal=None):
         super().__init__(parent)
         self.setScene(QGraphicsScene(self))
+        # Template views keep their controls; drags out of them copy instead of move
+        self.is_template = is_template
+        # Views that exchange controls should share one journal
+        self.journal = journal if journal is not None else EditJournal()
 
         self.setRenderHint(QPainter.Antialiasing)
+        self.setDragMode(QGraphicsView.RubberBandDrag)
         self.setAcceptDrops(True)
 
     def create_polygon(self):
@@ -64,21 +204,76 @@ class CustomGraphicsView(QGraphicsView):
         self.polygon_item = DraggablePolygon(polygon)
         self.scene().addItem(self.polygon_item)
 
+    def add_controls(self, records, origin):
+        items = []
+        for offset, polygon, color in records:
+            item = DraggablePolygon(polygon, color)
+            item.setPos(origin + offset)
+            items.append(item)
+        self.scene().clearSelection()
+        self.insert_items(items)
+        for item in items:
+            item.setSelected(True)
+        self.journal.record(ItemsEdit(self, items, True))
+        return items
+
+    def remove_controls(self, items):
+        self.journal.record(ItemsEdit(self, items, False))
+        self.remove_items(items)
+
+    def insert_items(self, items):
+        # Adds items as one batch: repaints are held until every item is in
+        self.viewport().setUpdatesEnabled(False)
+        try:
+            for item in items:
+                if item.scene() is None:
+                    self.scene().addItem(item)
+        finally:
+            self.viewport().setUpdatesEnabled(True)
+        self.viewport().update()
+
+    def remove_items(self, items):
+        self.viewport().setUpdatesEnabled(False)
+        try:
+            for item in items:
+                if item.scene() is self.scene():
+                    self.scene().removeItem(item)
+        finally:
+            self.viewport().setUpdatesEnabled(True)
+        self.viewport().update()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Undo):
+            self.journal.undo()
+        elif event.matches(QKeySequence.Redo):
+            self.journal.redo()
+        else:
+            super().keyPressEvent(event)
+
+    def accepts(self, event):
+        return event.source() is not self and event.mimeData().hasFormat(MIME_TYPE)
+
     def dragEnterEvent(self, event):
-        if event.source() != self:
-            event.acceptProposedAction()
-            if event.source() == self.parent().source_view:
-                event.source().create_polygon()
+        if self.accepts(event):
+            event.setDropAction(Qt.CopyAction if getattr(event.source(), "is_template", False) else Qt.MoveAction)
+            event.accept()
+
     def dragMoveEvent(self, event):
-        if event.source() != self:
-            event.acceptProposedAction()
+        if self.accepts(event):
+            event.setDropAction(Qt.CopyAction if getattr(event.source(), "is_template", False) else Qt.MoveAction)
+            event.accept()
 
     def dropEvent(self, event):
-        if event.source() != self:
-            event.acceptProposedAction()
-            event.source().scene().removeItem(event.source().polygon_item)
-            self.scene().addItem(event.source().polygon_item)
-            event.source().polygon_item.setPos(self.mapToScene(event.pos()) - event.source().polygon_item.boundingRect().center())
+        if not self.accepts(event):
+            return
+        try:
+            records = decode_controls(event.mimeData().data(MIME_TYPE))
+        except (ValueError, struct.error):
+            event.ignore()
+            return
+        self.add_controls(records, self.mapToScene(event.pos()))
+        event.setDropAction(Qt.CopyAction if getattr(event.source(), "is_template", False) else Qt.MoveAction)
+        event.accept()
 
 
 class MainWindow(QWidget):
@@ -87,15 +282,16 @@ class MainWindow(QWidget):
 
         layout = QHBoxLayout(self)
 
-        self.source_view = CustomGraphicsView()
+        self.journal = EditJournal()
+        self.source_view = CustomGraphicsView(is_template=True, journal=self.journal)
         self.source_view.create_polygon()
         layout.addWidget(self.source_view)
 
-        self.target_view = CustomGraphicsView()
+        self.target_view = CustomGraphicsView(journal=self.journal)
         layout.addWidget(self.target_view)
 
 def main():
-   
+
     app = QApplication(sys.argv)
 
     main_widget = MainWindow()
@@ -107,4 +303,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
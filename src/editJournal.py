@@ -0,0 +1,235 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+
+# Undo history of compact deltas. An edit is any object with undo(), redo(), nbytes() and
+# merge(edit) -> bool; edits hold their own target (scene or view), so one journal can
+# cover several views. The edits below work on scenes that expose edit_controls,
+# remove_controls and restore_controls over a ControlModel (polygons.CustomGraphicsScene).
+EDIT_OVERHEAD = 64  # rough per-edit cost of the Python objects around the arrays
+
+
+class MoveEdit:
+    # Controls moved by per-control deltas; undo and redo are one batched position write
+    def __init__(self, scene, ids, delta):
+        self.scene = scene
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.delta = np.asarray(delta, dtype=np.float64).reshape(-1, 2)
+
+    def nbytes(self):
+        return self.ids.nbytes + self.delta.nbytes + EDIT_OVERHEAD
+
+    def merge(self, edit):
+        # The frames of one drag arrive as separate moves of the same controls
+        if type(edit) is not MoveEdit or edit.scene is not self.scene or not np.array_equal(edit.ids, self.ids):
+            return False
+        self.delta = self.delta + edit.delta
+        return True
+
+    def _shift(self, sign):
+        model = self.scene.control_model()
+        positions = model.pos[model.rows(self.ids)] + sign * self.delta
+        self.scene.edit_controls(self.ids, positions=positions)
+
+    def undo(self):
+        self._shift(-1.0)
+
+    def redo(self):
+        self._shift(1.0)
+
+
+class ColumnEdit:
+    # Before/after values of the changed columns (update_controls keywords: positions,
+    # colors, shapes, rotation, scale...) of some controls
+    def __init__(self, scene, ids, before, after):
+        self.scene = scene
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.before = before
+        self.after = after
+
+    def nbytes(self):
+        size = self.ids.nbytes + EDIT_OVERHEAD
+        for values in list(self.before.values()) + list(self.after.values()):
+            size += values.nbytes if isinstance(values, np.ndarray) else sum(len(value) + 8 for value in values)
+        return size
+
+    def merge(self, edit):
+        return False
+
+    def undo(self):
+        self.scene.edit_controls(self.ids, **self.before)
+
+    def redo(self):
+        self.scene.edit_controls(self.ids, **self.after)
+
+
+class RowsEdit:
+    # Controls added (added=True) or removed, kept as a ControlModel.snapshot of their rows
+    def __init__(self, scene, snapshot, added):
+        self.scene = scene
+        self.snapshot = snapshot
+        self.added = added
+
+    def nbytes(self):
+        size = EDIT_OVERHEAD
+        for values in self.snapshot.values():
+            size += values.nbytes if isinstance(values, np.ndarray) else sum(len(value) + 8 for value in values)
+        return size
+
+    def merge(self, edit):
+        return False
+
+    def undo(self):
+        if self.added:
+            self.scene.remove_controls(self.snapshot["ids"])
+        else:
+            self.scene.restore_controls(self.snapshot)
+
+    def redo(self):
+        if self.added:
+            self.scene.restore_controls(self.snapshot)
+        else:
+            self.scene.remove_controls(self.snapshot["ids"])
+
+
+class EditGroup:
+    # Several edits undone and redone as one step, e.g. the drop and the removal of a move drag
+    def __init__(self, edits):
+        self.edits = edits
+
+    def nbytes(self):
+        return sum(edit.nbytes() for edit in self.edits) + EDIT_OVERHEAD
+
+    def merge(self, edit):
+        return False
+
+    def undo(self):
+        for edit in reversed(self.edits):
+            edit.undo()
+
+    def redo(self):
+        for edit in self.edits:
+            edit.redo()
+
+
+class EditJournal:
+    # Undo/redo stacks under a memory budget: when the history grows past memory_budget
+    # bytes the oldest undo steps are dropped. A new edit merges into the previous one when
+    # it arrives within coalesce_ms and the previous edit accepts it (see MoveEdit.merge).
+    # Edits recorded while undoing or redoing are ignored, so targets can record
+    # unconditionally.
+    def __init__(self, memory_budget=16 * 1024 * 1024, coalesce_ms=500, clock=time.monotonic):
+        self.memory_budget = memory_budget
+        self.coalesce_ms = coalesce_ms
+        self.clock = clock
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.memory_used = 0
+        self.evicted = 0
+        self.replaying = False
+        self.listeners = []  # called with no arguments after every change to the stacks
+        self._group = None
+        self._group_depth = 0
+        self._last_record = None
+
+    def __len__(self):
+        return len(self.undo_stack)
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def notify(self):
+        for listener in self.listeners:
+            listener()
+
+    @contextmanager
+    def group(self):
+        # Everything recorded inside the block becomes one undo step
+        if self._group_depth == 0:
+            self._group = []
+        self._group_depth += 1
+        try:
+            yield
+        finally:
+            self._group_depth -= 1
+            if self._group_depth == 0:
+                edits, self._group = self._group, None
+                if len(edits) == 1:
+                    self._push(edits[0], False)
+                elif edits:
+                    self._push(EditGroup(edits), False)
+
+    def record(self, edit):
+        if self.replaying:
+            return
+        if self._group is not None:
+            if not (self._group and self._group[-1].merge(edit)):
+                self._group.append(edit)
+            return
+        self._push(edit, True)
+
+    def _push(self, edit, coalesce):
+        now = self.clock()
+        recent = self._last_record is not None and (now - self._last_record) * 1000.0 <= self.coalesce_ms
+        self._last_record = now
+        for redone in self.redo_stack:
+            self.memory_used -= redone.nbytes()
+        self.redo_stack = []
+        if coalesce and recent and self.undo_stack:
+            top = self.undo_stack[-1]
+            size = top.nbytes()
+            if top.merge(edit):
+                self.memory_used += top.nbytes() - size
+                self.notify()
+                return
+        self.undo_stack.append(edit)
+        self.memory_used += edit.nbytes()
+        self.evict()
+        self.notify()
+
+    def evict(self):
+        # The newest step is always kept, even when it alone is over budget
+        while self.memory_used > self.memory_budget and len(self.undo_stack) > 1:
+            self.memory_used -= self.undo_stack.popleft().nbytes()
+            self.evicted += 1
+
+    def seal(self):
+        # Stops the next edit from merging into the last one (end of a drag, say)
+        self._last_record = None
+
+    def undo(self):
+        if not self.undo_stack:
+            return None
+        edit = self.undo_stack.pop()
+        self._replay(edit.undo)
+        self.redo_stack.append(edit)
+        self.notify()
+        return edit
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        edit = self.redo_stack.pop()
+        self._replay(edit.redo)
+        self.undo_stack.append(edit)
+        self.notify()
+        return edit
+
+    def _replay(self, action):
+        self.replaying = True
+        try:
+            action()
+        finally:
+            self.replaying = False
+        self._last_record = None
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack = []
+        self.memory_used = 0
+        self._last_record = None
+        self.notify()
@@ -0,0 +1,73 @@
+# Minimal stand-in for the editor's `unreal` module, enough to drive selectionSync outside
+# Unreal. Put this folder first on sys.path to use it.
+from enum import Enum
+
+log_messages = []
+
+
+def log(message):
+    log_messages.append(str(message))
+
+
+def log_warning(message):
+    log_messages.append(f"warning: {message}")
+
+
+class RigElementType(Enum):
+    BONE = 1
+    NULL = 2
+    CONTROL = 4
+    CURVE = 8
+
+
+class RigElementKey:
+    def __init__(self, type=RigElementType.CONTROL, name=""):
+        self.type = type
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, RigElementKey) and (self.type, self.name) == (other.type, other.name)
+
+    def __hash__(self):
+        return hash((self.type, self.name))
+
+    def __repr__(self):
+        return f"RigElementKey({self.type.name}, {self.name!r})"
+
+
+class RigHierarchy:
+    def __init__(self):
+        self.selected = []
+
+    def get_selected_keys(self, type_filter=None):
+        return [key for key in self.selected if type_filter is None or key.type == type_filter]
+
+
+class RigHierarchyController:
+    def __init__(self, hierarchy):
+        self.hierarchy = hierarchy
+        self.calls = []
+
+    def set_selection(self, keys, print_python_command=False):
+        self.calls.append(("set_selection", list(keys)))
+        self.hierarchy.selected = list(keys)
+        return True
+
+    def select_element(self, key, select=True, clear_selection=False):
+        self.calls.append(("select_element", key, select))
+        if clear_selection:
+            self.hierarchy.selected = []
+        if select and key not in self.hierarchy.selected:
+            self.hierarchy.selected.append(key)
+        elif not select and key in self.hierarchy.selected:
+            self.hierarchy.selected.remove(key)
+        return True
+
+
+class ControlRigBlueprint:
+    def __init__(self):
+        self.hierarchy = RigHierarchy()
+        self._controller = RigHierarchyController(self.hierarchy)
+
+    def get_hierarchy_controller(self):
+        return self._controller
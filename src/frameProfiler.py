@@ -0,0 +1,232 @@
+import json
+import time
+import numpy as np
+from PySide2.QtCore import QEvent, QObject, QRectF
+from PySide2.QtGui import QColor, QFont, QPen
+from PySide2.QtWidgets import QGraphicsView
+
+INPUT_EVENTS = {QEvent.MouseButtonPress, QEvent.MouseButtonRelease, QEvent.MouseMove,
+                QEvent.MouseButtonDblClick, QEvent.Wheel, QEvent.HoverMove}
+
+
+class RingBuffer:
+    # Fixed-size float64 sample buffer; old samples are overwritten, nothing is allocated per push
+    def __init__(self, capacity=600):
+        self.data = np.zeros(capacity, dtype=np.float64)
+        self.next = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, value):
+        self.data[self.next] = value
+        self.next = (self.next + 1) % len(self.data)
+        if self.count < len(self.data):
+            self.count += 1
+
+    def values(self):
+        # Oldest first
+        if self.count < len(self.data):
+            return self.data[:self.count].copy()
+        return np.roll(self.data, -self.next)
+
+    def last(self):
+        return self.data[self.next - 1] if self.count else 0.0
+
+    def clear(self):
+        self.next = 0
+        self.count = 0
+
+
+class SceneUpdateTimer(QObject):
+    # A scene runs its update pass (dirty items, then the changed regions) from queued
+    # calls; this notes when the first one of a pass is delivered, and `elapsed` is read
+    # when the scene emits changed at the end of it
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.started = None
+
+    def eventFilter(self, watched, event):
+        if self.started is None and event.type() == QEvent.MetaCall:
+            self.started = time.perf_counter()
+        return False
+
+    def elapsed(self):
+        started, self.started = self.started, None
+        return (time.perf_counter() - started) * 1000.0 if started is not None else None
+
+
+class FrameProfiler:
+    # Per-view timings in ms: "paint" and "event" are handler durations, "interval" the time
+    # between paints and "scene_update" the scene's update pass, from its first queued
+    # update call to changed being emitted. Views get profiling from ProfiledViewMixin;
+    # with no profiler set the only cost is one attribute check per viewport event.
+    CHANNELS = ("paint", "event", "interval", "scene_update")
+    COUNT_INTERVAL = 0.25  # seconds between overlay item counts while the view keeps changing
+
+    def __init__(self, capacity=600, overlay=True):
+        self.channels = {name: RingBuffer(capacity) for name in self.CHANNELS}
+        self.overlay = overlay
+        self.paint_calls = 0
+        self.view = None
+        self._last_paint = None
+        self._update_timer = SceneUpdateTimer()
+        self._count = 0
+        self._count_key = None
+        self._count_time = 0.0
+        self._font = QFont("monospace", 8)
+        self._text_pen = QPen(QColor(255, 255, 255))
+        self._panel_color = QColor(0, 0, 0, 160)
+
+    @staticmethod
+    def scene_of(view):
+        # Some views keep their scene in a `scene` attribute, shadowing the method
+        return QGraphicsView.scene(view)
+
+    def attach(self, view):
+        self.detach()
+        self.view = view
+        scene = self.scene_of(view)
+        if scene is not None:
+            scene.installEventFilter(self._update_timer)
+            scene.changed.connect(self.scene_changed)
+
+    def detach(self):
+        scene = self.scene_of(self.view) if self.view is not None else None
+        if scene is not None:
+            scene.removeEventFilter(self._update_timer)
+            try:
+                scene.changed.disconnect(self.scene_changed)
+            except RuntimeError:
+                pass
+        self.view = None
+        self._count_key = None
+
+    def record(self, channel, value):
+        self.channels[channel].push(value)
+
+    def scene_changed(self, regions):
+        elapsed = self._update_timer.elapsed()
+        if elapsed is not None:
+            self.channels["scene_update"].push(elapsed)
+
+    def viewport_event(self, event, handler):
+        # Times `handler(event)`, the view's base viewportEvent
+        kind = event.type()
+        if kind != QEvent.Paint and kind not in INPUT_EVENTS:
+            return handler(event)
+        start = time.perf_counter()
+        result = handler(event)
+        end = time.perf_counter()
+        if kind == QEvent.Paint:
+            self.paint_calls += 1
+            self.channels["paint"].push((end - start) * 1000.0)
+            if self._last_paint is not None:
+                self.channels["interval"].push((start - self._last_paint) * 1000.0)
+            self._last_paint = start
+        else:
+            self.channels["event"].push((end - start) * 1000.0)
+        return result
+
+    def visible_item_count(self, view):
+        # Counting is a scene query, so it is redone only when the view or the scene's
+        # spatial index changed, and then at most every COUNT_INTERVAL
+        scene = self.scene_of(view)
+        if scene is None:
+            return 0
+        rect = view.mapToScene(view.viewport().rect()).boundingRect()
+        index = getattr(scene, "spatial_index", None)
+        key = (rect.getRect(), getattr(index, "revision", None))
+        now = time.perf_counter()
+        stale = key != self._count_key or index is None  # without an index changes go unseen
+        if self._count_key is None or (stale and now - self._count_time >= self.COUNT_INTERVAL):
+            items_in_rect = getattr(scene, "items_in_rect", None)
+            self._count = len(items_in_rect(rect) if items_in_rect is not None else scene.items(rect))
+            self._count_key = key
+            self._count_time = now
+        return self._count
+
+    def summary(self):
+        paint = self.channels["paint"].values()
+        interval = self.channels["interval"].values()
+        return {
+            "frame_ms": float(self.channels["paint"].last()),
+            "frame_p95_ms": float(np.percentile(paint, 95)) if len(paint) else 0.0,
+            "fps": float(1000.0 / interval.mean()) if len(interval) and interval.mean() > 0 else 0.0,
+            "paint_calls": self.paint_calls,
+        }
+
+    def draw_overlay(self, view, painter):
+        # Called from the view's drawForeground; draws in viewport coordinates
+        if not self.overlay:
+            return
+        summary = self.summary()
+        lines = (f"frame {summary['frame_ms']:.2f} ms  p95 {summary['frame_p95_ms']:.2f} ms  {summary['fps']:.0f} fps",
+                 f"items {self.visible_item_count(view)}  paints {summary['paint_calls']}")
+        painter.save()
+        painter.setWorldTransform(view.viewportTransform().inverted()[0], True)
+        panel = QRectF(8, 8, 300, 36)
+        painter.fillRect(panel, self._panel_color)
+        painter.setFont(self._font)
+        painter.setPen(self._text_pen)
+        for row, line in enumerate(lines):
+            painter.drawText(14, 22 + row * 14, line)
+        painter.restore()
+
+    def histograms(self, bins=20):
+        result = {}
+        for name, buffer in self.channels.items():
+            values = buffer.values()
+            if not len(values):
+                result[name] = {"count": 0}
+                continue
+            counts, edges = np.histogram(values, bins=bins)
+            result[name] = {
+                "count": int(len(values)),
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "p99": float(np.percentile(values, 99)),
+                "max": float(values.max()),
+                "edges": edges.tolist(),
+                "counts": counts.tolist(),
+            }
+        return result
+
+    def export(self, path, bins=20):
+        with open(path, "w") as file:
+            json.dump({"view": type(self.view).__name__ if self.view is not None else None,
+                       "paint_calls": self.paint_calls, "channels": self.histograms(bins)}, file, indent=2)
+
+    def reset(self):
+        self._count_key = None
+        for buffer in self.channels.values():
+            buffer.clear()
+        self.paint_calls = 0
+        self._last_paint = None
+
+
+class ProfiledViewMixin:
+    # Put ahead of QGraphicsView in the bases: set_profiler(FrameProfiler()) times the
+    # viewport's paint and input events and draws the overlay over the view's foreground
+    profiler = None  # class default: viewportEvent runs before __init__ finishes
+
+    def set_profiler(self, profiler):
+        # Pass a FrameProfiler to record timings (and draw its overlay), None to stop
+        if self.profiler is not None:
+            self.profiler.detach()
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.attach(self)
+        self.viewport().update()
+
+    def viewportEvent(self, event):
+        if self.profiler is None:
+            return super().viewportEvent(event)
+        return self.profiler.viewport_event(event, super().viewportEvent)
+
+    def drawForeground(self, painter, rect):
+        super().drawForeground(painter, rect)
+        if self.profiler is not None:
+            self.profiler.draw_overlay(self, painter)
@@ -5,45 +5,75 @@
 
 
 import sys
-from PySide2.QtCore import Qt, QPointF, QPoint
-from PySide2.QtGui import QPen, QColor, QPainterPath, QPainter
-from PySide2.QtWidgets import (QApplication, QGraphicsScene, QGraphicsView, QGraphicsPathItem,
+from PySide2.QtCore import Qt, QPointF, QPoint, QRectF
+from PySide2.QtGui import QPen, QColor, QPainter
+from PySide2.QtWidgets import (QApplication, QGraphicsScene, QGraphicsView, QGraphicsItem,
                                  QMainWindow,QColorDialog,QSpinBox, QLabel,QPushButton, QHBoxLayout, QVBoxLayout, QWidget)
+from gridRenderer import GridRenderer
+from tileCache import TiledBackground
+from frameProfiler import ProfiledViewMixin
 
 
-class Grid(QGraphicsPathItem):
+class Grid(QGraphicsItem):
+    # Procedural grid: nothing is cached per line, paint() only generates the lines inside the
+    # exposed rect. Pass width/height=None for an unbounded canvas.
+    INFINITE_EXTENT = 1.0e7
+
     def __init__(self, width, height, spacing, grid_color=QColor(230, 230, 230)):
         super().__init__()
         self.width = width
         self.height = height
         self.spacing = spacing
         self.grid_color = grid_color
-        self.create_grid()
+        self.renderer = GridRenderer(spacing=spacing)
+        self._pen = QPen(self.grid_color)
+        self._pen.setWidth(1)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    def pen(self):
+        return QPen(self._pen)
+
+    def setPen(self, pen):
+        self._pen = QPen(pen)
+        self.grid_color = self._pen.color()
+        self.update()
 
-    def create_grid(self):
-        pen = QPen(self.grid_color)
-        pen.setWidth(1)
-        self.setPen(pen)
+    def set_spacing(self, spacing):
+        self.spacing = spacing
+        self.renderer.spacing = spacing
+        self.update()
 
-        path = QPainterPath()
+    def set_size(self, width, height):
+        self.prepareGeometryChange()
+        self.width = width
+        self.height = height
 
-        for x in range(0, self.width + 1, self.spacing):
-            path.moveTo(x, 0)
-            path.lineTo(x, self.height)
+    def grid_rect(self):
+        if self.width is None or self.height is None:
+            extent = self.INFINITE_EXTENT
+            return QRectF(-extent, -extent, 2 * extent, 2 * extent)
+        return QRectF(0, 0, self.width, self.height)
 
-        for y in range(0, self.height + 1, self.spacing):
-            path.moveTo(0, y)
-            path.lineTo(self.width, y)
+    def boundingRect(self):
+        margin = self._pen.widthF()
+        return self.grid_rect().adjusted(-margin, -margin, margin, margin)
 
-        self.setPath(path)
+    def paint(self, painter, option, widget=None):
+        visible = option.exposedRect.intersected(self.grid_rect())
+        if visible.isEmpty():
+            return
+        self.renderer.draw(painter, visible, self._pen.color(), self._pen.widthF())
 
 
-class CustomGraphicsView(QGraphicsView):
-    def __init__(self, background_color=Qt.white, grid_color=QColor(230, 230, 230)):
+class CustomGraphicsView(ProfiledViewMixin, QGraphicsView):
+    def __init__(self, background_color=Qt.white, grid_color=QColor(230, 230, 230), tile_cache=False):
         super().__init__()
 
         self.background_color = background_color
         self.grid_color = grid_color
+        # Static layers (grid, reference images); drawn as scene items, or into tiles when cached
+        self.background_layers = []
+        self.tiled_background = None
 
         # Set up the scene
         self.scene = QGraphicsScene(self)
@@ -51,13 +81,12 @@ class CustomGraphicsView(QGraphicsView):
         self.scene.setSceneRect(0, 0, 2000, 2000)
         self.grid_item = Grid(1000, 1000, 50, grid_color=self.grid_color)
         self.grid_item.setPos(QPoint(500,500))
-        self.scene.addItem(self.grid_item)
+        self.add_background_layer(self.grid_item)
 
         # Remove the alignment line
         # self.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         self.setBackgroundBrush(QColor(self.background_color))
 
-        self.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
         # Enable mouse tracking
         self.setMouseTracking(True)
         self.setInteractive(True)
@@ -73,6 +102,69 @@ class CustomGraphicsView(QGraphicsView):
         self.pan_start = QPoint(100, 100)
         self.shift_pressed=False 
         self.f_pressed=False
+        self.set_tile_cache_enabled(tile_cache)
+
+    def add_background_layer(self, item):
+        self.background_layers.append(item)
+        if self.tiled_background is not None:
+            self.tiled_background.add_layer(item)
+            self.viewport().update()
+        else:
+            self.scene.addItem(item)
+
+    def remove_background_layer(self, item):
+        self.background_layers.remove(item)
+        if self.tiled_background is not None:
+            self.tiled_background.remove_layer(item)
+            self.viewport().update()
+        else:
+            self.scene.removeItem(item)
+
+    def set_tile_cache_enabled(self, enabled, tile_size=256, memory_budget=64 * 1024 * 1024):
+        if enabled == (self.tiled_background is not None):
+            return
+        if enabled:
+            self.tiled_background = TiledBackground(tile_size, memory_budget)
+            self.tiled_background.set_background_color(self.backgroundBrush().color())
+            for item in self.background_layers:
+                self.scene.removeItem(item)
+                self.tiled_background.add_layer(item)
+        else:
+            self.tiled_background = None
+            for item in self.background_layers:
+                self.scene.addItem(item)
+        self.viewport().update()
+
+    def set_reference_image(self, path):
+        # Kept out of background_layers: it streams and caches its own tiles, which the
+        # tiled background would freeze half-loaded
+        from imagePyramid import ReferenceImageItem
+        if getattr(self, "reference_image", None) is not None:
+            self.reference_image.close()
+            self.scene.removeItem(self.reference_image)
+        self.reference_image = ReferenceImageItem(path)
+        self.reference_image.setZValue(-2)
+        self.scene.addItem(self.reference_image)
+        return self.reference_image
+
+    def invalidate_background(self):
+        # Call after changing a background layer (pen, visibility, image) so cached tiles are redrawn
+        if self.tiled_background is not None:
+            self.tiled_background.invalidate()
+        self.viewport().update()
+
+    def set_background_color(self, color):
+        self.setBackgroundBrush(QColor(color))
+        if self.tiled_background is not None:
+            self.tiled_background.set_background_color(color)
+        self.viewport().update()
+
+    def drawBackground(self, painter, rect):
+        transform = self.viewportTransform()
+        if self.tiled_background is None or not self.tiled_background.can_draw(transform):
+            super().drawBackground(painter, rect)
+            return
+        self.tiled_background.draw(painter, self.viewport().rect(), transform)
 
     def wheelEvent(self, event):
         zoom_factor = 1.15
@@ -168,11 +260,13 @@ class MainWindow(QMainWindow):
             self.view.grid_item.hide()
         else:
             self.view.grid_item.show()
+        self.view.invalidate_background()
 
     def update_grid_thickness(self, value):
         pen = self.view.grid_item.pen()
         pen.setWidth(value)
         self.view.grid_item.setPen(pen)
+        self.view.invalidate_background()
 
     def change_grid_color(self):
         color = QColorDialog.getColor(self.view.grid_item.pen().color(), self, "Select Grid Color")
@@ -180,6 +274,7 @@ class MainWindow(QMainWindow):
             pen = self.view.grid_item.pen()
             pen.setColor(color)
             self.view.grid_item.setPen(pen)
+            self.view.invalidate_background()
 
 
 
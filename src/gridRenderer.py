@@ -0,0 +1,102 @@
+import math
+from PySide2.QtCore import QLineF, Qt
+from PySide2.QtGui import QColor, QPen
+
+
+class GridRenderer:
+    # Draws a level-of-detail grid with one drawLines call per pen.
+    # Line objects are preallocated once and reused every frame, and the spacing grows
+    # by major_every whenever lines would get closer than min_pixel_spacing on screen,
+    # so the number of lines per frame never exceeds max_lines.
+    def __init__(self, spacing=20, major_every=5, min_pixel_spacing=8.0, max_lines=1024):
+        self.spacing = spacing
+        self.major_every = major_every
+        self.min_pixel_spacing = min_pixel_spacing
+        self.max_lines = max_lines
+        self._minor_lines = [QLineF() for _ in range(max_lines)]
+        self._major_lines = [QLineF() for _ in range(max_lines)]
+        self._color = None
+        self._thickness = None
+        self._major_pen = QPen()
+        self._minor_pen = QPen()
+        self._minor_color = QColor()
+
+    def set_style(self, color, thickness):
+        if self._color is not None and color == self._color and thickness == self._thickness:
+            return
+        self._color = QColor(color)
+        self._thickness = thickness
+        self._major_pen = QPen(self._color, thickness, Qt.SolidLine)
+        self._major_pen.setCosmetic(True)
+        self._minor_pen = QPen(self._major_pen)
+        self._minor_color = QColor(self._color)
+
+    def level_of_detail(self, scale, rect):
+        # Returns (spacing, minor_fade); minor lines fade in from 0 to 1 as they move apart on
+        # screen and are fully drawn once as far apart as at 1:1 (self.spacing pixels), so
+        # only zoomed-out views are faded
+        spacing = float(self.spacing)
+        pixel_spacing = spacing * scale
+        while pixel_spacing < self.min_pixel_spacing:
+            spacing *= self.major_every
+            pixel_spacing *= self.major_every
+        while self.line_count(rect, spacing) > self.max_lines:
+            spacing *= self.major_every
+            pixel_spacing *= self.major_every
+        fade_range = self.spacing - self.min_pixel_spacing
+        minor_fade = min(1.0, (pixel_spacing - self.min_pixel_spacing) / fade_range) if fade_range > 0 else 1.0
+        return spacing, minor_fade
+
+    def line_count(self, rect, spacing):
+        columns = math.floor(rect.right() / spacing) - math.ceil(rect.left() / spacing) + 1
+        rows = math.floor(rect.bottom() / spacing) - math.ceil(rect.top() / spacing) + 1
+        return max(columns, 0) + max(rows, 0)
+
+    def fill_lines(self, rect, spacing, skip_minor=False):
+        # Writes the visible lines of rect into the preallocated buffers; returns (minor_count, major_count).
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+        major_every = self.major_every
+        minor_lines = self._minor_lines
+        major_lines = self._major_lines
+        minor_count = 0
+        major_count = 0
+
+        for i in range(math.ceil(left / spacing), math.floor(right / spacing) + 1):
+            x = i * spacing
+            if i % major_every == 0:
+                major_lines[major_count].setLine(x, top, x, bottom)
+                major_count += 1
+            elif not skip_minor:
+                minor_lines[minor_count].setLine(x, top, x, bottom)
+                minor_count += 1
+
+        for i in range(math.ceil(top / spacing), math.floor(bottom / spacing) + 1):
+            y = i * spacing
+            if i % major_every == 0:
+                major_lines[major_count].setLine(left, y, right, y)
+                major_count += 1
+            elif not skip_minor:
+                minor_lines[minor_count].setLine(left, y, right, y)
+                minor_count += 1
+
+        return minor_count, major_count
+
+    def draw(self, painter, rect, color, thickness=1):
+        transform = painter.worldTransform()
+        scale = math.hypot(transform.m11(), transform.m12())
+        if scale <= 0 or rect.isEmpty():
+            return
+
+        self.set_style(color, thickness)
+        spacing, minor_fade = self.level_of_detail(scale, rect)
+        skip_minor = minor_fade <= 0.0
+        minor_count, major_count = self.fill_lines(rect, spacing, skip_minor)
+
+        if minor_count:
+            self._minor_color.setAlphaF(self._color.alphaF() * minor_fade)
+            self._minor_pen.setColor(self._minor_color)
+            painter.setPen(self._minor_pen)
+            painter.drawLines(self._minor_lines[:minor_count])
+        if major_count:
+            painter.setPen(self._major_pen)
+            painter.drawLines(self._major_lines[:major_count])
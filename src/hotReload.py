@@ -0,0 +1,168 @@
+import importlib
+import os
+import sys
+import time
+
+
+class HotReloader:
+    # Reloads only modules whose source changed, plus the modules that import them, in
+    # dependency order (imports first). A module is tracked when its name starts with one of
+    # `prefixes` or its file lives under one of `roots`. Modules imported after the reloader
+    # was created count as changed if their file is newer than the reloader.
+    def __init__(self, prefixes=(), roots=(), log=print):
+        self.prefixes = tuple(prefixes)
+        self.roots = tuple(os.path.normcase(os.path.abspath(root)) for root in roots)
+        self.log = log
+        self._state = {}    # name -> (path, mtime, size, digest or None until first reload)
+        self._imports = {}  # name -> set of tracked module names it imports
+        self._late = set()  # first seen after creation with a file newer than the reloader
+        self.created_ns = time.time_ns()
+        self.scan(initial=True)
+
+    def is_tracked(self, name, module):
+        path = getattr(module, "__file__", None)
+        if not path or not path.endswith(".py"):
+            return False
+        if self.prefixes and name.startswith(self.prefixes):
+            return True
+        path = os.path.normcase(os.path.abspath(path))
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    def tracked_modules(self):
+        return {name: module for name, module in list(sys.modules.items())
+                if module is not None and self.is_tracked(name, module)}
+
+    @staticmethod
+    def file_state(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def digest(path):
+        import hashlib
+        with open(path, "rb") as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
+    def scan(self, initial=False):
+        # Records modules not seen before; returns the tracked modules
+        modules = self.tracked_modules()
+        for name, module in modules.items():
+            if name not in self._state:
+                self._record(name, module.__file__, hashed=False)
+                if not initial and self._state[name][1] > self.created_ns:
+                    self._late.add(name)
+        for name in list(self._state):
+            if name not in modules:
+                del self._state[name]
+                self._imports.pop(name, None)
+                self._late.discard(name)
+        return modules
+
+    def _record(self, name, path, hashed=True):
+        # Hashing is skipped on scan to keep startup cheap; an unhashed module whose mtime
+        # moves is simply treated as changed
+        mtime, size = self.file_state(path)
+        self._state[name] = (path, mtime, size, self.digest(path) if hashed else None)
+        self._imports[name] = None  # parsed lazily
+
+    def changed_modules(self):
+        changed = set(self._late)
+        self._late.clear()
+        for name, (path, mtime, size, digest) in self._state.items():
+            try:
+                new_mtime, new_size = self.file_state(path)
+            except OSError:
+                continue
+            if (new_mtime, new_size) == (mtime, size):
+                continue
+            new_digest = self.digest(path) if digest is not None else None
+            if new_digest is None or new_digest != digest:
+                changed.add(name)
+            else:
+                # Touched but identical; remember the new mtime to skip hashing next time
+                self._state[name] = (path, new_mtime, new_size, digest)
+        return changed
+
+    def imports_of(self, name, modules):
+        imports = self._imports.get(name)
+        if imports is None:
+            imports = self._imports[name] = self.parse_imports(name, modules)
+        return imports
+
+    def parse_imports(self, name, modules):
+        # ast and hashlib are imported lazily: this module is loaded with the package at startup
+        import ast
+        module = modules[name]
+        with open(module.__file__, "rb") as file:
+            tree = ast.parse(file.read(), module.__file__)
+        package = module.__package__ or ""
+        found = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                found.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                    target = f"{base}.{node.module}" if node.module else base
+                else:
+                    target = node.module
+                found.add(target)
+                found.update(f"{target}.{alias.name}" for alias in node.names)
+        # Keep tracked modules only; "a.b.c" also depends on its parents being reloaded first
+        result = set()
+        for target in found:
+            while target:
+                if target in modules and target != name:
+                    result.add(target)
+                target = target.rpartition(".")[0]
+        return result
+
+    def dependents(self, names, modules):
+        importers = {}
+        for name in modules:
+            for imported in self.imports_of(name, modules):
+                importers.setdefault(imported, set()).add(name)
+        pending = list(names)
+        closure = set(names)
+        while pending:
+            for importer in importers.get(pending.pop(), ()):
+                if importer not in closure:
+                    closure.add(importer)
+                    pending.append(importer)
+        return closure
+
+    def reload_order(self, names, modules):
+        # Kahn's algorithm restricted to `names`; import cycles fall back to name order
+        remaining = {name: self.imports_of(name, modules) & names for name in names}
+        order = []
+        while remaining:
+            ready = sorted(name for name, imports in remaining.items() if not imports)
+            if not ready:
+                ready = [min(remaining)]
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for imports in remaining.values():
+                imports.difference_update(ready)
+        return order
+
+    def reload(self, force=False):
+        # Returns [(module name, seconds)] for every module reloaded
+        modules = self.scan()
+        changed = set(modules) if force else self.changed_modules()
+        if not changed:
+            return []
+        for name in changed:
+            self._imports[name] = None
+        targets = self.dependents(changed, modules)
+        timings = []
+        for name in self.reload_order(targets, modules):
+            start = time.perf_counter()
+            importlib.reload(modules[name])
+            elapsed = time.perf_counter() - start
+            self._record(name, modules[name].__file__)
+            timings.append((name, elapsed))
+            self.log(f"reloaded {name} in {elapsed * 1000:.1f} ms")
+        total = sum(elapsed for _, elapsed in timings)
+        self.log(f"hot reload: {len(timings)} module(s) in {total * 1000:.1f} ms")
+        return timings
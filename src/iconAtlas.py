@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+from PySide2.QtCore import Qt, QRect, QStandardPaths
+from PySide2.QtGui import QColor, QIcon, QImage, QPainter, QPixmap
+
+
+def default_cache_dir():
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation) or os.path.expanduser("~/.cache")
+    return os.path.join(location, "upicker_icons")
+
+
+class IconAtlas:
+    # Packs palette icons of one size/DPI into a single image, persisted to cache_dir.
+    # Entries are keyed by a hash of geometry, colours and size, so a changed shape gets a
+    # new entry and a warm start hands out icons without painting anything.
+    VERSION = 2
+
+    def __init__(self, cache_dir=None, icon_size=32, device_pixel_ratio=1.0, columns=16):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.icon_size = icon_size
+        self.device_pixel_ratio = device_pixel_ratio
+        self.columns = columns
+        self.slot_size = int(round(icon_size * device_pixel_ratio))
+        self.slots = {}  # key -> slot index
+        self.image = QImage()
+        self.used = set()
+        self.dirty = False
+        self._icons = {}
+        self.rendered = 0
+        self.load()
+
+    @property
+    def name(self):
+        return f"atlas_{self.icon_size}@{self.device_pixel_ratio:g}x"
+
+    def paths(self):
+        base = os.path.join(self.cache_dir, self.name)
+        return base + ".png", base + ".json"
+
+    def key(self, polygon, pen_color, brush_color):
+        digest = hashlib.sha1()
+        for point in polygon:
+            digest.update(f"{point.x():.4f},{point.y():.4f};".encode())
+        digest.update(f"{QColor(pen_color).rgba()}|{QColor(brush_color).rgba()}|".encode())
+        digest.update(f"{self.icon_size}|{self.device_pixel_ratio:g}".encode())
+        return digest.hexdigest()
+
+    def load(self):
+        image_path, index_path = self.paths()
+        if not (os.path.exists(image_path) and os.path.exists(index_path)):
+            return
+        try:
+            with open(index_path) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return
+        if index.get("version") != self.VERSION or index.get("slot_size") != self.slot_size \
+                or index.get("columns") != self.columns:
+            return
+        image = QImage(image_path)
+        if image.isNull():
+            return
+        self.image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        self.slots = dict(index["slots"])
+
+    def save(self, prune=True):
+        # Writes the atlas; with prune, entries not requested this session are dropped
+        if prune and set(self.slots) - self.used:
+            self._compact()
+        if not self.dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        image_path, index_path = self.paths()
+        self.image.save(image_path, "PNG")
+        with open(index_path, "w") as file:
+            json.dump({"version": self.VERSION, "slot_size": self.slot_size, "columns": self.columns,
+                       "slots": self.slots}, file)
+        self.dirty = False
+
+    def slot_rect(self, slot):
+        size = self.slot_size
+        return QRect((slot % self.columns) * size, (slot // self.columns) * size, size, size)
+
+    def _ensure_capacity(self, slot_count):
+        rows = (slot_count + self.columns - 1) // self.columns
+        height = rows * self.slot_size
+        if not self.image.isNull() and self.image.height() >= height:
+            return
+        grown = QImage(self.columns * self.slot_size, height, QImage.Format_ARGB32_Premultiplied)
+        grown.fill(Qt.transparent)
+        if not self.image.isNull():
+            painter = QPainter(grown)
+            painter.drawImage(0, 0, self.image)
+            painter.end()
+        self.image = grown
+
+    def _compact(self):
+        keys = [key for key, _ in sorted(self.slots.items(), key=lambda entry: entry[1]) if key in self.used]
+        old_image, old_slots = self.image, self.slots
+        self.image = QImage()
+        self.slots = {}
+        self._ensure_capacity(max(len(keys), 1))
+        painter = QPainter(self.image)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        for slot, key in enumerate(keys):
+            target = self.slot_rect(slot)
+            painter.drawImage(target, old_image, self.slot_rect(old_slots[key]))
+            self.slots[key] = slot
+        painter.end()
+        self._icons = {}
+        self.dirty = True
+
+    def _render(self, key, polygon, pen_color, brush_color):
+        slot = max(self.slots.values(), default=-1) + 1
+        self._ensure_capacity(slot + 1)
+        rect = self.slot_rect(slot)
+        # Default render hints, like the per-icon pixmaps the atlas replaces; the clip keeps
+        # outlines that reach past the icon out of the neighbouring slots
+        painter = QPainter(self.image)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(rect, Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        painter.setClipRect(rect)
+        painter.translate(rect.topLeft())
+        painter.scale(self.device_pixel_ratio, self.device_pixel_ratio)
+        painter.setPen(QColor(pen_color))
+        painter.setBrush(QColor(brush_color))
+        painter.drawPolygon(polygon)
+        painter.end()
+        self.slots[key] = slot
+        self.rendered += 1
+        self.dirty = True
+        return slot
+
+    def pixmap(self, polygon, pen_color=Qt.black, brush_color=Qt.blue):
+        return self.icon(polygon, pen_color, brush_color).pixmap(self.icon_size, self.icon_size)
+
+    def icon(self, polygon, pen_color=Qt.black, brush_color=Qt.blue):
+        key = self.key(polygon, pen_color, brush_color)
+        self.used.add(key)
+        icon = self._icons.get(key)
+        if icon is not None:
+            return icon
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self._render(key, polygon, pen_color, brush_color)
+        pixmap = QPixmap.fromImage(self.image.copy(self.slot_rect(slot)))
+        pixmap.setDevicePixelRatio(self.device_pixel_ratio)
+        icon = self._icons[key] = QIcon(pixmap)
+        return icon
@@ -0,0 +1,299 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from functools import partial
+from PySide2.QtCore import Qt, QRect, QRectF, QStandardPaths, QThread, Signal
+from PySide2.QtGui import QImage, QImageReader, QPixmap
+from PySide2.QtWidgets import QGraphicsItem, QGraphicsObject
+from tileCache import TileCache
+
+# Picker artwork is turned once into a pyramid of PNG tiles on disk:
+#   <cache>/<key>/index.json   source size, tile size and per-level size/columns/rows
+#   <cache>/<key>/<level>_<column>_<row>.png
+# Level 0 is full resolution, each next level half the size, down to a single tile.
+PYRAMID_VERSION = 1
+
+
+def default_cache_dir():
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation) or os.path.expanduser("~/.cache")
+    return os.path.join(location, "upicker_pyramids")
+
+
+def pyramid_dir(image_path, cache_dir, tile_size):
+    # A changed source file (mtime/size) gets a new pyramid
+    stat = os.stat(image_path)
+    digest = hashlib.sha1(f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{tile_size}".encode())
+    return os.path.join(cache_dir, digest.hexdigest())
+
+
+def read_index(directory):
+    try:
+        with open(os.path.join(directory, "index.json")) as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == PYRAMID_VERSION else None
+
+
+def tile_path(directory, level, column, row):
+    return os.path.join(directory, f"{level}_{column}_{row}.png")
+
+
+def build_pyramid(image_path, directory, tile_size=256, should_stop=lambda: False):
+    # Returns the index, or None when stopped. The index is written last, so a pyramid
+    # interrupted half way is never used.
+    image = QImage(image_path)
+    if image.isNull():
+        raise IOError(f"cannot read image {image_path}")
+    image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    os.makedirs(directory, exist_ok=True)
+    levels = []
+    while True:
+        level = len(levels)
+        columns = math.ceil(image.width() / tile_size)
+        rows = math.ceil(image.height() / tile_size)
+        for row in range(rows):
+            for column in range(columns):
+                if should_stop():
+                    return None
+                x, y = column * tile_size, row * tile_size
+                tile = image.copy(QRect(x, y, min(tile_size, image.width() - x), min(tile_size, image.height() - y)))
+                tile.save(tile_path(directory, level, column, row), "PNG")
+        levels.append({"width": image.width(), "height": image.height(), "columns": columns, "rows": rows})
+        if columns == 1 and rows == 1:
+            break
+        image = image.scaled(max(1, image.width() // 2), max(1, image.height() // 2),
+                             Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    index = {"version": PYRAMID_VERSION, "width": levels[0]["width"], "height": levels[0]["height"],
+             "tile_size": tile_size, "levels": levels}
+    temporary = os.path.join(directory, "index.json.tmp")
+    with open(temporary, "w") as file:
+        json.dump(index, file)
+    os.replace(temporary, os.path.join(directory, "index.json"))
+    return index
+
+
+class PyramidBuilder(QThread):
+    built = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, image_path, directory, tile_size=256, parent=None):
+        super().__init__(parent)
+        self.image_path = image_path
+        self.directory = directory
+        self.tile_size = tile_size
+
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+    def run(self):
+        try:
+            index = build_pyramid(self.image_path, self.directory, self.tile_size, self.isInterruptionRequested)
+        except Exception as error:
+            self.failed.emit(f"{self.image_path}: {error}")
+            return
+        if index is not None:
+            self.built.emit(index)
+
+
+class TileLoader(QThread):
+    # Decodes tile PNGs off the GUI thread. want() replaces the outstanding requests, so
+    # tiles the view has already panned away from are never read.
+    loaded = Signal(object, object)  # (level, column, row), QImage
+
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self._wanted = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def want(self, keys):
+        with self._lock:
+            self._wanted = list(reversed(keys))  # popped from the end: first key first
+        self._ready.set()
+
+    def stop(self):
+        self.requestInterruption()
+        self._ready.set()
+        self.wait()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            self._ready.wait()
+            with self._lock:
+                key = self._wanted.pop() if self._wanted else None
+                if not self._wanted:
+                    self._ready.clear()
+            if key is None or self.isInterruptionRequested():
+                continue
+            image = QImage(tile_path(self.directory, *key))
+            if not image.isNull():
+                self.loaded.emit(key, image)
+
+
+def stop_threads(threads):
+    # Also connected to the item's destroyed signal: a deleted scene deletes its items
+    # without a scene change, and a QThread must not be destroyed while running
+    while threads:
+        threads.pop().stop()
+
+
+class ReferenceImageItem(QGraphicsObject):
+    # Background artwork drawn from a tile pyramid. Paint only uses tiles already in the
+    # LRU; missing tiles are requested from the loader and covered meanwhile by the nearest
+    # coarser level in memory, so memory follows the screen, not the artwork.
+    pyramid_ready = Signal()
+    failed = Signal(str)  # the pyramid could not be built; the message is kept in `error`
+
+    def __init__(self, image_path, cache_dir=None, tile_size=256, memory_budget=32 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.image_path = image_path
+        self.tile_size = tile_size
+        self.cache = TileCache(tile_size, memory_budget)
+        self.directory = pyramid_dir(image_path, cache_dir or default_cache_dir(), tile_size)
+        size = QImageReader(image_path).size()
+        self._rect = QRectF(0, 0, max(size.width(), 0), max(size.height(), 0))
+        self.index = None
+        self.error = None
+        self.loader = None
+        self.builder = None
+        self._threads = []
+        self.destroyed.connect(partial(stop_threads, self._threads))
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.start()
+
+    def start(self):
+        # Builds the pyramid if there is none yet, else starts the tile loader; the threads
+        # run while the item is in a scene (see itemChange)
+        if self.index is None:
+            index = read_index(self.directory)
+            if index is not None:
+                self._set_index(index)
+            elif self.builder is None and self.error is None:
+                self.builder = PyramidBuilder(self.image_path, self.directory, self.tile_size)
+                self.builder.built.connect(self._built)
+                self.builder.failed.connect(self._build_failed)
+                self._threads.append(self.builder)
+                self.builder.start()
+        elif self.loader is None:
+            self._start_loader()
+
+    def stop(self):
+        # An interrupted build leaves no index behind and is started over by start()
+        stop_threads(self._threads)
+        self.builder = None
+        self.loader = None
+
+    def close(self):
+        self.stop()
+        self.cache.clear()
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSceneChange and value is None:
+            self.stop()
+        elif change == QGraphicsItem.ItemSceneHasChanged and value is not None:
+            self.start()
+        return super().itemChange(change, value)
+
+    def _built(self, index):
+        # Results of a builder stopped meanwhile are dropped
+        if self.sender() is self.builder:
+            self.builder = None
+            self._set_index(index)
+
+    def _build_failed(self, message):
+        if self.sender() is self.builder:
+            self.builder = None
+            self.error = message
+            self.failed.emit(message)
+
+    def _set_index(self, index):
+        self.index = index
+        self.prepareGeometryChange()
+        self._rect = QRectF(0, 0, index["width"], index["height"])
+        self._start_loader()
+        self.pyramid_ready.emit()
+        self.update()
+
+    def _start_loader(self):
+        self.loader = TileLoader(self.directory)
+        self.loader.loaded.connect(self._tile_loaded)
+        self._threads.append(self.loader)
+        self.loader.start()
+
+    def boundingRect(self):
+        return self._rect
+
+    def level_for(self, pixels_per_unit):
+        # Finest level whose pixels are no smaller than a screen pixel
+        levels = len(self.index["levels"])
+        if pixels_per_unit <= 0:
+            return levels - 1
+        return min(max(int(math.floor(math.log2(1.0 / pixels_per_unit))), 0), levels - 1)
+
+    def tile_rect(self, level, column, row):
+        # Tile rect in item coordinates
+        info = self.index["levels"][level]
+        fx = self.index["width"] / info["width"]
+        fy = self.index["height"] / info["height"]
+        size = self.tile_size
+        width = min(size, info["width"] - column * size)
+        height = min(size, info["height"] - row * size)
+        return QRectF(column * size * fx, row * size * fy, width * fx, height * fy)
+
+    def tiles_in(self, level, rect):
+        info = self.index["levels"][level]
+        fx = self.index["width"] / info["width"] * self.tile_size
+        fy = self.index["height"] / info["height"] * self.tile_size
+        c0 = max(int(rect.left() // fx), 0)
+        r0 = max(int(rect.top() // fy), 0)
+        c1 = min(int(rect.right() // fx), info["columns"] - 1)
+        r1 = min(int(rect.bottom() // fy), info["rows"] - 1)
+        return [(level, column, row) for row in range(r0, r1 + 1) for column in range(c0, c1 + 1)]
+
+    def paint(self, painter, option, widget=None):
+        if self.index is None:
+            return
+        visible = option.exposedRect.intersected(self._rect)
+        if visible.isEmpty():
+            return
+        level = self.level_for(option.levelOfDetailFromTransform(painter.worldTransform()))
+        coarsest = len(self.index["levels"]) - 1
+        wanted = []
+        for key in self.tiles_in(level, visible):
+            pixmap = self.cache.get(key)
+            if pixmap is None:
+                wanted.append(key)
+                self._draw_fallback(painter, key, coarsest)
+            else:
+                painter.drawPixmap(self.tile_rect(*key), pixmap, QRectF(pixmap.rect()))
+        if self.cache.get((coarsest, 0, 0)) is None:
+            wanted.append((coarsest, 0, 0))
+        if wanted and self.loader is not None:
+            self.loader.want(wanted)
+
+    def _draw_fallback(self, painter, key, coarsest):
+        # Part of the nearest coarser tile that is already in memory
+        level, column, row = key
+        target = self.tile_rect(*key)
+        for parent_level in range(level + 1, coarsest + 1):
+            shift = parent_level - level
+            parent = (parent_level, column >> shift, row >> shift)
+            pixmap = self.cache.get(parent)
+            if pixmap is None:
+                continue
+            parent_rect = self.tile_rect(*parent)
+            sx = pixmap.width() / parent_rect.width()
+            sy = pixmap.height() / parent_rect.height()
+            source = QRectF((target.left() - parent_rect.left()) * sx, (target.top() - parent_rect.top()) * sy,
+                            target.width() * sx, target.height() * sy)
+            painter.drawPixmap(target, pixmap, source)
+            return
+
+    def _tile_loaded(self, key, image):
+        self.cache.put(key, QPixmap.fromImage(image))
+        self.update(self.tile_rect(*key))
@@ -0,0 +1,212 @@
+import numpy as np
+from PySide2.QtCore import QEvent, QObject, QPointF, Qt
+from PySide2.QtGui import QBrush, QColor, QTransform
+from PySide2.QtWidgets import QGraphicsItem
+from shapeLibrary import points_to_polygon
+from pickerLayout import SELECTABLE, MOVABLE
+
+
+class ItemVirtualizer(QObject):
+    # Shows the rows of a ControlModel through a pool of recycled items. Only controls whose
+    # bounds intersect the view's visible rect (grown by `margin` viewports on every side)
+    # get an item; the rest live in the model only. Picking and selection go through the
+    # model so they stay correct for controls that currently have no item.
+    def __init__(self, scene, view, item_factory, margin=0.5, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.view = view
+        self.model = scene.model
+        self.item_factory = item_factory  # () -> PolygonItems
+        self.margin = margin
+        self.active = {}  # control id -> item
+        self.pool = []
+        self.created = 0
+        self._polygons = {}
+        self._bounds = None
+        self._view_state = None
+        self._syncing = False
+        self.model.listeners.append(self.model_changed)
+        self.scene.selectionChanged.connect(self.selection_changed)
+        self.view.viewport().installEventFilter(self)
+
+    def close(self):
+        self.view.viewport().removeEventFilter(self)
+        self.scene.selectionChanged.disconnect(self.selection_changed)
+        self.model.listeners.remove(self.model_changed)
+        for item in list(self.active.values()) + self.pool:
+            if item.scene() is self.scene:
+                self.scene.removeItem(item)
+        self.active = {}
+        self.pool = []
+
+    def eventFilter(self, watched, event):
+        # Rebinds before the view paints whenever the visible rect moved
+        if event.type() in (QEvent.Paint, QEvent.Resize, QEvent.Show):
+            state = (self.view.viewportTransform(), self.view.viewport().size())
+            if state != self._view_state:
+                self._view_state = state
+                self.refresh()
+        return False
+
+    def visible_rect(self):
+        rect = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        dx, dy = rect.width() * self.margin, rect.height() * self.margin
+        return rect.adjusted(-dx, -dy, dx, dy)
+
+    def bounds(self):
+        if self._bounds is None:
+            self._bounds = self.model.bounds()
+        return self._bounds
+
+    def rows_in_rect(self, left, top, right, bottom):
+        bounds = self.bounds()
+        return np.flatnonzero((bounds[:, 2] >= left) & (bounds[:, 0] <= right)
+                              & (bounds[:, 3] >= top) & (bounds[:, 1] <= bottom))
+
+    def polygon(self, shape_id):
+        polygon = self._polygons.get(shape_id)
+        if polygon is None:
+            polygon = self._polygons[shape_id] = points_to_polygon(self.model.shapes[shape_id])
+        return polygon
+
+    def refresh(self):
+        rect = self.visible_rect()
+        rows = self.rows_in_rect(rect.left(), rect.top(), rect.right(), rect.bottom())
+        visible = dict(zip(self.model.ids[rows].tolist(), rows.tolist()))
+        self._syncing = True
+        try:
+            for control_id in [control_id for control_id in self.active if control_id not in visible]:
+                self.release(self.active.pop(control_id))
+            for control_id, row in visible.items():
+                if control_id not in self.active:
+                    self.active[control_id] = self.bind(self.acquire(), row)
+        finally:
+            self._syncing = False
+
+    def acquire(self):
+        if self.pool:
+            item = self.pool.pop()
+        else:
+            item = self.item_factory()
+            item.virtual = True
+            self.scene.addItem(item)
+            self.created += 1
+        item.setVisible(True)
+        return item
+
+    def release(self, item):
+        if getattr(self.view, "hovered_item", None) is item:
+            self.view.set_hovered_item(None)
+        if item.isSelected():
+            item.setSelected(False)
+        item.setVisible(False)
+        self.pool.append(item)
+
+    def bind(self, item, row):
+        model = self.model
+        item.control_id = int(model.ids[row])
+        shape_id = int(model.shape[row])
+        if getattr(item, "virtual_shape", None) != shape_id:
+            item.setPolygon(self.polygon(shape_id))
+            item.virtual_shape = shape_id
+        x, y = model.pos[row]
+        if item.x() != x or item.y() != y:
+            item.setPos(x, y)
+        color = int(model.color[row])
+        if item._brush.color().rgba() != color:
+            item.setBrush(QBrush(QColor.fromRgba(color)))
+        item.setRotation(float(model.rotation[row]))
+        item.setScale(float(model.scale[row]))
+        item.control_name = model.names[row]
+        item.control_flags = int(model.flags[row])
+        item.setFlag(QGraphicsItem.ItemIsMovable, bool(item.control_flags & MOVABLE))
+        item.setFlag(QGraphicsItem.ItemIsSelectable, bool(item.control_flags & SELECTABLE))
+        selected = bool(model.selected[row])
+        if item.isSelected() != selected:
+            item.setSelected(selected)
+        return item
+
+    def model_changed(self, event, ids):
+        if event == "selected":
+            if not self._syncing:
+                self.rebind(self.active)
+            return
+        self._bounds = None
+        if event == "removed":
+            self._syncing = True
+            try:
+                for control_id in ids.tolist():
+                    item = self.active.pop(control_id, None)
+                    if item is not None:
+                        self.release(item)
+            finally:
+                self._syncing = False
+        elif event == "changed":
+            self.rebind([control_id for control_id in ids.tolist() if control_id in self.active])
+        # Added rows and moved bounds are picked up on the next paint
+        self._view_state = None
+        self.view.viewport().update()
+
+    def rebind(self, ids):
+        ids = list(ids)
+        if not ids:
+            return
+        self._syncing = True
+        try:
+            for control_id, row in zip(ids, self.model.rows(ids).tolist()):
+                self.bind(self.active[control_id], row)
+        finally:
+            self._syncing = False
+
+    def selection_changed(self):
+        # Selection of items with a row is written to the model; rows without an item keep theirs
+        if self._syncing:
+            return
+        try:
+            selected = [control_id for control_id, item in self.active.items() if item.isSelected()]
+        except RuntimeError:
+            return  # the scene is being destroyed and its items are already gone
+        deselected = [control_id for control_id, item in self.active.items() if not item.isSelected()]
+        model = self.model
+        self._syncing = True
+        try:
+            if selected:
+                model.selected[model.rows(selected)] = True
+            if deselected:
+                model.selected[model.rows(deselected)] = False
+        finally:
+            self._syncing = False
+
+    def deselect_hidden(self):
+        # Deselects every row that has no item; rows with an item keep their item's state
+        model = self.model
+        rows = model.rows(list(self.active)) if self.active else np.zeros(0, dtype=np.int64)
+        hidden = model.selected[:model.count].copy()
+        hidden[rows] = False
+        if not hidden.any():
+            return
+        model.selected[:model.count][hidden] = False
+        self._syncing = True
+        try:
+            model.notify("selected", model.ids[:model.count][hidden])
+        finally:
+            self._syncing = False
+
+    def pick(self, scene_pos):
+        # Control under scene_pos by exact outline test, with or without an item; where
+        # controls overlap the last row wins
+        x, y = scene_pos.x(), scene_pos.y()
+        rows = self.rows_in_rect(x, y, x, y)
+        model = self.model
+        for row in rows[::-1].tolist():
+            transform = QTransform()
+            transform.translate(*model.pos[row])
+            transform.rotate(float(model.rotation[row]))
+            transform.scale(float(model.scale[row]), float(model.scale[row]))
+            local = transform.inverted()[0].map(QPointF(x, y))
+            if self.polygon(int(model.shape[row])).containsPoint(local, Qt.OddEvenFill):
+                return int(model.ids[row])
+        return None
+
+    def ids_in_rect(self, rect, contained=False):
+        return self.model.ids_in_rect(rect.left(), rect.top(), rect.right(), rect.bottom(), contained)
@@ -0,0 +1,45 @@
+import numpy as np
+from PySide2.QtCore import QObject, QTimer, Signal
+
+
+class MoveDispatcher(QObject):
+    # Collects controls that moved and reports them at most once per frame as one batch.
+    # Items call mark() from itemChange; dragging 500 controls is then one `moved` emit per
+    # frame instead of 500 callbacks. Anything that needs up-to-date positions right now
+    # (picking, the end of a drag) calls flush().
+    moved = Signal(object, object, object)  # ids (int64), positions (float64 N x 2), items
+
+    def __init__(self, frame_ms=16, parent=None):
+        super().__init__(parent)
+        self._dirty = {}  # item -> None, keeps first-moved order
+        self.emitted = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def __len__(self):
+        return len(self._dirty)
+
+    def mark(self, item):
+        self._dirty[item] = None
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def discard(self, item):
+        self._dirty.pop(item, None)
+
+    def flush(self):
+        self._timer.stop()
+        if not self._dirty:
+            return
+        items = list(self._dirty)
+        self._dirty = {}
+        ids = np.fromiter((item.control_id for item in items), dtype=np.int64, count=len(items))
+        positions = np.empty((len(items), 2), dtype=np.float64)
+        for row, item in enumerate(items):
+            pos = item.scenePos()
+            positions[row, 0] = pos.x()
+            positions[row, 1] = pos.y()
+        self.emitted += 1
+        self.moved.emit(ids, positions, items)
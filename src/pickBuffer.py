@@ -0,0 +1,59 @@
+import numpy as np
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QBrush, QColor, QImage, QPainter
+
+
+class PickBuffer:
+    # Off-screen id image. Every pickable shape is filled, without antialiasing, in a colour
+    # that encodes its index + 1, later shapes over earlier ones, so "what is under this
+    # pixel" is a single array read however many shapes overlap there. Rendering is the
+    # expensive part: owners call render() only when `key` (geometry revision, transform,
+    # size...) differs from the one the buffer was built for.
+    def __init__(self):
+        self.pixels = None  # (height, width) uint32 index + 1 per pixel, 0 = nothing
+        self.targets = []
+        self.key = None
+        self.renders = 0
+
+    def valid(self, key):
+        return self.pixels is not None and key == self.key
+
+    def invalidate(self):
+        self.key = None
+
+    def render(self, size, shapes, key=None):
+        # shapes: (target, polygon, transform) bottom first; transform maps the polygon to
+        # buffer pixels. targets are what at() and in_rect() return.
+        image = QImage(size, QImage.Format_RGB32)
+        image.fill(0)
+        targets = []
+        painter = QPainter(image)
+        painter.setPen(Qt.NoPen)
+        for target, polygon, transform in shapes:
+            targets.append(target)
+            index = len(targets)
+            painter.setBrush(QBrush(QColor((index >> 16) & 0xFF, (index >> 8) & 0xFF, index & 0xFF)))
+            painter.setTransform(transform)
+            painter.drawPolygon(polygon)
+        painter.end()
+        rows = np.frombuffer(image.constBits(), dtype=np.uint32).reshape(image.height(), image.bytesPerLine() // 4)
+        self.pixels = rows[:, :image.width()] & 0xFFFFFF  # a copy: the image can go
+        self.targets = targets
+        self.key = key
+        self.renders += 1
+
+    def at(self, x, y):
+        pixels = self.pixels
+        if pixels is None or not (0 <= y < pixels.shape[0] and 0 <= x < pixels.shape[1]):
+            return None
+        index = int(pixels[y, x])
+        return self.targets[index - 1] if index else None
+
+    def in_rect(self, left, top, right, bottom):
+        # Targets with at least one pixel inside the rect (inclusive), bottom first
+        pixels = self.pixels
+        if pixels is None:
+            return []
+        indices = np.unique(pixels[max(top, 0):max(bottom + 1, 0), max(left, 0):max(right + 1, 0)])
+        targets = self.targets
+        return [targets[index - 1] for index in indices.tolist() if index]
@@ -0,0 +1,283 @@
+import numpy as np
+from PySide2.QtCore import Qt, QRectF, QPointF
+from PySide2.QtGui import QBrush, QColor, QPainter, QPen, QPolygonF
+from PySide2.QtWidgets import QGraphicsItem
+
+
+class PickerLayer(QGraphicsItem):
+    # Draws many picker controls from one item. Controls are stored struct-of-arrays
+    # (id, shape, position, color, state) and share one prebuilt QPolygonF per shape.
+    HOVERED = 1
+    SELECTED = 2
+
+    def __init__(self, parent=None, capacity=1024):
+        super().__init__(parent)
+        self.shapes = []
+        self.shape_radius = np.zeros(0, dtype=np.float64)
+        self.count = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.shape = np.zeros(capacity, dtype=np.int32)
+        self.pos = np.zeros((capacity, 2), dtype=np.float64)
+        self.color = np.zeros(capacity, dtype=np.uint32)
+        self.state = np.zeros(capacity, dtype=np.uint8)
+        self.row_of_id = np.full(capacity, -1, dtype=np.int64)
+        self.next_id = 0
+        self.hovered_id = -1
+        self._bounds = QRectF()
+        self._brushes = {}
+        self._outline_pens = {
+            self.HOVERED: QPen(QColor("green"), 2),
+            self.SELECTED: QPen(QColor("yellow"), 2),
+            self.HOVERED | self.SELECTED: QPen(QColor("orange"), 2),
+        }
+        self.setAcceptHoverEvents(True)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    # --- shapes -------------------------------------------------------------------------
+
+    def register_shape(self, polygon):
+        # Returns the shape id; polygon should be centred on the control origin
+        self.shapes.append(QPolygonF(polygon))
+        rect = polygon.boundingRect()
+        radius = max(abs(rect.left()), abs(rect.right()), abs(rect.top()), abs(rect.bottom()))
+        self.shape_radius = np.append(self.shape_radius, radius)
+        return len(self.shapes) - 1
+
+    # --- bulk editing -------------------------------------------------------------------
+
+    def _reserve(self, count):
+        capacity = len(self.ids)
+        if count <= capacity:
+            return
+        capacity = max(count, capacity * 2)
+        for name in ("ids", "shape", "color", "state"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+        grown = np.zeros((capacity, 2), dtype=self.pos.dtype)
+        grown[:self.count] = self.pos[:self.count]
+        self.pos = grown
+
+    def _reserve_ids(self, count):
+        if count <= len(self.row_of_id):
+            return
+        grown = np.full(max(count, len(self.row_of_id) * 2), -1, dtype=np.int64)
+        grown[:len(self.row_of_id)] = self.row_of_id
+        self.row_of_id = grown
+
+    def rows(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = self.row_of_id[ids]
+        if (rows < 0).any():
+            raise KeyError(f"unknown control ids: {ids[rows < 0].tolist()}")
+        return rows
+
+    def add_controls(self, shapes, positions, colors):
+        # shapes: (n,) shape ids, positions: (n, 2), colors: (n,) 0xAARRGGBB; returns the new control ids
+        shapes = np.asarray(shapes, dtype=np.int32)
+        count = len(shapes)
+        start = self.count
+        self._reserve(start + count)
+        new_ids = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        self._reserve_ids(self.next_id + count)
+        self.next_id += count
+
+        self.ids[start:start + count] = new_ids
+        self.shape[start:start + count] = shapes
+        self.pos[start:start + count] = np.asarray(positions, dtype=np.float64).reshape(count, 2)
+        self.color[start:start + count] = np.asarray(colors, dtype=np.uint32)
+        self.state[start:start + count] = 0
+        self.row_of_id[new_ids] = np.arange(start, start + count)
+        self.count += count
+        self.update_bounds()
+        return new_ids
+
+    def update_controls(self, ids, positions=None, colors=None, shapes=None):
+        rows = self.rows(ids)
+        if positions is not None:
+            self.pos[rows] = np.asarray(positions, dtype=np.float64).reshape(len(rows), 2)
+        if colors is not None:
+            self.color[rows] = np.asarray(colors, dtype=np.uint32)
+        if shapes is not None:
+            self.shape[rows] = np.asarray(shapes, dtype=np.int32)
+        if positions is not None or shapes is not None:
+            self.update_bounds()
+        else:
+            self.update()
+
+    def remove_controls(self, ids):
+        rows = self.rows(ids)
+        keep = np.ones(self.count, dtype=bool)
+        keep[rows] = False
+        kept = int(keep.sum())
+        self.row_of_id[self.ids[rows]] = -1
+        for name in ("ids", "shape", "color", "state"):
+            array = getattr(self, name)
+            array[:kept] = array[:self.count][keep]
+        self.pos[:kept] = self.pos[:self.count][keep]
+        self.count = kept
+        self.row_of_id[self.ids[:kept]] = np.arange(kept)
+        if self.hovered_id >= 0 and self.row_of_id[self.hovered_id] < 0:
+            self.hovered_id = -1
+        self.update_bounds()
+
+    def clear_controls(self):
+        self.remove_controls(self.ids[:self.count].copy())
+
+    # --- state --------------------------------------------------------------------------
+
+    def set_state(self, ids, flag, on=True):
+        rows = self.rows(ids)
+        if on:
+            self.state[rows] |= flag
+        else:
+            self.state[rows] &= ~np.uint8(flag)
+        self.update()
+
+    def select(self, ids, add=False):
+        if not add:
+            self.state[:self.count] &= ~np.uint8(self.SELECTED)
+        if len(ids):
+            self.state[self.rows(ids)] |= self.SELECTED
+        self.update()
+
+    def selected_ids(self):
+        return self.ids[:self.count][(self.state[:self.count] & self.SELECTED) != 0]
+
+    def set_hovered(self, control_id):
+        if control_id == self.hovered_id:
+            return
+        for previous, on in ((self.hovered_id, False), (control_id, True)):
+            if previous >= 0:
+                row = self.row_of_id[previous]
+                if on:
+                    self.state[row] |= self.HOVERED
+                else:
+                    self.state[row] &= ~np.uint8(self.HOVERED)
+                self.update(self.control_rect(row))
+        self.hovered_id = control_id
+
+    # --- geometry and picking -----------------------------------------------------------
+
+    def control_rect(self, row):
+        radius = self.shape_radius[self.shape[row]] + 2
+        x, y = self.pos[row]
+        return QRectF(x - radius, y - radius, 2 * radius, 2 * radius)
+
+    def update_bounds(self):
+        self.prepareGeometryChange()
+        if self.count == 0:
+            self._bounds = QRectF()
+        else:
+            pos = self.pos[:self.count]
+            radius = self.shape_radius[self.shape[:self.count]] + 2
+            left, top = (pos - radius[:, None]).min(axis=0)
+            right, bottom = (pos + radius[:, None]).max(axis=0)
+            self._bounds = QRectF(left, top, right - left, bottom - top)
+        self.update()
+
+    def boundingRect(self):
+        return self._bounds
+
+    def rows_in_rect(self, rect):
+        pos = self.pos[:self.count]
+        radius = self.shape_radius[self.shape[:self.count]]
+        mask = ((pos[:, 0] + radius >= rect.left()) & (pos[:, 0] - radius <= rect.right())
+                & (pos[:, 1] + radius >= rect.top()) & (pos[:, 1] - radius <= rect.bottom()))
+        return np.flatnonzero(mask)
+
+    def controls_in_rect(self, rect):
+        return self.ids[self.rows_in_rect(rect)]
+
+    def control_at(self, point):
+        # Topmost control (last added) whose shape contains point, or -1
+        x, y = point.x(), point.y()
+        rows = self.rows_in_rect(QRectF(x, y, 0, 0))
+        for row in rows[::-1]:
+            local = QPointF(x - self.pos[row, 0], y - self.pos[row, 1])
+            if self.shapes[self.shape[row]].containsPoint(local, Qt.OddEvenFill):
+                return int(self.ids[row])
+        return -1
+
+    # --- painting and events ------------------------------------------------------------
+
+    def _brush(self, color):
+        brush = self._brushes.get(color)
+        if brush is None:
+            brush = self._brushes[color] = QBrush(QColor.fromRgba(int(color)))
+        return brush
+
+    def paint(self, painter, option, widget=None):
+        rows = self.rows_in_rect(option.exposedRect)
+        if not len(rows):
+            return
+        # Rows are drawn in insertion order so stacking matches control_at(); brushes and
+        # pens are only switched when the colour or state actually changes
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        shapes = self.shapes
+        shape = self.shape
+        color = self.color
+        state = self.state
+        pos = self.pos
+        last_color = None
+        last_state = 0
+        x = y = 0.0
+
+        for row in rows.tolist():
+            row_color = color[row]
+            if row_color != last_color:
+                painter.setBrush(self._brush(row_color))
+                last_color = row_color
+            row_state = state[row]
+            if row_state != last_state:
+                painter.setPen(self._outline_pens.get(row_state & (self.HOVERED | self.SELECTED), Qt.NoPen))
+                last_state = row_state
+            next_x, next_y = pos[row]
+            painter.translate(next_x - x, next_y - y)
+            x, y = next_x, next_y
+            painter.drawPolygon(shapes[shape[row]])
+        painter.translate(-x, -y)
+
+    def hoverMoveEvent(self, event):
+        self.set_hovered(self.control_at(event.pos()))
+        super().hoverMoveEvent(event)
+
+    def hoverLeaveEvent(self, event):
+        self.set_hovered(-1)
+        super().hoverLeaveEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            super().mousePressEvent(event)
+            return
+        control_id = self.control_at(event.pos())
+        # Through int: Qt flag operators raise TypeError under PySide2 5.13 on Python 3.11
+        add = bool(int(event.modifiers()) & int(Qt.ControlModifier))
+        self.select([control_id] if control_id >= 0 else [], add=add)
+        event.accept()
+
+
+if __name__ == "__main__":
+    import sys
+    from PySide2.QtWidgets import QApplication, QGraphicsScene, QGraphicsView
+    from shapeLibrary import get_polygon
+
+    app = QApplication(sys.argv)
+    scene = QGraphicsScene()
+    layer = PickerLayer()
+    star = layer.register_shape(get_polygon("star", 5, 20))
+    square = layer.register_shape(get_polygon("rounded_rect", 30, 30, 6))
+
+    count = 5000
+    rng = np.random.default_rng(0)
+    layer.add_controls(rng.integers(0, 2, count), rng.uniform(0, 4000, (count, 2)),
+                       rng.choice([0xFF3050E0, 0xFFE05030, 0xFF30C060], count))
+    scene.addItem(layer)
+
+    view = QGraphicsView(scene)
+    view.setWindowTitle("Picker Layer Example")
+    view.resize(800, 600)
+    view.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,244 @@
+import json
+import mmap
+import struct
+import numpy as np
+from shapeLibrary import points_to_polygon
+
+
+# Binary picker layout (.upk), little-endian:
+#   header    see HEADER below
+#   shapes    SHAPE_DTYPE[shape_count]        vertex range and bounds per shape
+#   vertices  float32[vertex_count, 2]        all shape outlines, contiguous
+#   cells     uint32[cells_x * cells_y + 1]   prefix offsets into controls, row-major cells
+#   controls  CONTROL_DTYPE[control_count]    sorted by grid cell
+#   names     utf-8 blob addressed by CONTROL_DTYPE name_offset/name_length
+# Controls are bucketed into a coarse grid so a viewport query only touches the cell table
+# and the controls of the cells it overlaps.
+
+MAGIC = b"UPKL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIffffII6Q")
+
+SHAPE_DTYPE = np.dtype([
+    ("vertex_start", "<u4"), ("vertex_count", "<u4"),
+    ("left", "<f4"), ("top", "<f4"), ("right", "<f4"), ("bottom", "<f4"),
+])
+
+CONTROL_DTYPE = np.dtype([
+    ("id", "<u4"), ("shape", "<u4"), ("x", "<f4"), ("y", "<f4"),
+    ("color", "<u4"), ("flags", "<u4"), ("name_offset", "<u4"), ("name_length", "<u4"),
+])
+
+SELECTABLE = 1
+MOVABLE = 2
+
+
+class LayoutError(Exception):
+    pass
+
+
+def write_layout(path, shapes, positions, shape_ids, colors, flags=None, names=None, ids=None, cell_size=256.0):
+    # shapes: list of (n, 2) arrays in control-local coordinates; everything else is per control
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+    count = len(positions)
+    shape_ids = np.asarray(shape_ids, dtype=np.uint32)
+    colors = np.asarray(colors, dtype=np.uint32)
+    flags = np.full(count, SELECTABLE | MOVABLE, dtype=np.uint32) if flags is None else np.asarray(flags, dtype=np.uint32)
+    ids = np.arange(count, dtype=np.uint32) if ids is None else np.asarray(ids, dtype=np.uint32)
+    names = [""] * count if names is None else list(names)
+
+    shape_table = np.zeros(len(shapes), dtype=SHAPE_DTYPE)
+    outlines = [np.asarray(points, dtype=np.float32).reshape(-1, 2) for points in shapes]
+    vertex_counts = np.array([len(points) for points in outlines], dtype=np.uint32)
+    shape_table["vertex_count"] = vertex_counts
+    shape_table["vertex_start"] = np.concatenate(([0], np.cumsum(vertex_counts)[:-1])) if len(outlines) else []
+    if outlines:
+        minimum = np.array([points.min(axis=0) for points in outlines])
+        maximum = np.array([points.max(axis=0) for points in outlines])
+        shape_table["left"], shape_table["top"] = minimum[:, 0], minimum[:, 1]
+        shape_table["right"], shape_table["bottom"] = maximum[:, 0], maximum[:, 1]
+    vertices = np.concatenate(outlines) if outlines else np.zeros((0, 2), dtype=np.float32)
+
+    if count:
+        origin_x, origin_y = positions.min(axis=0)
+        cells_x, cells_y = (np.floor((positions.max(axis=0) - (origin_x, origin_y)) / cell_size) + 1).astype(int)
+    else:
+        origin_x = origin_y = 0.0
+        cells_x = cells_y = 1
+    cell = np.floor((positions - (origin_x, origin_y)) / cell_size).astype(np.int64)
+    cell_index = cell[:, 1] * cells_x + cell[:, 0] if count else np.zeros(0, dtype=np.int64)
+    order = np.argsort(cell_index, kind="stable")
+    cell_table = np.zeros(cells_x * cells_y + 1, dtype=np.uint32)
+    cell_table[1:] = np.cumsum(np.bincount(cell_index, minlength=cells_x * cells_y))
+
+    encoded = [name.encode("utf-8") for name in names]
+    name_lengths = np.array([len(name) for name in encoded], dtype=np.uint32)
+    name_offsets = np.concatenate(([0], np.cumsum(name_lengths)[:-1])).astype(np.uint32) if count else name_lengths
+    name_blob = b"".join(encoded)
+
+    controls = np.zeros(count, dtype=CONTROL_DTYPE)
+    controls["id"] = ids
+    controls["shape"] = shape_ids
+    controls["x"] = positions[:, 0]
+    controls["y"] = positions[:, 1]
+    controls["color"] = colors
+    controls["flags"] = flags
+    controls["name_offset"] = name_offsets
+    controls["name_length"] = name_lengths
+    controls = controls[order]
+
+    shape_offset = HEADER.size
+    vertex_offset = shape_offset + shape_table.nbytes
+    cell_offset = vertex_offset + vertices.nbytes
+    control_offset = cell_offset + cell_table.nbytes
+    name_offset = control_offset + controls.nbytes
+    header = HEADER.pack(MAGIC, VERSION, 0, len(shapes), count, len(vertices),
+                         cell_size, origin_x, origin_y, 0.0, cells_x, cells_y,
+                         shape_offset, vertex_offset, cell_offset, control_offset, name_offset, len(name_blob))
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(shape_table.tobytes())
+        file.write(vertices.tobytes())
+        file.write(cell_table.tobytes())
+        file.write(controls.tobytes())
+        file.write(name_blob)
+
+
+class PickerLayout:
+    # Read-only, memory-mapped view of a .upk file. All arrays are zero-copy NumPy views
+    # into the mapping; pages are only read when a query touches them.
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise LayoutError(f"{path}: file too small for a picker layout")
+        (magic, version, _, shape_count, control_count, vertex_count,
+         self.cell_size, origin_x, origin_y, _, self.cells_x, self.cells_y,
+         shape_offset, vertex_offset, cell_offset, control_offset,
+         name_offset, name_size) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise LayoutError(f"{path}: not a picker layout")
+        if version != VERSION:
+            self.close()
+            raise LayoutError(f"{path}: unsupported layout version {version}")
+        self.origin = (origin_x, origin_y)
+        self.shapes = np.frombuffer(self._map, SHAPE_DTYPE, shape_count, shape_offset)
+        self.vertices = np.frombuffer(self._map, np.float32, vertex_count * 2, vertex_offset).reshape(-1, 2)
+        self.cells = np.frombuffer(self._map, np.uint32, self.cells_x * self.cells_y + 1, cell_offset)
+        self.controls = np.frombuffer(self._map, CONTROL_DTYPE, control_count, control_offset)
+        self._name_offset = name_offset
+        self._name_size = name_size
+        self._polygons = {}
+        # Largest distance from a control origin to its outline, used to widen cell queries
+        self.shape_extent = float(max((np.abs(self.shapes[field]).max() for field in ("left", "top", "right", "bottom")),
+                                      default=0.0)) if shape_count else 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.controls)
+
+    def close(self):
+        # Views must be dropped before the mapping can be closed
+        self.shapes = self.vertices = self.cells = self.controls = None
+        self._polygons = {}
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def shape_points(self, shape_id):
+        shape = self.shapes[shape_id]
+        start = int(shape["vertex_start"])
+        return self.vertices[start:start + int(shape["vertex_count"])]
+
+    def shape_polygon(self, shape_id):
+        polygon = self._polygons.get(shape_id)
+        if polygon is None:
+            polygon = self._polygons[shape_id] = points_to_polygon(self.shape_points(shape_id))
+        return polygon
+
+    def control_name(self, row):
+        control = self.controls[row]
+        start = self._name_offset + int(control["name_offset"])
+        return self._map[start:start + int(control["name_length"])].decode("utf-8")
+
+    def rows_in_rect(self, left, top, right, bottom):
+        # Rows of controls whose bounds intersect the rect; only overlapping cells are read
+        if not len(self.controls):
+            return np.zeros(0, dtype=np.int64)
+        margin = self.shape_extent
+        size = self.cell_size
+        origin_x, origin_y = self.origin
+        cx0 = max(int(np.floor((left - margin - origin_x) / size)), 0)
+        cy0 = max(int(np.floor((top - margin - origin_y) / size)), 0)
+        cx1 = min(int(np.floor((right + margin - origin_x) / size)), self.cells_x - 1)
+        cy1 = min(int(np.floor((bottom + margin - origin_y) / size)), self.cells_y - 1)
+        if cx0 > cx1 or cy0 > cy1:
+            return np.zeros(0, dtype=np.int64)
+
+        spans = []
+        for cy in range(cy0, cy1 + 1):
+            # Cells of one grid row are contiguous, so each row is a single slice
+            start = int(self.cells[cy * self.cells_x + cx0])
+            end = int(self.cells[cy * self.cells_x + cx1 + 1])
+            if end > start:
+                spans.append(np.arange(start, end))
+        if not spans:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.concatenate(spans)
+
+        controls = self.controls[rows]
+        shapes = self.shapes[controls["shape"]]
+        mask = ((controls["x"] + shapes["right"] >= left) & (controls["x"] + shapes["left"] <= right)
+                & (controls["y"] + shapes["bottom"] >= top) & (controls["y"] + shapes["top"] <= bottom))
+        return rows[mask]
+
+
+def read_json_polygons(json_path):
+    with open(json_path) as file:
+        data = json.load(file)
+    return [np.asarray(polygon, dtype=np.float64).reshape(-1, 2) for polygon in data.get("polybar", [])]
+
+
+def convert_json(json_path, layout_path, color=0xFF0000FF, cell_size=256.0):
+    # polygons.json stores absolute outlines; each becomes a shape centred on its bounds
+    # and a control placed at that centre.
+    polygons = read_json_polygons(json_path)
+    shapes = []
+    positions = []
+    for points in polygons:
+        centre = (points.min(axis=0) + points.max(axis=0)) / 2
+        shapes.append(points - centre)
+        positions.append(centre)
+    count = len(polygons)
+    write_layout(layout_path, shapes, np.asarray(positions).reshape(-1, 2), np.arange(count),
+                 np.full(count, color, dtype=np.uint32), cell_size=cell_size)
+    return count
+
+
+def populate_layer(layer, layout, rect=None):
+    # Adds the controls of layout (or only those intersecting rect) to a PickerLayer
+    shape_map = [layer.register_shape(layout.shape_polygon(shape_id)) for shape_id in range(len(layout.shapes))]
+    if rect is None:
+        rows = np.arange(len(layout))
+    else:
+        rows = layout.rows_in_rect(rect.left(), rect.top(), rect.right(), rect.bottom())
+    controls = layout.controls[rows]
+    positions = np.column_stack((controls["x"], controls["y"]))
+    return layer.add_controls(np.asarray(shape_map, dtype=np.int32)[controls["shape"]], positions, controls["color"])
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        print("usage: pickerLayout.py polygons.json picker.upk")
+        sys.exit(1)
+    print(f"converted {convert_json(sys.argv[1], sys.argv[2])} polygons")
@@ -1,18 +1,113 @@
 
 import sys
-from math import sin, cos, pi
+from collections import OrderedDict
+import numpy as np
 from PySide2.QtWidgets import (QApplication, QGraphicsScene, QGraphicsView, QGraphicsPolygonItem, QGraphicsItem, QVBoxLayout, QWidget
                                 ,QStyleOptionGraphicsItem, QMainWindow, QScrollArea,QSpinBox,QGraphicsRectItem,QStyle
-                                ,QMenu,QDialog,QPushButton,QAction )
-from PySide2.QtCore import QPointF, QRectF, Qt,QRectF,QSizeF,QPoint
-from PySide2.QtGui import QPolygonF, QBrush, QColor, QPainter, QPen
+                                ,QMenu,QDialog,QPushButton,QAction,QRubberBand )
+from PySide2.QtCore import QPointF, QRectF, Qt,QRectF,QSizeF,QPoint,QRect
+from PySide2.QtGui import (QPolygonF, QBrush, QColor, QPainter, QPen, QPainterPath, QKeySequence, QImage, QPixmap,
+                           QTransform)
+from spatialIndex import SpatialIndex
+from shapeLibrary import get_polygon, points_to_polygon
+from pickerLayout import SELECTABLE, MOVABLE, write_layout
+from sceneLoader import SceneLoader
+from moveDispatcher import MoveDispatcher
+from controlModel import ControlModel, new_control_id, stored_control_ids
+from editJournal import EditJournal, MoveEdit, ColumnEdit, RowsEdit
+from frameProfiler import ProfiledViewMixin
+
+
+def control_held(event):
+    # Through int: Qt flag operators raise TypeError under PySide2 5.13 on Python 3.11
+    return bool(int(event.modifiers()) & int(Qt.ControlModifier))
+
+
+class PolygonStyle:
+    # Pens shared by every PolygonItems, one outline pen per state (None: no outline), so
+    # paint and hover never construct Qt objects
+    IDLE = 0
+    HOVERED = 1
+    SELECTED = 2
+    OUTLINE_WIDTH = 2
+
+    def __init__(self):
+        self.fill_pen = QPen(Qt.black)  # the default item pen
+        self.outline_pens = {
+            self.IDLE: None,
+            self.HOVERED: QPen(QColor("green"), self.OUTLINE_WIDTH),
+            self.SELECTED: QPen(QColor("yellow"), self.OUTLINE_WIDTH),
+            self.HOVERED | self.SELECTED: QPen(QColor("green"), self.OUTLINE_WIDTH),
+        }
+        self.no_brush = QBrush(Qt.NoBrush)
+        self.no_outline_color = QColor(Qt.transparent)
+
+
+class SpriteCache:
+    # Rendered controls per (look, device scale, antialiasing). Identical stars are
+    # rasterized once per zoom level and then blitted, which is far cheaper than filling
+    # and stroking an antialiased outline per item per frame.
+    MAX_SIZE = 256  # longest sprite side in device pixels; larger controls draw directly
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._sprites = OrderedDict()
+        self.renders = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def clear(self):
+        self._sprites.clear()
+
+    def sprite(self, item, scale, antialias):
+        # (pixmap, device offset of its top left from the item origin), or None when too big
+        key = (item.sprite_key(), scale, antialias)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+        margin = max(item._pen.widthF(), PolygonStyle.OUTLINE_WIDTH, 1.0)
+        rect = item._polygon.boundingRect().adjusted(-margin, -margin, margin, margin)
+        left, top = int(np.floor(rect.left() * scale)), int(np.floor(rect.top() * scale))
+        width, height = int(np.ceil(rect.right() * scale)) - left, int(np.ceil(rect.bottom() * scale)) - top
+        if max(width, height) > self.MAX_SIZE:
+            return None
+        image = QImage(max(width, 1), max(height, 1), QImage.Format_ARGB32_Premultiplied)
+        image.fill(0)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing, antialias)
+        painter.translate(-left, -top)
+        painter.scale(scale, scale)
+        item.draw(painter)
+        painter.end()
+        sprite = (QPixmap.fromImage(image), left, top)
+        self._sprites[key] = sprite
+        self.renders += 1
+        while len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
 
 
 class PolygonItems(QGraphicsPolygonItem):
+    style = PolygonStyle()
+    sprites = SpriteCache()
+
     def __init__(self, num_points=5, radius=50):
         self.num_points = num_points
         self.radius = radius
-        self.edge_color = QColor("transparent")
+        self.state = PolygonStyle.IDLE
+        self.control_name = ""
+        self.control_id = new_control_id()
+        self.control_flags = SELECTABLE | MOVABLE  # as loaded; written back by save_layout
+        self.virtual = False  # pooled view of a model row, managed by an ItemVirtualizer
+        self._polygon = QPolygonF()
+        self._outline = None
+        self._brush = QBrush()
+        self._pen = self.style.fill_pen
+        self._outline_pen = None  # pen of the current outline, None when there is none
+        self._edge_color = None  # set through edge_color; cleared by the next state change
+        self._sprite_key = None
         super().__init__()
         self.update_polygon()
         self.setBrush(QBrush(QColor("blue")))
@@ -20,63 +115,293 @@ class PolygonItems(QGraphicsPolygonItem):
         self.setFlag(QGraphicsItem.ItemSendsScenePositionChanges, True)  # Enable position change notifications
 
     def update_polygon(self):
-        star_polygon = QPolygonF()
-        for i in range(self.num_points * 2):
-            factor = 1.0 if i % 2 == 0 else 0.5
-            angle = (2 * pi * i) / (self.num_points * 2)
-            x = self.radius * factor * cos(angle)
-            y = self.radius * factor * sin(angle)
-            star_polygon.append(QPointF(x, y))
-        self.setPolygon(star_polygon)
+        # Outlines come from the shared shape library; identical stars share one QPolygonF
+        self.setPolygon(get_polygon("star", self.num_points, self.radius))
+
+    def setPolygon(self, polygon):
+        # Keep our own reference: polygon() returns a new wrapper on every call
+        self._polygon = QPolygonF(polygon)
+        self._outline = None
+        self._sprite_key = None
+        super().setPolygon(polygon)
+        self.update_spatial_index()
+        self.model_changed()
+
+    def setBrush(self, brush):
+        self._brush = QBrush(brush)
+        self._sprite_key = None
+        super().setBrush(brush)
+        self.model_changed()
+
+    def setPen(self, pen):
+        self._pen = QPen(pen)
+        self._sprite_key = None
+        super().setPen(pen)
+
+    def outline(self):
+        # Polygon points as an (n, 2) array, for the scene's control model
+        if self._outline is None:
+            self._outline = np.array([(point.x(), point.y()) for point in self._polygon], dtype=np.float32).reshape(-1, 2)
+        return self._outline
+
+    def model_changed(self):
+        # Call after changing control_name/control_flags of an item that is already in a scene
+        binding = getattr(self.scene(), "model_binding", None)
+        if binding is not None:
+            binding.item_changed(self)
+
+    @property
+    def edge_color(self):
+        if self._edge_color is not None:
+            return QColor(self._edge_color)
+        pen = self.style.outline_pens[self.state]
+        return pen.color() if pen is not None else QColor(self.style.no_outline_color)
+
+    @edge_color.setter
+    def edge_color(self, color):
+        # Outline colour until the next hover or selection change; transparent hides it
+        color = QColor(color)
+        self._edge_color = color
+        self._outline_pen = QPen(color, self.style.OUTLINE_WIDTH) if color.alpha() else None
+        self._sprite_key = None
+        self.update()
+
+    def spatial_index(self):
+        return getattr(self.scene(), "spatial_index", None)
+
+    def update_spatial_index(self):
+        index = self.spatial_index()
+        if index is not None:
+            index.update(self, self.sceneBoundingRect())
   
     def set_num_points(self, num_points):
         self.num_points = num_points
         self.update_polygon()
 
+    def sprite_key(self):
+        # Everything the look depends on; False when it cannot be cached (patterned brushes)
+        if self._sprite_key is None:
+            pen, outline = self._pen, self._outline_pen
+            self._sprite_key = self._brush.style() == Qt.SolidPattern and (
+                self.outline().tobytes(), self._brush.color().rgba(),
+                pen.color().rgba(), pen.widthF(), int(pen.style()),
+                None if outline is None else (outline.color().rgba(), outline.widthF()))
+        return self._sprite_key
+
     def paint(self, painter, option, widget=None):
-        # Create a new QStyleOptionGraphicsItem without the QStyle.State_Selected flag
-        no_selection_option = QStyleOptionGraphicsItem(option)
-        no_selection_option.state &= ~QStyle.State_Selected
-
-        super().paint(painter, no_selection_option, widget)
-        painter.setRenderHint(QPainter.Antialiasing)
-        pen = QPen(self.edge_color)
-        pen.setWidth(2)
-        painter.setPen(pen)
-        polyline = self.polygon()
-        polyline.append(polyline.at(0))
-        painter.drawPolyline(polyline)
+        # Unrotated controls are blitted from the shared sprite cache at device resolution;
+        # anything else (rotation, shear, huge zoom, patterned brush) is drawn directly.
+        # Antialiasing is a view render hint rather than set per item.
+        transform = painter.worldTransform()
+        if transform.type() <= QTransform.TxScale and transform.m11() == transform.m22() > 0 and self.sprite_key():
+            sprite = self.sprites.sprite(self, transform.m11(), painter.testRenderHint(QPainter.Antialiasing))
+            if sprite is not None:
+                pixmap, left, top = sprite
+                painter.resetTransform()
+                painter.drawPixmap(round(transform.dx()) + left, round(transform.dy()) + top, pixmap)
+                painter.setWorldTransform(transform)
+                return
+        self.draw(painter)
+
+    def draw(self, painter):
+        # Selection is shown by the outline pen, never by Qt's dashed selection rect. The
+        # outline covers the item's pen, so it is stroked instead of it in the same pass;
+        # only a pen wider than the outline gets a pass of its own underneath.
+        outline = self._outline_pen
+        painter.setBrush(self._brush)
+        if outline is None:
+            painter.setPen(self._pen)
+        elif self._pen.widthF() > outline.widthF():
+            painter.setPen(self._pen)
+            painter.drawPolygon(self._polygon)
+            painter.setBrush(self.style.no_brush)
+            painter.setPen(outline)
+        else:
+            painter.setPen(outline)
+        painter.drawPolygon(self._polygon)
+
+    def set_state(self, flag, on):
+        state = self.state | flag if on else self.state & ~flag
+        if state != self.state:
+            self.state = state
+            self._outline_pen = self.style.outline_pens[state]
+            self._edge_color = None
+            self._sprite_key = None
+            self.update()
+
+    def set_hovered(self, hovered):
+        self.set_state(PolygonStyle.HOVERED, hovered)
 
     def hoverEnterEvent(self, event):
-        self.edge_color = QColor("green")
-        self.update()
+        self.set_hovered(True)
         super().hoverEnterEvent(event)
 
     def hoverLeaveEvent(self, event):
-        self.edge_color = QColor("transparent") if not self.isSelected() else QColor("red")
-        self.update()
+        self.set_hovered(False)
         super().hoverLeaveEvent(event)
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemSelectedChange:
-            self.edge_color = QColor("yellow") if value else QColor("transparent")
-        elif change == QGraphicsItem.ItemPositionChange:
-            print(f"Polygon position: {value}")
+            self.set_state(PolygonStyle.SELECTED, bool(value))
+        elif change == QGraphicsItem.ItemScenePositionHasChanged:
+            # Moves are batched per frame by the scene's dispatcher, which also keeps the
+            # spatial index current; scenes without one are updated directly
+            dispatcher = getattr(self.scene(), "move_dispatcher", None)
+            if dispatcher is not None:
+                dispatcher.mark(self)
+            else:
+                self.update_spatial_index()
+        elif change == QGraphicsItem.ItemVisibleHasChanged:
+            # Bounds are unchanged, but pick buffers built from the index must redraw
+            self.update_spatial_index()
+        elif change == QGraphicsItem.ItemSceneChange:
+            dispatcher = getattr(self.scene(), "move_dispatcher", None)
+            if dispatcher is not None:
+                dispatcher.discard(self)
+            index = self.spatial_index()
+            if index is not None:
+                index.remove(self)
+            binding = getattr(self.scene(), "model_binding", None)
+            if binding is not None:
+                binding.item_removed(self)
+        elif change == QGraphicsItem.ItemSceneHasChanged:
+            index = self.spatial_index()
+            if index is not None:
+                index.insert(self, self.sceneBoundingRect())
+            binding = getattr(self.scene(), "model_binding", None)
+            if binding is not None and not self.virtual:
+                binding.item_added(self)
+            # Scenes with a spatial index get hover from their view instead of Qt's hover dispatch
+            self.setAcceptHoverEvents(index is None)
         return super().itemChange(change, value)
     def mouseReleaseEvent(self, event):
         super().mouseReleaseEvent(event)
-        print(f"Polygon position: {self.pos()}")   
+        # The drag is over: deliver its last positions without waiting for the frame, and
+        # keep the next drag of the same controls a separate undo step
+        dispatcher = getattr(self.scene(), "move_dispatcher", None)
+        if dispatcher is not None:
+            dispatcher.flush()
+        journal = getattr(self.scene(), "journal", None)
+        if journal is not None:
+            journal.seal()
 
 
 
 # The rest of the code remains unchanged.
 
 
+class SceneModelBinding:
+    # Keeps a ControlModel in step with the PolygonItems of a scene. Added and edited items
+    # are staged and written in bulk on flush(), so adding or loading items does no array
+    # work; moves arrive already batched from the MoveDispatcher.
+    def __init__(self, model):
+        self.model = model
+        self.items = {}  # control id -> item
+        self._staged = {}
+        self._removed = set()
+
+    def item_added(self, item):
+        self.items[item.control_id] = item
+        self._removed.discard(item.control_id)
+        self._staged[item.control_id] = item
+
+    def item_changed(self, item):
+        if item.control_id in self.items:
+            self._staged[item.control_id] = item
+
+    def item_removed(self, item):
+        control_id = item.control_id
+        if self.items.pop(control_id, None) is None:
+            return
+        self._staged.pop(control_id, None)
+        if control_id in self.model:
+            self._removed.add(control_id)
+
+    def detach_items(self):
+        # Stops tracking the current items; the model keeps their rows when they are removed
+        self.flush()
+        self.items = {}
+
+    def items_moved(self, ids, positions, items):
+        # Staged items are not in the model yet; they pick up their position on flush
+        model = self.model
+        known = np.fromiter((control_id in model for control_id in ids.tolist()), dtype=bool, count=len(ids))
+        if known.any():
+            model.update_controls(ids[known], positions[known])
+
+    def flush(self):
+        model = self.model
+        if self._removed:
+            model.remove_controls(np.fromiter(self._removed, dtype=np.int64, count=len(self._removed)))
+            self._removed = set()
+        if not self._staged:
+            return model
+        items = list(self._staged.values())
+        self._staged = {}
+        ids = np.fromiter((item.control_id for item in items), dtype=np.int64, count=len(items))
+        shapes = np.fromiter((model.register_shape(item.outline()) for item in items), dtype=np.int32, count=len(items))
+        positions = np.array([(item.x(), item.y()) for item in items], dtype=np.float64).reshape(-1, 2)
+        colors = np.fromiter((item._brush.color().rgba() for item in items), dtype=np.uint32, count=len(items))
+        flags = np.fromiter((item.control_flags for item in items), dtype=np.uint32, count=len(items))
+        rotation = np.fromiter((item.rotation() for item in items), dtype=np.float32, count=len(items))
+        scale = np.fromiter((item.scale() for item in items), dtype=np.float32, count=len(items))
+        names = [item.control_name for item in items]
+        new = np.fromiter((control_id not in model for control_id in ids.tolist()), dtype=bool, count=len(ids))
+        if new.any():
+            model.add_controls(shapes[new], positions[new], colors[new], flags[new],
+                               [name for name, is_new in zip(names, new) if is_new],
+                               rotation=rotation[new], scale=scale[new], ids=ids[new])
+        if not new.all():
+            old = ~new
+            model.update_controls(ids[old], positions[old], colors[old], shapes[old], flags[old],
+                                  rotation=rotation[old], scale=scale[old],
+                                  names=[name for name, is_new in zip(names, new) if not is_new])
+        return model
+
+    def apply(self, ids=None):
+        # Pushes model rows back onto their items after a headless bulk edit
+        model = self.model
+        ids = model.ids[:model.count] if ids is None else np.asarray(ids, dtype=np.int64)
+        rows = model.rows(ids)
+        for control_id, row in zip(ids.tolist(), rows.tolist()):
+            item = self.items.get(control_id)
+            if item is None:
+                continue
+            x, y = model.pos[row]
+            if item.x() != x or item.y() != y:
+                item.setPos(x, y)
+            shape = model.shapes[int(model.shape[row])]
+            if not np.array_equal(item.outline(), shape):
+                item.setPolygon(points_to_polygon(shape))
+            if item._brush.color().rgba() != int(model.color[row]):
+                item.setBrush(QBrush(QColor.fromRgba(int(model.color[row]))))
+            item.setRotation(float(model.rotation[row]))
+            item.setScale(float(model.scale[row]))
+            item.control_name = model.names[row]
+            item.control_flags = int(model.flags[row])
+            item.setFlag(QGraphicsItem.ItemIsMovable, bool(item.control_flags & MOVABLE))
+            item.setFlag(QGraphicsItem.ItemIsSelectable, bool(item.control_flags & SELECTABLE))
+            self._staged.pop(control_id, None)
+
+
 class CustomGraphicsScene(QGraphicsScene):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setSceneRect(QRectF(0, 0, 2000, 2000))
-
+        self.spatial_index = SpatialIndex()
+        self.loader = None
+        # Headless state of every control; items are views kept in step by model_binding
+        self.model = ControlModel()
+        self.model_binding = SceneModelBinding(self.model)
+        # Saving and engine sync subscribe to move_dispatcher.moved as well
+        self.move_dispatcher = MoveDispatcher(parent=self)
+        # Undo history; record_moves must run before the binding writes the new positions
+        self.journal = EditJournal()
+        self.move_dispatcher.moved.connect(self.record_moves)
+        self.move_dispatcher.moved.connect(self.update_moved_items)
+        self.move_dispatcher.moved.connect(self.model_binding.items_moved)
+        self.virtualizer = None
+        self.autosave = None
 
         self.addItem(self.add_star_polygon_item(1000,1000))
         self.addItem(self.add_star_polygon_item(1000,1200))
@@ -86,30 +411,320 @@ class CustomGraphicsScene(QGraphicsScene):
         item.setBrush(QBrush(QColor(brush_color)))
         item.setFlag(QGraphicsItem.ItemIsMovable, is_movable)
         item.setFlag(QGraphicsItem.ItemIsSelectable, is_selectable)
+        item.control_flags = (SELECTABLE if is_selectable else 0) | (MOVABLE if is_movable else 0)
         self.addItem(item)
         return item
 
+    def record_added(self, items):
+        # Adds are recorded per user action (paste, duplicate...) rather than per item, so
+        # building a scene item by item costs one model flush and one undo step
+        ids = [item.control_id for item in items]
+        if ids and not self.journal.replaying:
+            self.journal.record(RowsEdit(self, self.control_model().snapshot(ids), True))
+
+    def create_control_item(self, polygon, x, y, color, flags, name, control_id=None):
+        item = PolygonItems()
+        if control_id is not None:
+            item.control_id = control_id
+        item.setPolygon(polygon)
+        item.setPos(x, y)
+        item.setBrush(QBrush(QColor.fromRgba(int(color))))
+        item.setFlag(QGraphicsItem.ItemIsMovable, bool(flags & MOVABLE))
+        item.setFlag(QGraphicsItem.ItemIsSelectable, bool(flags & SELECTABLE))
+        item.control_name = name
+        item.control_flags = int(flags)
+        return item
+
+    def load_layout(self, path, view=None):
+        # Streams the controls of a .upk/.json layout into the scene without blocking the UI.
+        # Controls from the previous layout are removed, even if it is still loading.
+        if self.virtualizer is not None:
+            # Virtual scenes keep controls in the model only: the layout is read straight into it
+            self.clear_controls()
+            self.load_virtual_layout(path)
+            return None
+        if self.loader is None:
+            self.loader = SceneLoader(self, self.create_control_item, parent=self,
+                                      claim_ids=self.claim_layout_ids)
+        else:
+            self.loader.cancel()
+        self.journal.clear()
+        self.loader.start(path, view)
+        return self.loader
+
+    def claim_layout_ids(self, ids):
+        # Controls keep the ids stored in the layout, so id references (undo history,
+        # autosave logs) survive a save and reload; ids already in the scene get new ones
+        return stored_control_ids(ids, self.control_model().row_of_id)
+
+    def control_model(self):
+        # The model with every pending item add, edit, move and removal applied
+        self.move_dispatcher.flush()
+        return self.model_binding.flush()
+
+    def save_layout(self, path):
+        # Writes every control to a .upk layout; identical outlines share one shape entry
+        return self.control_model().to_layout(path)
+
+    def edit_controls(self, ids, **columns):
+        # One batched write of model columns (positions, rotation, scale, colors...) for many
+        # controls, e.g. from a TransformEngine: one model update, then each item refreshed
+        # once and one dispatcher flush instead of a chain of per-item edits
+        model = self.control_model()
+        if not self.journal.replaying:
+            rows = model.rows(ids)
+            before = {name: model.values(name, rows) for name in columns}
+            after = {name: values if name == "names" else np.array(values) for name, values in columns.items()}
+            self.journal.record(ColumnEdit(self, ids, before, after))
+        model.update_controls(ids, **columns)
+        if self.virtualizer is None:
+            self.model_binding.apply(ids)
+            self.move_dispatcher.flush()
+
+    def remove_controls(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        model = self.control_model()
+        self.journal.record(RowsEdit(self, model.snapshot(ids), False))
+        if self.virtualizer is not None:
+            model.remove_controls(ids)
+            return
+        for control_id in ids.tolist():
+            item = self.model_binding.items.get(control_id)
+            if item is not None:
+                self.removeItem(item)
+        self.model_binding.flush()
+
+    def restore_controls(self, snapshot):
+        # Puts back rows from ControlModel.snapshot under their old ids (undo of a removal)
+        model = self.model
+        if self.virtualizer is not None:
+            model.add_controls(**snapshot)
+            return
+        for row, control_id in enumerate(snapshot["ids"].tolist()):
+            item = self.create_control_item(points_to_polygon(model.shapes[int(snapshot["shapes"][row])]),
+                                            *snapshot["positions"][row], snapshot["colors"][row],
+                                            snapshot["flags"][row], snapshot["names"][row], control_id)
+            item.setRotation(float(snapshot["rotation"][row]))
+            item.setScale(float(snapshot["scale"][row]))
+            self.addItem(item)
+        # Items carry no group: it is written to the model rows once they exist
+        self.control_model().update_controls(snapshot["ids"], groups=snapshot["groups"])
+
+    def record_moves(self, ids, positions, items):
+        # Connected ahead of the model binding, so the model still has the old positions.
+        # Zero deltas (items following a model write) are not recorded.
+        model = self.model
+        known = np.fromiter((control_id in model for control_id in ids.tolist()), dtype=bool, count=len(ids))
+        if not known.any():
+            return
+        ids = ids[known]
+        delta = positions[known] - model.pos[model.rows(ids)]
+        moved = np.any(delta != 0, axis=1)
+        if moved.any():
+            self.journal.record(MoveEdit(self, ids[moved], delta[moved]))
+
+    def enable_virtualization(self, view, margin=0.5):
+        # From here on the model is the scene's content and `view` only gets items for
+        # controls near its visible rect. Existing items are folded into the model.
+        from itemVirtualizer import ItemVirtualizer
+        if self.virtualizer is not None:
+            return self.virtualizer
+        self.control_model()
+        self.model_binding.detach_items()
+        self.clear_controls()
+        self.virtualizer = ItemVirtualizer(self, view, PolygonItems, margin, parent=self)
+        self.virtualizer.refresh()
+        return self.virtualizer
+
+    def enable_autosave(self, path, **options):
+        # Logs every change next to `path` from a background thread. When the log of a
+        # crashed session is found, its controls replace the scene's first; returns the
+        # AutosaveService and the number of recovered controls. `path` must be a .npz: the
+        # snapshots are not .upk layouts.
+        from autosave import AutosaveService, recover
+        service = AutosaveService(self.model, path, flush=self.control_model, parent=self, **options)
+        if self.autosave is not None:
+            self.autosave.close()
+        recovered = recover(path)
+        if recovered is not None:
+            self.clear_controls()
+            self.restore_model(recovered)
+        self.autosave = service
+        self.autosave.start()
+        return self.autosave, 0 if recovered is None else len(recovered)
+
+    def restore_model(self, source):
+        # Puts back every row of another ControlModel (a recovered log, a saved .npz) under
+        # its old ids; its shapes and groups are registered with this scene's model
+        self.control_model()
+        snapshot = source.snapshot(source.ids[:source.count])
+        shape_map = np.array([self.model.register_shape(points) for points in source.shapes] or [0],
+                             dtype=np.int32)
+        snapshot["shapes"] = shape_map[snapshot["shapes"]]
+        snapshot["groups"] = np.array([self.model.group_id(source.groups[group]) if group >= 0 else -1
+                                       for group in snapshot["groups"].tolist()], dtype=np.int32)
+        self.restore_controls(snapshot)
+
+    def load_virtual_layout(self, path):
+        # Reads a whole .upk into the model without creating items; needs enable_virtualization
+        return self.model.read_layout(path)
+
+    def pick_control(self, scene_pos):
+        # Control id under scene_pos, including controls that currently have no item
+        if self.virtualizer is not None:
+            return self.virtualizer.pick(scene_pos)
+        item = self.pick_item(scene_pos)
+        return None if item is None else item.control_id
+
+    def selected_control_ids(self):
+        if self.virtualizer is not None:
+            return self.model.selected_ids()
+        return np.array([item.control_id for item in self.selectedItems() if isinstance(item, PolygonItems)],
+                        dtype=np.int64)
+
+    def select_controls(self, ids):
+        # Replaces the selection with the given controls; in virtual mode rows without an
+        # item are selected as well
+        ids = np.asarray(ids, dtype=np.int64)
+        if self.virtualizer is not None:
+            self.model.select(ids)
+            return
+        items = self.model_binding.items
+        chosen = [items[control_id] for control_id in ids.tolist() if control_id in items]
+        keep = set(chosen)
+        for item in self.selectedItems():
+            if item not in keep:
+                item.setSelected(False)
+        for item in chosen:
+            if not item.isSelected():
+                item.setSelected(True)
+
+    def clearSelection(self):
+        # Only Python callers get here; Qt's own clears go through deselect_hidden
+        super().clearSelection()
+        if self.virtualizer is not None:
+            self.model.deselect()
+
+    def deselect_hidden(self):
+        # Qt clears the selection internally on a plain click on a control, without going
+        # through clearSelection(); views call this so rows without an item follow along
+        if self.virtualizer is not None:
+            self.virtualizer.deselect_hidden()
+
+    def set_reference_image(self, path, pos=QPointF(0, 0), scale=1.0):
+        # Character artwork behind the controls, streamed from a tile pyramid
+        from imagePyramid import ReferenceImageItem
+        if getattr(self, "reference_image", None) is not None:
+            self.reference_image.close()
+            self.removeItem(self.reference_image)
+        self.reference_image = ReferenceImageItem(path)
+        self.reference_image.setPos(pos)
+        self.reference_image.setScale(scale)
+        self.reference_image.setZValue(-1)
+        self.addItem(self.reference_image)
+        return self.reference_image
+
+    def clear_controls(self):
+        if self.loader is not None:
+            self.loader.cancel()
+        self.journal.clear()
+        if self.virtualizer is not None:
+            # The virtualizer releases the items of removed rows; pooled items stay in the scene
+            self.model.clear()
+            return
+        for item in self.spatial_index.items():
+            self.removeItem(item)
+
+    def update_moved_items(self, ids, positions, items):
+        index = self.spatial_index
+        for item in items:
+            if item in index:
+                index.update(item, item.sceneBoundingRect())
+
+    def pick_item(self, scene_pos):
+        # Topmost visible control under scene_pos; exact shape test only on index candidates
+        self.move_dispatcher.flush()
+        for item in self.spatial_index.query_point(scene_pos):
+            if item.isVisible() and item.contains(item.mapFromScene(scene_pos)):
+                return item
+        return None
+
+    def items_in_rect(self, rect, mode=Qt.IntersectsItemBoundingRect):
+        self.move_dispatcher.flush()
+        contained = mode in (Qt.ContainsItemBoundingRect, Qt.ContainsItemShape)
+        candidates = self.spatial_index.query_rect(rect, contained)
+        if mode in (Qt.IntersectsItemShape, Qt.ContainsItemShape):
+            path = QPainterPath()
+            path.addRect(rect)
+            candidates = [item for item in candidates if item.collidesWithPath(item.mapFromScene(path), mode)]
+        return [item for item in candidates if item.isVisible()]
+
+
+class CustomGraphicsView(ProfiledViewMixin, QGraphicsView):
+    pick_buffer = None
 
-class CustomGraphicsView(QGraphicsView):
     def __init__(self, scene, parent=None):
         super().__init__(scene, parent)
         self.setRenderHint(QPainter.Antialiasing)
         self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, True)
-        self.setDragMode(QGraphicsView.RubberBandDrag)
+        # Rubber-band selection and hover are resolved through the scene's spatial index
+        self.setDragMode(QGraphicsView.NoDrag)
+        self.setRubberBandSelectionMode(Qt.IntersectsItemBoundingRect)
+        self.setMouseTracking(True)
 
         self.setBackgroundBrush(QBrush(QColor(64, 64, 64)))
+        self.rubber_band = QRubberBand(QRubberBand.Rectangle, self.viewport())
+        self.band_origin = None
+        self.band_base_selection = set()
+        self.band_selection = set()
+        self.hovered_item = None
+        self.press_pos = None
+
+    def set_pick_buffer(self, enabled):
+        # Resolve click, hover and rubber band through an off-screen id buffer instead of
+        # shape tests; pays off on dense pickers where many controls overlap. The band then
+        # works on what is visible: a control fully covered by others is never selected.
+        # Otherwise rubberBandSelectionMode() applies as usual: intersect modes take the
+        # controls showing a pixel inside the band, contain modes those also inside it.
+        from pickBuffer import PickBuffer
+        self.pick_buffer = PickBuffer() if enabled else None
+
+    def current_pick_buffer(self):
+        # Redrawn only when the spatial index (any move, add, remove, reshape or hide), the
+        # view transform or the viewport size changed since the last one
+        scene = self.scene()
+        scene.move_dispatcher.flush()
+        viewport = self.viewport()
+        transform = self.viewportTransform()
+        key = (scene.spatial_index.revision, transform, viewport.size())
+        buffer = self.pick_buffer
+        if not buffer.valid(key):
+            rect = self.mapToScene(viewport.rect()).boundingRect()
+            items = [item for item in scene.items_in_rect(rect) if isinstance(item, PolygonItems)]
+            buffer.render(viewport.size(), [(item, item._polygon, item.sceneTransform() * transform)
+                                            for item in scene.spatial_index.stacking_order(items)], key)
+        return buffer
+
+    def pick_item(self, pos):
+        if self.pick_buffer is not None:
+            return self.current_pick_buffer().at(pos.x(), pos.y())
+        return self.scene().pick_item(self.mapToScene(pos))
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            self.rubberBandRect = QRectF(event.pos(), QSizeF())
-            self.setRubberBandSelectionMode(Qt.IntersectsItemBoundingRect)
-            self.rubberBandRectItem = QGraphicsRectItem(self.rubberBandRect)
-            self.rubberBandRectItem.setPen(QPen(Qt.DashLine))
-            self.scene().addItem(self.rubberBandRectItem)
+            self.press_pos = event.pos()
+            item = self.pick_item(event.pos())
+            if item is None:
+                self.start_rubber_band(event)
+                event.accept()
+                return
+            if not control_held(event) and not item.isSelected():
+                # Qt is about to select only this item
+                self.scene().deselect_hidden()
 
         elif event.button() == Qt.RightButton:
             # Get the clicked item, if any
-            clicked_item = self.itemAt(event.pos())
+            clicked_item = self.pick_item(event.pos())
 
             # Check if the clicked item is a PolygonItems instance
             if isinstance(clicked_item, PolygonItems):
@@ -118,6 +733,82 @@ class CustomGraphicsView(QGraphicsView):
 
         super().mousePressEvent(event)
 
+    def mouseMoveEvent(self, event):
+        if self.band_origin is not None:
+            self.update_rubber_band(event.pos())
+            event.accept()
+            return
+        if not event.buttons():
+            self.set_hovered_item(self.pick_item(event.pos()))
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self.band_origin is not None and event.button() == Qt.LeftButton:
+            self.update_rubber_band(event.pos())
+            self.rubber_band.hide()
+            self.band_origin = None
+            self.band_base_selection = set()
+            self.band_selection = set()
+            event.accept()
+            return
+        super().mouseReleaseEvent(event)
+        if (event.button() == Qt.LeftButton and event.pos() == self.press_pos
+                and not control_held(event)):
+            # A click without a drag left only the clicked item selected
+            self.scene().deselect_hidden()
+
+    def leaveEvent(self, event):
+        self.set_hovered_item(None)
+        super().leaveEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Undo):
+            self.scene().journal.undo()
+        elif event.matches(QKeySequence.Redo):
+            self.scene().journal.redo()
+        else:
+            super().keyPressEvent(event)
+
+    def set_hovered_item(self, item):
+        if item is self.hovered_item:
+            return
+        if self.hovered_item is not None and self.hovered_item.scene() is self.scene():
+            self.hovered_item.set_hovered(False)
+        self.hovered_item = item
+        if item is not None:
+            item.set_hovered(True)
+
+    def start_rubber_band(self, event):
+        self.band_origin = event.pos()
+        if control_held(event):
+            self.band_base_selection = set(self.scene().selectedItems())
+        else:
+            self.scene().clearSelection()
+            self.band_base_selection = set()
+        self.band_selection = set(self.band_base_selection)
+        self.rubber_band.setGeometry(QRect(self.band_origin, self.band_origin))
+        self.rubber_band.show()
+
+    def update_rubber_band(self, pos):
+        band_rect = QRect(self.band_origin, pos).normalized()
+        self.rubber_band.setGeometry(band_rect)
+        mode = self.rubberBandSelectionMode()
+        scene_rect = self.mapToScene(band_rect).boundingRect()
+        if self.pick_buffer is not None:
+            # Controls showing at least one pixel inside the band (see set_pick_buffer)
+            selected = set(self.current_pick_buffer().in_rect(band_rect.left(), band_rect.top(),
+                                                              band_rect.right(), band_rect.bottom()))
+            if mode in (Qt.ContainsItemBoundingRect, Qt.ContainsItemShape):
+                selected &= set(self.scene().items_in_rect(scene_rect, mode))
+        else:
+            selected = set(self.scene().items_in_rect(scene_rect, mode))
+        selected |= self.band_base_selection
+        for item in self.band_selection - selected:
+            item.setSelected(False)
+        for item in selected - self.band_selection:
+            item.setSelected(True)
+        self.band_selection = selected
+
     def show_context_menu(self, event):
         context_menu =QMenu()
 
@@ -135,7 +826,7 @@ class CustomGraphicsView(QGraphicsView):
         action_spawn_widget = QAction("Spawn Widget", context_menu)
         context_menu.addAction(action_spawn_widget)
 
-        clicked_item = self.itemAt(event.pos())
+        clicked_item = self.pick_item(event.pos())
         item_scene_pos = clicked_item.scenePos()
         item_view_pos = self.mapFromScene(item_scene_pos)
 
@@ -167,7 +858,6 @@ class StarSpinBox(QSpinBox):
 
     def stepBy(self, steps):
         super().stepBy(steps)
-        print("hello")
 class MainWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -0,0 +1,242 @@
+import os
+import time
+from functools import partial
+import numpy as np
+from PySide2.QtCore import QObject, QThread, QTimer, Signal
+from pickerLayout import PickerLayout, read_json_polygons, SELECTABLE, MOVABLE
+from shapeLibrary import points_to_polygon
+
+
+class ParsedLayout:
+    # Plain arrays handed from the parser thread to the GUI thread, already in load order
+    # ids are the control ids stored in the layout, None for .json outlines
+    def __init__(self, shapes, x, y, shape, color, flags, names, ids=None):
+        self.shapes = shapes
+        self.x = x
+        self.y = y
+        self.shape = shape
+        self.color = color
+        self.flags = flags
+        self.names = names
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.x)
+
+
+CHECK_EVERY = 1024  # rows between should_stop checks while parsing
+
+
+def copy_rows(layout, parsed, start, end):
+    # No view of the mapped table may outlive this call: the layout cannot close while one does
+    batch = layout.controls[start:end]
+    parsed.x[start:end] = batch["x"]
+    parsed.y[start:end] = batch["y"]
+    parsed.shape[start:end] = batch["shape"]
+    parsed.color[start:end] = batch["color"]
+    parsed.flags[start:end] = batch["flags"]
+    parsed.ids[start:end] = batch["id"]
+    parsed.names.extend(layout.control_name(row) for row in range(start, end))
+
+
+def parse_layout(path, focus=None, should_stop=None):
+    # Returns None when should_stop() turns true before parsing is done
+    def stopped(row):
+        return should_stop is not None and row % CHECK_EVERY == 0 and should_stop()
+
+    if os.path.splitext(path)[1].lower() == ".json":
+        outlines = read_json_polygons(path)
+        shapes = []
+        centres = []
+        for row, points in enumerate(outlines):
+            if stopped(row):
+                return None
+            centre = (points.min(axis=0) + points.max(axis=0)) / 2
+            shapes.append(points - centre)
+            centres.append(centre)
+        centres = np.asarray(centres, dtype=np.float64).reshape(-1, 2)
+        count = len(shapes)
+        parsed = ParsedLayout(shapes, centres[:, 0], centres[:, 1], np.arange(count),
+                              np.full(count, 0xFF0000FF, dtype=np.uint32),
+                              np.full(count, SELECTABLE | MOVABLE, dtype=np.uint32), [""] * count)
+    else:
+        with PickerLayout(path) as layout:
+            shapes = []
+            for shape_id in range(len(layout.shapes)):
+                if stopped(shape_id):
+                    return None
+                shapes.append(np.array(layout.shape_points(shape_id)))
+            # The table stays memory-mapped: only the columns the loader needs are copied
+            # out, one batch of rows at a time
+            count = len(layout)
+            parsed = ParsedLayout(shapes, np.empty(count), np.empty(count), np.empty(count, np.int64),
+                                  np.empty(count, np.uint32), np.empty(count, np.uint32), [],
+                                  np.empty(count, np.int64))
+            for start in range(0, count, CHECK_EVERY):
+                if stopped(start):
+                    return None
+                copy_rows(layout, parsed, start, min(start + CHECK_EVERY, count))
+
+    if focus is not None and len(parsed):
+        # Controls nearest the viewport centre are streamed in first
+        order = np.argsort((parsed.x - focus[0]) ** 2 + (parsed.y - focus[1]) ** 2, kind="stable")
+        parsed.x, parsed.y = parsed.x[order], parsed.y[order]
+        parsed.shape, parsed.color, parsed.flags = parsed.shape[order], parsed.color[order], parsed.flags[order]
+        parsed.names = [parsed.names[row] for row in order.tolist()]
+        if parsed.ids is not None:
+            parsed.ids = parsed.ids[order]
+    return parsed
+
+
+class LayoutParser(QThread):
+    parsed = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, path, focus=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.focus = focus
+
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
+
+    def run(self):
+        try:
+            result = parse_layout(self.path, self.focus, self.isInterruptionRequested)
+        except Exception as error:
+            if not self.isInterruptionRequested():
+                self.failed.emit(f"{self.path}: {error}")
+            return
+        if result is not None and not self.isInterruptionRequested():
+            self.parsed.emit(result)
+
+
+def stop_threads(threads):
+    # Also connected to the loader's destroyed signal: a loader goes away with its scene,
+    # and a cancelled parser that is still running must not be destroyed with it
+    while threads:
+        threads.pop().stop()
+
+
+class SceneLoader(QObject):
+    # Parses a layout on a worker thread, then adds its controls to the scene in
+    # time-sliced batches from the event loop so the editor keeps responding.
+    # Cancelling never waits for the parser: it is asked to stop, deletes itself once it
+    # has, and anything it emitted in the meantime is ignored (see _current). Parsers that
+    # are still running are waited for only when the loader is closed or destroyed.
+    progress = Signal(int, int)
+    finished = Signal()
+    cancelled = Signal()
+    failed = Signal(str)
+
+    # item_factory(polygon, x, y, color, flags, name, control_id) -> QGraphicsItem, with
+    # control_id None for layouts without ids. claim_ids(ids) -> ids is given the stored ids
+    # once parsed and returns the ids to use (clashing ones replaced); without it they are
+    # passed on as stored.
+    def __init__(self, scene, item_factory, batch_time_ms=8, parent=None, claim_ids=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.item_factory = item_factory
+        self.claim_ids = claim_ids
+        self.batch_time = batch_time_ms / 1000.0
+        self.items = []
+        self._parser = None
+        self._threads = []  # parsers that have not finished, cancelled ones included
+        self.destroyed.connect(partial(stop_threads, self._threads))
+        self._layout = None
+        self._polygons = []
+        self._next = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._load_batch)
+
+    def is_loading(self):
+        return self._parser is not None or self._timer.isActive()
+
+    def start(self, path, view=None):
+        self.cancel(remove_loaded=False)
+        self.items = []
+        focus = None
+        if view is not None:
+            centre = view.mapToScene(view.viewport().rect().center())
+            focus = (centre.x(), centre.y())
+        self._parser = LayoutParser(path, focus, self)
+        self._parser.parsed.connect(self._on_parsed)
+        self._parser.failed.connect(self._on_failed)
+        self._parser.finished.connect(self._parser_finished)
+        self._parser.finished.connect(self._parser.deleteLater)
+        self._threads.append(self._parser)
+        self._parser.start()
+
+    def cancel(self, remove_loaded=True):
+        # Stops parsing and streaming; optionally removes the controls already added
+        was_loading = self.is_loading()
+        if self._parser is not None:
+            self._parser.requestInterruption()
+            self._parser.parsed.disconnect(self._on_parsed)
+            self._parser.failed.disconnect(self._on_failed)
+            self._parser = None
+        self._timer.stop()
+        self._layout = None
+        if remove_loaded:
+            for item in self.items:
+                if item.scene() is self.scene:
+                    self.scene.removeItem(item)
+            self.items = []
+        if was_loading:
+            self.cancelled.emit()
+
+    def close(self):
+        # Cancels, keeping the loaded controls, and waits for every parser to stop
+        self.cancel(remove_loaded=False)
+        stop_threads(self._threads)
+
+    def _parser_finished(self):
+        parser = self.sender()
+        if parser in self._threads:
+            self._threads.remove(parser)
+
+    def _current(self):
+        # Results already queued when the parser was cancelled or replaced still arrive
+        return self._parser is not None and self.sender() is self._parser
+
+    def _on_parsed(self, layout):
+        if not self._current():
+            return
+        self._parser = None
+        if layout.ids is not None and self.claim_ids is not None:
+            layout.ids = self.claim_ids(layout.ids)
+        self._layout = layout
+        self._polygons = [points_to_polygon(points) for points in layout.shapes]
+        self._next = 0
+        self.progress.emit(0, len(layout))
+        self._timer.start()
+
+    def _on_failed(self, message):
+        if not self._current():
+            return
+        self._parser = None
+        self.failed.emit(message)
+
+    def _load_batch(self):
+        layout = self._layout
+        total = len(layout)
+        deadline = time.perf_counter() + self.batch_time
+        row = self._next
+        ids = layout.ids
+        while row < total:
+            item = self.item_factory(self._polygons[layout.shape[row]], layout.x[row], layout.y[row],
+                                     layout.color[row], layout.flags[row], layout.names[row],
+                                     None if ids is None else int(ids[row]))
+            self.scene.addItem(item)
+            self.items.append(item)
+            row += 1
+            if time.perf_counter() >= deadline:
+                break
+        self._next = row
+        self.progress.emit(row, total)
+        if row >= total:
+            self._timer.stop()
+            self._layout = None
+            self.finished.emit()
@@ -0,0 +1,129 @@
+import numpy as np
+from PySide2.QtCore import QObject, QTimer, Signal
+
+
+class ControlRigBridge:
+    # Thin wrapper over the Control Rig hierarchy controller. `unreal` is imported on first
+    # use (or injected) so the picker can run and be exercised without the editor.
+    def __init__(self, blueprint, unreal_module=None):
+        self.blueprint = blueprint
+        self._unreal = unreal_module
+        self.calls = 0
+
+    @property
+    def unreal(self):
+        if self._unreal is None:
+            import unreal
+            self._unreal = unreal
+        return self._unreal
+
+    def control_key(self, name):
+        return self.unreal.RigElementKey(type=self.unreal.RigElementType.CONTROL, name=name)
+
+    def set_selection(self, names):
+        # One engine call for the whole selection
+        self.calls += 1
+        keys = [self.control_key(name) for name in sorted(names)]
+        self.blueprint.get_hierarchy_controller().set_selection(keys)
+
+    def selected_controls(self):
+        keys = self.blueprint.hierarchy.get_selected_keys()
+        control = self.unreal.RigElementType.CONTROL
+        return {str(key.name) for key in keys if key.type == control}
+
+
+class SelectionSync(QObject):
+    # Mirrors picker selection to Control Rig. Selection changes are collected until the
+    # event loop is idle and sent as one diffed set_selection call; selections reported
+    # back by the engine that match what was last sent are treated as echoes and ignored.
+    # Selection is read from and written to the scene's control model by id, so controls
+    # without an item (virtualized, off-screen) are synced as well.
+    synced = Signal(object, object)  # added, removed control names (sets)
+
+    def __init__(self, scene, bridge, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.bridge = bridge
+        self.engine_selection = set()
+        self._applying = False
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self.flush)
+        self.scene.selectionChanged.connect(self.mark_dirty)
+        # Virtual scenes change the selection of rows without items in the model only
+        self.scene.model.listeners.append(self.model_changed)
+
+    def close(self):
+        self.scene.model.listeners.remove(self.model_changed)
+
+    def model_changed(self, event, ids):
+        if event == "selected":
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        if not self._applying and not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def picker_selection(self):
+        model = self.scene.control_model()
+        names = model.names[model.rows(self.scene.selected_control_ids())].tolist()
+        return {name for name in names if name}
+
+    def flush(self):
+        self._flush_timer.stop()
+        selection = self.picker_selection()
+        added = selection - self.engine_selection
+        removed = self.engine_selection - selection
+        if not added and not removed:
+            return
+        self.bridge.set_selection(selection)
+        self.engine_selection = selection
+        self.synced.emit(added, removed)
+
+    def engine_selection_changed(self, names):
+        # Call when the engine reports a selection (e.g. from a slate tick poll)
+        names = set(names)
+        if names == self.engine_selection:
+            return
+        self.engine_selection = names
+        model = self.scene.control_model()
+        wanted = np.fromiter((name in names for name in model.names[:model.count].tolist()), dtype=bool,
+                             count=model.count)
+        self._applying = True
+        try:
+            self.scene.select_controls(model.ids[:model.count][wanted])
+        finally:
+            self._applying = False
+        self._flush_timer.stop()
+
+    def poll_engine(self):
+        self.engine_selection_changed(self.bridge.selected_controls())
+
+
+if __name__ == "__main__":
+    # Runs against fakeUnreal: rubber-band style selection of 500 controls is sent as one call
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakeUnreal"))
+    import unreal
+    from PySide2.QtWidgets import QApplication
+    from PySide2.QtGui import QPainterPath
+    from polygons import CustomGraphicsScene
+
+    app = QApplication(sys.argv)
+    scene = CustomGraphicsScene()
+    for i in range(500):
+        item = scene.add_star_polygon_item(40 * (i % 25), 40 * (i // 25))
+        item.control_name = f"ctrl_{i}"
+    blueprint = unreal.ControlRigBlueprint()
+    sync = SelectionSync(scene, ControlRigBridge(blueprint, unreal))
+
+    path = QPainterPath()
+    path.addRect(scene.itemsBoundingRect())
+    scene.setSelectionArea(path)
+    app.processEvents()
+    print(f"selected {len(blueprint.hierarchy.selected)} controls in {sync.bridge.calls} engine call(s)")
+
+    sync.poll_engine()
+    print(f"echo ignored, engine calls still {sync.bridge.calls}")
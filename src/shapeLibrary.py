@@ -0,0 +1,100 @@
+from collections import OrderedDict
+import numpy as np
+from PySide2.QtCore import QPointF
+from PySide2.QtGui import QPolygonF
+
+
+# Outline generators: each returns an (n, 2) float64 array built in one vectorized pass.
+# Star, regular polygon and rounded rect are centred on the origin; triangle and square
+# fill the box [0, width] x [0, height] like the toolbar icons in test.py.
+
+def star_points(num_points=5, radius=50, inner_ratio=0.5):
+    i = np.arange(num_points * 2)
+    angle = (2 * np.pi * i) / (num_points * 2)
+    factor = np.where(i % 2 == 0, 1.0, inner_ratio)
+    return np.column_stack((radius * factor * np.cos(angle), radius * factor * np.sin(angle)))
+
+
+def regular_polygon_points(sides=6, radius=50, rotation=0.0):
+    angle = rotation + (2 * np.pi * np.arange(sides)) / sides
+    return np.column_stack((radius * np.cos(angle), radius * np.sin(angle)))
+
+
+def rounded_rect_points(width=100, height=60, corner_radius=10, segments=6):
+    corner_radius = min(corner_radius, width / 2, height / 2)
+    half_width = width / 2 - corner_radius
+    half_height = height / 2 - corner_radius
+    # One quarter arc per corner, corners visited clockwise starting bottom-right (y down)
+    centres = np.array([[half_width, half_height], [-half_width, half_height],
+                        [-half_width, -half_height], [half_width, -half_height]])
+    steps = np.linspace(0, np.pi / 2, segments + 1)
+    angle = (np.arange(4)[:, None] * (np.pi / 2) + steps[None, :]).ravel()
+    centre = np.repeat(centres, segments + 1, axis=0)
+    return centre + corner_radius * np.column_stack((np.cos(angle), np.sin(angle)))
+
+
+def triangle_points(width=32, height=32):
+    return np.array([[0, height], [width / 2, 0], [width, height]], dtype=np.float64)
+
+
+def square_points(width=32, height=None):
+    height = width if height is None else height
+    return np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+
+
+GENERATORS = {
+    "star": star_points,
+    "regular_polygon": regular_polygon_points,
+    "rounded_rect": rounded_rect_points,
+    "triangle": triangle_points,
+    "square": square_points,
+}
+
+
+def points_to_polygon(points):
+    return QPolygonF([QPointF(x, y) for x, y in points.tolist()])
+
+
+class ShapeLibrary:
+    # Bounded LRU of canonical outlines keyed by (kind, parameters). QPolygonF is implicitly
+    # shared, so items that setPolygon() a cached outline share its vertex data.
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, kind, params):
+        key = (kind, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        points = GENERATORS[kind](*params)
+        points.flags.writeable = False
+        entry = (points, points_to_polygon(points))
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def points(self, kind, *params):
+        return self._entry(kind, params)[0]
+
+    def polygon(self, kind, *params):
+        return self._entry(kind, params)[1]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+shape_library = ShapeLibrary()
+
+
+def get_polygon(kind, *params):
+    return shape_library.polygon(kind, *params)
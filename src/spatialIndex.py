@@ -0,0 +1,134 @@
+import math
+from PySide2.QtCore import QRectF
+
+
+class SpatialIndex:
+    # Uniform grid over item scene bounding rects. Used as the broadphase for rubber-band
+    # selection, point picking and hover; exact shape tests only run on what it returns.
+    def __init__(self, cell_size=100.0):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._entries = {}  # item -> (left, top, right, bottom, cell_range, order)
+        self._order = 0
+        self.revision = 0  # bumped on every change, so caches built from the index can tell they are stale
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def items(self):
+        return list(self._entries)
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return (math.floor(left / size), math.floor(top / size),
+                math.floor(right / size), math.floor(bottom / size))
+
+    def _add_to_cells(self, item, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        cells = self._cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    bucket = cells[(cx, cy)] = set()
+                bucket.add(item)
+
+    def _remove_from_cells(self, item, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        cells = self._cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(item)
+                    if not bucket:
+                        del cells[(cx, cy)]
+
+    def insert(self, item, rect):
+        if item in self._entries:
+            self.update(item, rect)
+            return
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+        cell_range = self._cell_range(left, top, right, bottom)
+        self._order += 1
+        self.revision += 1
+        self._entries[item] = (left, top, right, bottom, cell_range, self._order)
+        self._add_to_cells(item, cell_range)
+
+    def update(self, item, rect):
+        entry = self._entries.get(item)
+        if entry is None:
+            self.insert(item, rect)
+            return
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+        cell_range = self._cell_range(left, top, right, bottom)
+        self.revision += 1
+        if cell_range != entry[4]:
+            self._remove_from_cells(item, entry[4])
+            self._add_to_cells(item, cell_range)
+        self._entries[item] = (left, top, right, bottom, cell_range, entry[5])
+
+    def remove(self, item):
+        entry = self._entries.pop(item, None)
+        if entry is not None:
+            self.revision += 1
+            self._remove_from_cells(item, entry[4])
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+        self.revision += 1
+
+    def bounds(self, item):
+        left, top, right, bottom = self._entries[item][:4]
+        return QRectF(left, top, right - left, bottom - top)
+
+    def stacking_order(self, items):
+        # Bottom first: the reverse of query_point's order
+        entries = self._entries
+        return sorted(items, key=lambda item: (item.zValue(), entries[item][5]))
+
+    def query_rect(self, rect, contained=False):
+        # Items whose bounds intersect rect (or lie fully inside it when contained=True)
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+        cx0, cy0, cx1, cy1 = self._cell_range(left, top, right, bottom)
+        entries = self._entries
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) >= len(entries):
+            candidates = entries
+        else:
+            candidates = set()
+            cells = self._cells
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket:
+                        candidates.update(bucket)
+
+        result = []
+        for item in candidates:
+            item_left, item_top, item_right, item_bottom = entries[item][:4]
+            if contained:
+                if item_left >= left and item_right <= right and item_top >= top and item_bottom <= bottom:
+                    result.append(item)
+            elif item_left <= right and item_right >= left and item_top <= bottom and item_bottom >= top:
+                result.append(item)
+        return result
+
+    def query_point(self, point):
+        # Items whose bounds contain point, topmost first (z value, then insertion order)
+        x, y = point.x(), point.y()
+        size = self.cell_size
+        bucket = self._cells.get((math.floor(x / size), math.floor(y / size)))
+        if not bucket:
+            return []
+        entries = self._entries
+        result = []
+        for item in bucket:
+            left, top, right, bottom, _, order = entries[item]
+            if left <= x <= right and top <= y <= bottom:
+                result.append(item)
+        result.sort(key=lambda item: (item.zValue(), entries[item][5]), reverse=True)
+        return result
@@ -3,6 +3,8 @@ import json
 from PySide2.QtWidgets import QApplication, QMainWindow, QToolBar, QAction
 from PySide2.QtGui import QIcon, QPixmap, QPainter, QPolygonF
 from PySide2.QtCore import Qt, QPointF
+from shapeLibrary import get_polygon
+from iconAtlas import IconAtlas
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -10,8 +12,8 @@ class MainWindow(QMainWindow):
 
         # Define a list of polygons (triangle and square)
         polygons = [
-            QPolygonF([QPointF(0, 32), QPointF(16, 0), QPointF(32, 32)]),  # Triangle
-            QPolygonF([QPointF(0, 0), QPointF(32, 0), QPointF(32, 32), QPointF(0, 32)])  # Square
+            get_polygon("triangle", 32, 32),  # Triangle
+            get_polygon("square", 32)  # Square
         ]
 
         # Serialize the polygons and store them in a JSON file
@@ -25,31 +27,16 @@ class MainWindow(QMainWindow):
         # Create a QToolBar widget
         toolbar = QToolBar()
 
-        # Loop through the polygons and create icons for each
+        # Icons come from the on-disk atlas; only shapes not cached yet are painted
+        icon_atlas = IconAtlas(icon_size=32, device_pixel_ratio=self.devicePixelRatioF())
         for polygon in polygons:
-            # Create a QPixmap object with the specified dimensions (32x32)
-            pixmap = QPixmap(32, 32)
-            # Fill the pixmap with a transparent background
-            pixmap.fill(Qt.transparent)
-
-            # Create a QPainter object to draw on the QPixmap
-            painter = QPainter(pixmap)
-            # Set the pen color to black for drawing the polygon's outline
-            painter.setPen(Qt.black)
-            # Set the brush color to blue for filling the polygon
-            painter.setBrush(Qt.blue)
-
-            # Draw the polygon on the QPixmap using the QPainter
-            painter.drawPolygon(polygon)
-            # End the QPainter's drawing operations
-            painter.end()
-
-            # Create a QIcon object from the QPixmap containing the drawn polygon
-            polygon_icon = QIcon(pixmap)
+            # Black outline, blue fill, as before
+            polygon_icon = icon_atlas.icon(polygon, Qt.black, Qt.blue)
 
             # Create a QAction with the QIcon and a text label, and add it to the toolbar
             polygon_action = QAction(polygon_icon, "Polygon", self)
             toolbar.addAction(polygon_action)
+        icon_atlas.save()
 
         # Add the toolbar to the main window
         self.addToolBar(toolbar)
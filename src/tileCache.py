@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from PySide2.QtCore import Qt, QRectF
+from PySide2.QtGui import QPixmap, QPainter, QTransform, QColor
+from PySide2.QtWidgets import QStyleOptionGraphicsItem
+
+
+class TileCache:
+    # LRU of fixed-size pixmap tiles keyed by (zoom, column, row), bounded by a byte budget.
+    def __init__(self, tile_size=256, memory_budget=64 * 1024 * 1024):
+        self.tile_size = tile_size
+        self.memory_budget = memory_budget
+        self._tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def tile_bytes(self):
+        return self.tile_size * self.tile_size * 4
+
+    @property
+    def max_tiles(self):
+        return max(1, self.memory_budget // self.tile_bytes)
+
+    def memory_used(self):
+        return len(self._tiles) * self.tile_bytes
+
+    def get(self, key):
+        pixmap = self._tiles.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tiles.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap):
+        self._tiles[key] = pixmap
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+
+    def clear(self):
+        self._tiles.clear()
+
+    def __len__(self):
+        return len(self._tiles)
+
+
+class TiledBackground:
+    # Renders the background colour and a list of static layer items into screen-aligned tiles.
+    # Tiles live in zoomed scene space (scene * zoom), so panning only shifts where cached
+    # tiles are blitted and zooming starts a new set of keys.
+    def __init__(self, tile_size=256, memory_budget=64 * 1024 * 1024):
+        self.cache = TileCache(tile_size, memory_budget)
+        self.background_color = QColor(Qt.black)
+        self.layers = []
+
+    def set_background_color(self, color):
+        self.background_color = QColor(color)
+        self.cache.clear()
+
+    def add_layer(self, item):
+        self.layers.append(item)
+        self.cache.clear()
+
+    def remove_layer(self, item):
+        if item in self.layers:
+            self.layers.remove(item)
+            self.cache.clear()
+
+    def invalidate(self):
+        self.cache.clear()
+
+    def can_draw(self, transform):
+        return transform.m12() == 0 and transform.m21() == 0 and transform.m11() > 0 \
+            and transform.m11() == transform.m22()
+
+    def draw(self, painter, viewport_rect, transform):
+        # viewport_rect is in device pixels, transform is the view's viewportTransform().
+        size = self.cache.tile_size
+        zoom = transform.m11()
+        zoom_key = round(zoom, 6)
+        dx = round(transform.dx())
+        dy = round(transform.dy())
+
+        first_column = (viewport_rect.left() - dx) // size
+        last_column = (viewport_rect.right() - dx) // size
+        first_row = (viewport_rect.top() - dy) // size
+        last_row = (viewport_rect.bottom() - dy) // size
+
+        painter.save()
+        # Draw in viewport pixels; keeps any extra device mapping (e.g. QGraphicsView.render())
+        painter.setWorldTransform(transform.inverted()[0], True)
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                key = (zoom_key, column, row)
+                pixmap = self.cache.get(key)
+                if pixmap is None:
+                    pixmap = self.render_tile(zoom, column, row)
+                    self.cache.put(key, pixmap)
+                painter.drawPixmap(column * size + dx, row * size + dy, pixmap)
+        painter.restore()
+
+    def render_tile(self, zoom, column, row):
+        size = self.cache.tile_size
+        pixmap = QPixmap(size, size)
+        pixmap.fill(self.background_color)
+
+        tile_transform = QTransform(zoom, 0, 0, zoom, -column * size, -row * size)
+        scene_rect = QRectF(column * size / zoom, row * size / zoom, size / zoom, size / zoom)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        option = QStyleOptionGraphicsItem()
+        for item in self.layers:
+            if not item.isVisible():
+                continue
+            item_rect = item.sceneTransform().inverted()[0].mapRect(scene_rect)
+            if not item_rect.intersects(item.boundingRect()):
+                continue
+            option.exposedRect = item_rect
+            painter.setTransform(item.sceneTransform() * tile_transform)
+            painter.setOpacity(item.opacity())
+            item.paint(painter, option, None)
+        painter.end()
+        return pixmap
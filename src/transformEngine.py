@@ -0,0 +1,127 @@
+import numpy as np
+
+# Bulk layout edits on whole selections. The functions work on plain arrays:
+# positions (n, 2), bounds (n, 4) as left, top, right, bottom, rotation/scale (n,).
+# They return new arrays and never touch Qt.
+EDGES = ("left", "right", "top", "bottom", "hcenter", "vcenter")
+
+
+def snap(positions, spacing, origin=(0.0, 0.0)):
+    origin = np.asarray(origin, dtype=np.float64)
+    return np.round((positions - origin) / spacing) * spacing + origin
+
+
+def mirror(positions, rotation, axis_x):
+    # Left/right mirror of the control origins about the vertical line x = axis_x; the
+    # outlines need mirror_outline as well, or off-centre shapes land in the wrong place
+    mirrored = positions.copy()
+    mirrored[:, 0] = 2.0 * axis_x - positions[:, 0]
+    return mirrored, np.mod(-rotation, 360.0).astype(rotation.dtype)
+
+
+def mirror_outline(points):
+    return points * np.array((-1.0, 1.0), dtype=points.dtype)
+
+
+def align(positions, bounds, edge):
+    # Moves every control so the given edge (or center) lines up with the selection's
+    axis = 0 if edge in ("left", "right", "hcenter") else 1
+    low, high = bounds[:, axis], bounds[:, axis + 2]
+    if edge in ("left", "top"):
+        offset = low.min() - low
+    elif edge in ("right", "bottom"):
+        offset = high.max() - high
+    elif edge in ("hcenter", "vcenter"):
+        offset = (low.min() + high.max()) / 2.0 - (low + high) / 2.0
+    else:
+        raise ValueError(f"unknown edge {edge!r}, expected one of {EDGES}")
+    aligned = positions.copy()
+    aligned[:, axis] += offset
+    return aligned
+
+
+def distribute(positions, bounds, axis=0):
+    # Even spacing of control centers along x (axis=0) or y (axis=1); the two outermost
+    # controls stay where they are and the order along the axis is kept
+    if len(positions) < 3:
+        return positions.copy()
+    centers = (bounds[:, axis] + bounds[:, axis + 2]) / 2.0
+    order = np.argsort(centers, kind="stable")
+    targets = np.empty_like(centers)
+    targets[order] = np.linspace(centers[order[0]], centers[order[-1]], len(centers))
+    distributed = positions.copy()
+    distributed[:, axis] += targets - centers
+    return distributed
+
+
+def scale_layout(positions, scale, factor, pivot):
+    # Spreads (factor > 1) or gathers the controls around pivot and resizes them by factor
+    pivot = np.asarray(pivot, dtype=np.float64)
+    return pivot + (positions - pivot) * factor, (scale * factor).astype(scale.dtype)
+
+
+class TransformEngine:
+    # Applies the functions above to the selected controls of a polygons.CustomGraphicsScene:
+    # the selection is read from its ControlModel as arrays, transformed in one pass and
+    # written back through scene.edit_controls, so a 400-control mirror is one model update
+    # and one item refresh. Every call returns an edit (ids, before, after), where before
+    # and after map update_controls keywords to arrays; the scene's journal records it as
+    # one undo step.
+    def __init__(self, scene):
+        self.scene = scene
+
+    def selection(self):
+        model = self.scene.control_model()
+        ids = self.scene.selected_control_ids()
+        return model, ids, model.rows(ids)
+
+    def commit(self, model, ids, rows, **after):
+        changed = {name: values for name, values in after.items()
+                   if not np.array_equal(values, model.values(name, rows))}
+        if not len(ids) or not changed:
+            return None
+        before = {name: model.values(name, rows) for name in changed}
+        self.scene.edit_controls(ids, **changed)
+        return ids, before, changed
+
+    def snap_to_grid(self, grid):
+        # grid: a gridItem.Grid (its spacing and position) or a plain spacing
+        spacing = getattr(grid, "spacing", grid)
+        origin = (grid.x(), grid.y()) if hasattr(grid, "spacing") else (0.0, 0.0)
+        model, ids, rows = self.selection()
+        return self.commit(model, ids, rows, positions=snap(model.pos[rows], spacing, origin))
+
+    def mirror(self, axis_x=None):
+        # Defaults to the center line of the whole picker, so left controls land on the right
+        model, ids, rows = self.selection()
+        if not len(rows):
+            return None
+        if axis_x is None:
+            bounds = model.bounds()
+            axis_x = (bounds[:, 0].min() + bounds[:, 2].max()) / 2.0
+        positions, rotation = mirror(model.pos[rows], model.rotation[rows], axis_x)
+        unique, inverse = np.unique(model.shape[rows], return_inverse=True)
+        flipped = np.array([model.register_shape(mirror_outline(model.shapes[shape])) for shape in unique.tolist()],
+                           dtype=np.int32)
+        return self.commit(model, ids, rows, positions=positions, rotation=rotation, shapes=flipped[inverse])
+
+    def align(self, edge):
+        model, ids, rows = self.selection()
+        if not len(rows):
+            return None
+        return self.commit(model, ids, rows, positions=align(model.pos[rows], model.bounds(rows), edge))
+
+    def distribute(self, axis=0):
+        model, ids, rows = self.selection()
+        return self.commit(model, ids, rows, positions=distribute(model.pos[rows], model.bounds(rows), axis))
+
+    def scale(self, factor, pivot=None):
+        # Defaults to scaling around the center of the selection's bounds
+        model, ids, rows = self.selection()
+        if not len(rows):
+            return None
+        if pivot is None:
+            bounds = model.bounds(rows)
+            pivot = ((bounds[:, 0].min() + bounds[:, 2].max()) / 2.0, (bounds[:, 1].min() + bounds[:, 3].max()) / 2.0)
+        positions, scale = scale_layout(model.pos[rows], model.scale[rows], factor, pivot)
+        return self.commit(model, ids, rows, positions=positions, scale=scale)
@@ -1,7 +1,8 @@
 import sys
 from PySide2.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton
-from PySide2.QtGui import QPainter, QPolygon, QColor, QPen
+from PySide2.QtGui import QPainter, QPolygon, QColor, QPen, QTransform
 from PySide2.QtCore import QPoint, Qt
+from pickBuffer import PickBuffer
 
 class TriangleWidget(QWidget):
     def __init__(self):
@@ -10,22 +11,28 @@ class TriangleWidget(QWidget):
         self.triangle_pos = QPoint(0, 0)
         self.dragging = False
         self.mouse_offset = QPoint(0, 0)
+        self._triangle = None
+        self._triangle_size = None
+        self.pick_buffer = PickBuffer()
+
+    def triangle(self):
+        # Untranslated outline, rebuilt only when the widget is resized
+        if self._triangle_size != self.size():
+            self._triangle_size = self.size()
+            self._triangle = QPolygon([
+                QPoint(self.width() // 2, self.height() // 4),
+                QPoint(self.width() // 4, 3 * self.height() // 4),
+                QPoint(3 * self.width() // 4, 3 * self.height() // 4)
+            ])
+        return self._triangle
 
     def paintEvent(self, event):
         if self.draw_triangle:
             painter = QPainter(self)
             painter.setBrush(QColor(255, 0, 0))
             painter.setPen(QPen(Qt.black, 2))
-
-            triangle = QPolygon([
-                QPoint(self.width() // 2, self.height() // 4),
-                QPoint(self.width() // 4, 3 * self.height() // 4),
-                QPoint(3 * self.width() // 4, 3 * self.height() // 4)
-            ])
-
-            triangle.translate(self.triangle_pos)
-
-            painter.drawPolygon(triangle)
+            painter.translate(self.triangle_pos)
+            painter.drawPolygon(self.triangle())
             painter.end()
 
     def display_triangle(self):
@@ -36,15 +43,13 @@ class TriangleWidget(QWidget):
         if not self.draw_triangle:
             return
 
-        triangle = QPolygon([
-            QPoint(self.width() // 2, self.height() // 4),
-            QPoint(self.width() // 4, 3 * self.height() // 4),
-            QPoint(3 * self.width() // 4, 3 * self.height() // 4)
-        ])
-
-        triangle.translate(self.triangle_pos)
+        # The pick buffer is redrawn only after the triangle moved or the widget resized
+        key = (self.size(), QPoint(self.triangle_pos))
+        if not self.pick_buffer.valid(key):
+            transform = QTransform.fromTranslate(self.triangle_pos.x(), self.triangle_pos.y())
+            self.pick_buffer.render(self.size(), [(self, self.triangle(), transform)], key)
 
-        if triangle.containsPoint(event.pos(), Qt.WindingFill):
+        if self.pick_buffer.at(event.x(), event.y()) is self:
             self.dragging = True
             self.mouse_offset = self.triangle_pos - event.pos()
 
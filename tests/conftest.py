@@ -0,0 +1,60 @@
+import gc
+import os
+import sys
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PySide2.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(autouse=True)
+def collect_garbage():
+    # Qt objects left in reference cycles by a test must be freed on the GUI thread; a
+    # collection triggered later on a worker thread (the autosave writer) would free them there
+    yield
+    gc.collect()
+
+
+@pytest.fixture
+def make_virtual_scene(qapp):
+    # Virtualized polygons.CustomGraphicsScenes, each in a shown 400x300 view centred on the
+    # origin, holding a grid x grid block of controls 120 units apart named ctrl_<row>.
+    # Autosave, virtualizer and view are closed after the test.
+    import numpy as np
+    from polygons import CustomGraphicsScene, CustomGraphicsView, PolygonItems
+    made = []
+
+    def make(grid=30, margin=0.0):
+        scene = CustomGraphicsScene()
+        view = CustomGraphicsView(scene)
+        view.resize(400, 300)
+        view.show()
+        scene.enable_virtualization(view, margin=margin)
+        if grid:
+            model = scene.model
+            shape = model.register_shape(PolygonItems().outline())
+            xs, ys = np.meshgrid(np.arange(grid) * 120.0, np.arange(grid) * 120.0)
+            model.add_controls(np.full(grid * grid, shape), np.stack((xs.ravel(), ys.ravel()), axis=1),
+                               names=[f"ctrl_{i}" for i in range(grid * grid)])
+        view.centerOn(0, 0)
+        scene.virtualizer.refresh()
+        made.append((scene, view))
+        return scene, view
+
+    yield make
+    for scene, view in made:
+        if scene.autosave is not None:
+            scene.autosave.close()
+        scene.virtualizer.close()
+        view.close()
+
+
+@pytest.fixture
+def virtual_scene(make_virtual_scene):
+    return make_virtual_scene()
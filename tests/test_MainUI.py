@@ -0,0 +1,97 @@
+import os
+import time
+import numpy as np
+import pytest
+
+
+def wait_for(condition, qapp, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def layout_path(tmp_path):
+    from pickerLayout import write_layout
+    square = np.array(((-5, -5), (5, -5), (5, 5), (-5, 5)), dtype=np.float32)
+    positions = np.stack((np.zeros(40), np.arange(40) * 20.0), axis=1)
+    path = str(tmp_path / "body.upk")
+    write_layout(path, [square], positions, np.zeros(40), np.full(40, 0xFF0000FF, dtype=np.uint32))
+    return path
+
+
+@pytest.fixture
+def tabs(qapp, layout_path):
+    from MainUI import CustomTabWidget, PickerPage, remove_snapshot
+    tabs = CustomTabWidget(idle_timeout_ms=60000)
+    calls = []
+
+    def factory():
+        calls.append("factory")
+        return PickerPage(layout_path)
+
+    def restore_factory(snapshot):
+        calls.append("restore")
+        return PickerPage(snapshot=snapshot)
+    tabs.add_lazy_tab(factory, "Body", restore_factory, remove_snapshot)
+    tabs.add_lazy_tab(factory, "Face", restore_factory, remove_snapshot)
+    tabs.setCurrentIndex(1)
+    wait_for(lambda: not tabs.page(1).scene.loader.is_loading(), qapp)
+    tabs.setCurrentIndex(0)
+    assert tabs.unload(1)
+    return tabs, calls
+
+
+def test_restore_builds_page_from_snapshot(qapp, tabs):
+    tabs, calls = tabs
+    snapshot = tabs.lazy_tab(1).snapshot
+    assert os.path.exists(snapshot)
+    calls.clear()
+    tabs.setCurrentIndex(1)
+    assert calls == ["restore"]
+    assert len(tabs.page(1).scene.spatial_index) == 40
+    assert not os.path.exists(snapshot)
+
+
+def test_destroying_widget_removes_unloaded_snapshots(qapp, tabs):
+    from shiboken2 import delete
+    tabs, calls = tabs
+    snapshot = tabs.lazy_tab(1).snapshot
+    delete(tabs)
+    assert not os.path.exists(snapshot)
+
+
+def test_remove_tab_discards_snapshot(qapp, tabs):
+    tabs, calls = tabs
+    snapshot = tabs.lazy_tab(1).snapshot
+    tabs.removeTab(1)
+    assert not os.path.exists(snapshot)
+
+
+def rows_by_id(model):
+    rows = range(model.count)
+    return {int(model.ids[row]): (tuple(model.pos[row]), float(model.rotation[row]), float(model.scale[row]),
+                                  int(model.color[row]), int(model.flags[row]), model.names[row],
+                                  model.groups[model.group[row]] if model.group[row] >= 0 else None)
+            for row in rows}
+
+
+def test_unload_keeps_ids_transforms_and_groups(qapp, tabs):
+    tabs, calls = tabs
+    tabs.setCurrentIndex(1)
+    scene = tabs.page(1).scene
+    model = scene.control_model()
+    ids = model.ids[:4].copy()
+    groups = [model.group_id("arm")] * 2 + [model.group_id("leg")] * 2
+    scene.edit_controls(ids, rotation=[10.0, 20.0, 30.0, 45.0], scale=[0.5, 1.5, 2.0, 3.0], groups=groups)
+    expected = rows_by_id(scene.control_model())
+    tabs.setCurrentIndex(0)
+    assert tabs.unload(1)
+    tabs.setCurrentIndex(1)
+    scene = tabs.page(1).scene
+    assert rows_by_id(scene.control_model()) == expected
+    items = scene.model_binding.items
+    assert [(items[control_id].rotation(), items[control_id].scale()) for control_id in ids.tolist()] == \
+        [(10.0, 0.5), (20.0, 1.5), (30.0, 2.0), (45.0, 3.0)]
@@ -0,0 +1,66 @@
+import os
+import shutil
+import time
+import numpy as np
+import pytest
+from PySide2.QtWidgets import QApplication
+
+
+def wait_for(condition, qapp, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def crash_copy(scene, source, target):
+    # The files as a crash would leave them: records logged, no final compaction
+    service = scene.autosave
+    service.tick()
+    wait_for(lambda: service.writer.queue.empty() and service.writer.log_bytes > 0, QApplication.instance())
+    shutil.copy(source, target)
+    shutil.copy(source + ".wal", target + ".wal")
+
+
+def test_recovers_into_virtual_scene(make_virtual_scene, virtual_scene, tmp_path):
+    scene, view = virtual_scene
+    path = str(tmp_path / "picker.npz")
+    scene.enable_autosave(path, interval_ms=10)
+    model = scene.model
+    shape = model.register_shape([(-10, -10), (10, -10), (0, 10)])
+    ids = model.add_controls(np.full(5, shape), [(i * 30.0, 0.0) for i in range(5)])
+    model.update_controls(ids[:1], positions=[(7.0, 9.0)], colors=[0xFF112233])
+    model.remove_controls(ids[4:])
+    crash_copy(scene, path, str(tmp_path / "crashed.npz"))
+    expected = model.snapshot(model.ids[:model.count])
+
+    other, other_view = make_virtual_scene(grid=0)
+    service, count = other.enable_autosave(str(tmp_path / "crashed.npz"))
+    assert count == len(expected["ids"])
+    recovered = other.model
+    rows = recovered.rows(expected["ids"])
+    assert np.allclose(recovered.pos[rows], expected["positions"])
+    assert np.array_equal(recovered.color[rows], expected["colors"])
+    other.virtualizer.refresh()
+    assert set(ids[:4].tolist()) <= set(other.virtualizer.active) <= set(expected["ids"].tolist())
+    assert all(item.isVisible() for item in other.virtualizer.active.values())
+
+
+def test_clean_close_leaves_nothing_to_recover(virtual_scene, tmp_path):
+    from autosave import recover
+    scene, view = virtual_scene
+    path = str(tmp_path / "picker.npz")
+    scene.enable_autosave(path, interval_ms=10)
+    scene.model.add_controls([scene.model.register_shape([(0, 0), (5, 0), (0, 5)])], [(1.0, 2.0)])
+    scene.autosave.close()
+    scene.autosave = None
+    assert os.path.getsize(path + ".wal") == 0
+    assert recover(path) is None
+
+
+def test_refuses_layout_paths(virtual_scene, tmp_path):
+    scene, view = virtual_scene
+    with pytest.raises(ValueError):
+        scene.enable_autosave(str(tmp_path / "picker.upk"))
+    assert scene.autosave is None
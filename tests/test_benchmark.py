@@ -0,0 +1,20 @@
+import pytest
+
+
+@pytest.mark.parametrize("suite, kwargs", [
+    ("bench_spatial_index", {"counts": (50,), "queries": 5}),
+    ("bench_paint", {"counts": (20,), "repeat": 1}),
+    ("bench_picker", {"counts": (20,), "steps": 2}),
+    ("bench_startup", {"repeat": 1}),
+])
+def test_suite_runs_and_compares(qapp, suite, kwargs):
+    import benchmark
+    results = getattr(benchmark, suite)(**kwargs)
+    assert results
+    assert benchmark.compare_results(results, results) == []
+    slower = [{key: value * 2.0 if key.endswith("_ms") else value / 2.0 if key.endswith("_per_s") else value
+               for key, value in result.items()} for result in results]
+    timed = sum(isinstance(value, float) and value > 0 and key.endswith(("_ms", "_per_s"))
+                for result in results for key, value in result.items())
+    assert len(benchmark.compare_results(slower, results)) == timed
+    assert benchmark.compare_results(results, slower) == []
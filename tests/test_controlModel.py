@@ -0,0 +1,45 @@
+import sys
+import numpy as np
+import pytest
+from controlModel import ControlModel
+
+
+def square_model(count):
+    model = ControlModel()
+    shape = model.register_shape([(-5, -5), (5, -5), (5, 5), (-5, 5)])
+    model.add_controls(np.full(count, shape), np.stack((np.arange(count) * 20.0, np.zeros(count)), axis=1),
+                       names=[f"ctrl_{i}" for i in range(count)])
+    return model
+
+
+def test_layout_round_trip_keeps_ids(tmp_path):
+    model = square_model(10)
+    path = str(tmp_path / "layout.upk")
+    model.to_layout(path)
+    loaded = ControlModel.from_layout(path)
+    assert np.array_equal(loaded.ids[:loaded.count], model.ids[:model.count])
+    assert loaded.names[loaded.rows(model.ids[:3])].tolist() == ["ctrl_0", "ctrl_1", "ctrl_2"]
+
+
+def test_reading_a_layout_twice_gives_new_ids(tmp_path):
+    model = square_model(10)
+    path = str(tmp_path / "layout.upk")
+    model.to_layout(path)
+    first = model.read_layout(path)
+    assert not set(first.tolist()) & set(model.ids[:10].tolist())
+    assert len(np.unique(model.ids[:model.count])) == model.count == 20
+
+
+def test_add_controls_rejects_taken_and_repeated_ids():
+    model = square_model(3)
+    with pytest.raises(ValueError):
+        model.add_controls([0], [(0.0, 0.0)], ids=model.ids[:1])
+    with pytest.raises(ValueError):
+        model.add_controls([0, 0], [(0.0, 0.0), (1.0, 1.0)], ids=[10 ** 9, 10 ** 9])
+    assert model.count == 3
+
+
+def test_memory_bytes_counts_the_id_index():
+    model = square_model(1000)
+    assert model.memory_bytes() >= sys.getsizeof(model.row_of_id) + model.count * (
+        model.ids.itemsize + model.pos.itemsize * 2)
@@ -0,0 +1,34 @@
+from PySide2.QtCore import QPointF
+from PySide2.QtGui import QColor, QPolygonF
+
+
+def triangle():
+    return QPolygonF([QPointF(-50, -50), QPointF(0, 50), QPointF(50, -50)])
+
+
+def test_same_outline_shares_preview(qapp):
+    from drapAndDrop import DraggablePolygon, PreviewCache
+    cache = PreviewCache()
+    first, second = DraggablePolygon(triangle()), DraggablePolygon(triangle())
+    assert first.shape_id == second.shape_id
+    assert cache.pixmap(first) is cache.pixmap(second)
+    other = DraggablePolygon(QPolygonF([QPointF(0, 0), QPointF(10, 0), QPointF(0, 10)]))
+    assert other.shape_id != first.shape_id
+
+
+def test_spread_selection_preview_is_capped(qapp):
+    from PySide2.QtWidgets import QGraphicsScene
+    from drapAndDrop import DraggablePolygon, drag_preview
+    scene = QGraphicsScene()
+    items = []
+    for x, y in ((0, 0), (20000, 5000)):
+        item = DraggablePolygon(triangle(), QColor(255, 0, 0))
+        item.setPos(x, y)
+        scene.addItem(item)
+        items.append(item)
+    pixmap, hot_spot = drag_preview(items, QPointF(20000, 5000), max_size=512)
+    assert max(pixmap.width(), pixmap.height()) <= 512
+    assert 0 <= hot_spot.x() <= pixmap.width() and 0 <= hot_spot.y() <= pixmap.height()
+    small, spot = drag_preview(items[:1], QPointF(0, 0), max_size=512)
+    assert (small.width(), small.height()) == (102, 102)  # unscaled: outline plus the pen margin
+    assert (spot.x(), spot.y()) == (51, 51)
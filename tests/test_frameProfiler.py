@@ -0,0 +1,72 @@
+import pytest
+from PySide2.QtCore import QRect
+
+
+def render(view, qapp):
+    view.viewport().repaint()
+    qapp.processEvents()
+
+
+@pytest.fixture(params=["UI", "gridItem", "polygons"])
+def view(qapp, request):
+    if request.param == "gridItem":
+        from gridItem import CustomGraphicsView
+        view = CustomGraphicsView(tile_cache=True)
+    elif request.param == "UI":
+        from PySide2.QtWidgets import QGraphicsScene
+        from UI import GridGraphicsView
+        view = GridGraphicsView()
+        view.setScene(QGraphicsScene(view))
+    else:
+        from polygons import CustomGraphicsScene, CustomGraphicsView
+        scene = CustomGraphicsScene()
+        view = CustomGraphicsView(scene)
+        scene.setParent(view)
+    view.resize(300, 200)
+    view.show()
+    yield view
+    view.set_profiler(None)
+    view.close()
+
+
+def test_views_record_paints_and_scene_update_times(qapp, view):
+    from frameProfiler import FrameProfiler
+    profiler = FrameProfiler()
+    view.set_profiler(profiler)
+    render(view, qapp)
+    assert profiler.paint_calls > 0
+    scene = profiler.scene_of(view)
+    for step in range(3):
+        scene.addRect(step * 10, 0, 5, 5)
+        qapp.processEvents()
+    updates = profiler.channels["scene_update"].values()
+    assert len(updates) >= 1
+    assert (updates >= 0).all() and (updates < 1000).all()
+
+
+def test_overlay_item_count_is_cached(qapp, view):
+    from frameProfiler import FrameProfiler
+    profiler = FrameProfiler()
+    view.set_profiler(profiler)
+    scene = profiler.scene_of(view)
+    name = "items_in_rect" if hasattr(scene, "items_in_rect") else "items"
+    original = getattr(scene, name)
+    calls = []
+    setattr(scene, name, lambda *args: calls.append(args) or original(*args))
+    for frame in range(20):
+        profiler.visible_item_count(view)
+    assert len(calls) == 1
+    view.horizontalScrollBar().setValue(view.horizontalScrollBar().value() + 50)
+    profiler._count_time -= profiler.COUNT_INTERVAL
+    profiler.visible_item_count(view)
+    assert len(calls) == 2
+
+
+def test_removing_profiler_stops_recording(qapp, view):
+    from frameProfiler import FrameProfiler
+    profiler = FrameProfiler()
+    view.set_profiler(profiler)
+    view.set_profiler(None)
+    profiler.scene_of(view).addRect(0, 0, 5, 5)
+    render(view, qapp)
+    assert profiler.paint_calls == 0 and not len(profiler.channels["scene_update"])
@@ -0,0 +1,64 @@
+from PySide2.QtGui import QColor, QImage
+
+
+def grab(view, qapp):
+    view.viewport().repaint()
+    qapp.processEvents()
+    return view.viewport().grab().toImage().convertToFormat(QImage.Format_RGB32)
+
+
+def test_tile_cache_draws_like_the_scene_items(qapp):
+    from gridItem import CustomGraphicsView
+    from frameProfiler import FrameProfiler
+    view = CustomGraphicsView(background_color=QColor(0, 0, 0))
+    view.resize(400, 300)
+    view.show()
+    view.centerOn(1000, 1000)  # the grid covers 500..1500
+    plain = grab(view, qapp)
+    assert len({plain.pixel(x, 100) for x in range(plain.width())}) > 1  # grid lines, not just background
+    profiler = FrameProfiler(overlay=False)
+    view.set_profiler(profiler)
+    view.set_tile_cache_enabled(True)
+    cached = grab(view, qapp)
+    assert len(view.tiled_background.cache) > 0
+    assert profiler.paint_calls > 0
+    assert cached == plain
+    view.set_profiler(None)
+    view.close()
+
+
+def paint_grid(grid, exposed, size=(300, 200)):
+    from PySide2.QtGui import QPainter
+    from PySide2.QtWidgets import QStyleOptionGraphicsItem
+    image = QImage(*size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    option = QStyleOptionGraphicsItem()
+    option.exposedRect = exposed
+    painter = QPainter(image)
+    grid.paint(painter, option)
+    painter.end()
+    return image
+
+
+def test_grid_paints_only_the_exposed_rect(qapp):
+    from PySide2.QtCore import QRectF
+    from gridItem import Grid
+    grid = Grid(250, 150, 10)
+    drawn = []
+    draw = grid.renderer.draw
+    grid.renderer.draw = lambda painter, rect, *args: drawn.append(QRectF(rect)) or draw(painter, rect, *args)
+    full = paint_grid(grid, QRectF(0, 0, 300, 200))
+    part = paint_grid(grid, QRectF(40, 30, 60, 50))
+    assert drawn == [QRectF(0, 0, 250, 150), QRectF(40, 30, 60, 50)]
+    assert part.copy(40, 30, 60, 50) == full.copy(40, 30, 60, 50)
+    assert paint_grid(grid, QRectF(260, 160, 30, 30)) == paint_grid(grid, QRectF())  # outside: nothing
+    assert len(drawn) == 2
+
+
+def test_unbounded_grid(qapp):
+    from gridItem import Grid
+    grid = Grid(None, None, 50)
+    rect = grid.boundingRect()
+    assert rect.left() <= -Grid.INFINITE_EXTENT and rect.right() >= Grid.INFINITE_EXTENT
+    grid.set_size(100, 100)
+    assert grid.boundingRect().width() == 100 + 2 * grid.pen().widthF()
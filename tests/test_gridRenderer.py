@@ -0,0 +1,61 @@
+import math
+import pytest
+from PySide2.QtCore import QRectF
+
+
+def brute_force_lines(rect, spacing, major_every):
+    # Every multiple of spacing inside rect, as (is_major, line tuple)
+    lines = []
+    for i in range(math.floor(rect.left() / spacing) - 1, math.ceil(rect.right() / spacing) + 2):
+        if rect.left() <= i * spacing <= rect.right():
+            lines.append((i % major_every == 0, (i * spacing, rect.top(), i * spacing, rect.bottom())))
+    for i in range(math.floor(rect.top() / spacing) - 1, math.ceil(rect.bottom() / spacing) + 2):
+        if rect.top() <= i * spacing <= rect.bottom():
+            lines.append((i % major_every == 0, (rect.left(), i * spacing, rect.right(), i * spacing)))
+    return lines
+
+
+def as_tuples(lines):
+    return sorted((line.x1(), line.y1(), line.x2(), line.y2()) for line in lines)
+
+
+@pytest.mark.parametrize("rect", [QRectF(0, 0, 400, 300), QRectF(-137.5, -20.25, 333, 421), QRectF(15, 15, 4, 4)])
+def test_fill_lines_matches_brute_force(rect):
+    from gridRenderer import GridRenderer
+    renderer = GridRenderer(spacing=20, major_every=5)
+    minor_count, major_count = renderer.fill_lines(rect, 20.0)
+    expected = brute_force_lines(rect, 20.0, 5)
+    assert as_tuples(renderer._major_lines[:major_count]) == sorted(line for major, line in expected if major)
+    assert as_tuples(renderer._minor_lines[:minor_count]) == sorted(line for major, line in expected if not major)
+    assert renderer.line_count(rect, 20.0) == len(expected)
+
+
+def test_minor_lines_are_full_alpha_from_one_to_one():
+    from gridRenderer import GridRenderer
+    renderer = GridRenderer(spacing=20)
+    rect = QRectF(0, 0, 400, 300)
+    for scale in (1.0, 1.5, 4.0):
+        assert renderer.level_of_detail(scale, rect) == (20.0, 1.0)
+    spacing, fade = renderer.level_of_detail(0.7, rect)
+    assert spacing == 20.0 and 0.0 < fade < 1.0
+
+
+def test_fade_is_continuous_across_levels():
+    from gridRenderer import GridRenderer
+    renderer = GridRenderer(spacing=20, major_every=5, min_pixel_spacing=8.0)
+    rect = QRectF(0, 0, 100, 100)
+    threshold = 8.0 / 20.0  # the scale at which the spacing steps up
+    below_spacing, below_fade = renderer.level_of_detail(threshold - 1e-9, rect)
+    above_spacing, above_fade = renderer.level_of_detail(threshold + 1e-9, rect)
+    assert (below_spacing, above_spacing) == (100.0, 20.0)
+    assert above_fade == pytest.approx(0.0, abs=1e-6)  # old minor lines faded out...
+    assert below_fade == pytest.approx(1.0)  # ...and the old major lines carry on as full minor lines
+
+
+def test_line_count_is_capped():
+    from gridRenderer import GridRenderer
+    renderer = GridRenderer(spacing=20, max_lines=64)
+    rect = QRectF(-5000, -5000, 10000, 10000)
+    spacing, fade = renderer.level_of_detail(1.0, rect)
+    assert renderer.line_count(rect, spacing) <= 64
+    assert sum(renderer.fill_lines(rect, spacing)) <= 64
@@ -0,0 +1,71 @@
+import os
+import sys
+import pytest
+
+
+MODULES = {
+    "hr_base": "VALUE = 1\n",
+    "hr_middle": "import hr_base\nVALUE = hr_base.VALUE + 1\n",
+    "hr_top": "from hr_middle import VALUE as MIDDLE\nVALUE = MIDDLE + 1\n",
+    "hr_other": "VALUE = 10\n",
+}
+
+
+def write(path, text):
+    # Bumps the mtime explicitly: rewrites within one clock tick would look unchanged
+    stat = os.stat(path) if os.path.exists(path) else None
+    with open(path, "w") as file:
+        file.write(text)
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def modules(tmp_path):
+    import importlib
+    for name, text in MODULES.items():
+        write(str(tmp_path / f"{name}.py"), text)
+    sys.path.insert(0, str(tmp_path))
+    for name in ("hr_top", "hr_other"):
+        importlib.import_module(name)
+    yield tmp_path
+    sys.path.remove(str(tmp_path))
+    for name in MODULES:
+        sys.modules.pop(name, None)
+
+
+def test_reloads_changed_module_and_importers_in_order(modules):
+    from hotReload import HotReloader
+    messages = []
+    reloader = HotReloader(roots=(str(modules),), log=messages.append)
+    assert reloader.reload() == []
+    write(str(modules / "hr_base.py"), "VALUE = 5\n")
+    reloaded = [name for name, _ in reloader.reload()]
+    assert reloaded == ["hr_base", "hr_middle", "hr_top"]
+    assert sys.modules["hr_top"].VALUE == 7
+    assert messages[-1].startswith("hot reload: 3 module(s)")
+
+
+def test_touched_but_identical_file_is_not_reloaded(modules):
+    from hotReload import HotReloader
+    reloader = HotReloader(roots=(str(modules),), log=lambda message: None)
+    write(str(modules / "hr_other.py"), "VALUE = 11\n")
+    assert [name for name, _ in reloader.reload()] == ["hr_other"]
+    write(str(modules / "hr_other.py"), "VALUE = 11\n")  # new mtime, same bytes
+    assert reloader.reload() == []
+
+
+def test_force_reloads_everything_in_dependency_order(modules):
+    from hotReload import HotReloader
+    reloader = HotReloader(roots=(str(modules),), log=lambda message: None)
+    order = [name for name, _ in reloader.reload(force=True)]
+    assert sorted(order) == sorted(MODULES)
+    assert order.index("hr_base") < order.index("hr_middle") < order.index("hr_top")
+
+
+def test_reload_order_breaks_cycles():
+    from hotReload import HotReloader
+    reloader = HotReloader(log=lambda message: None)
+    reloader._imports = {"a": {"b"}, "b": {"a"}, "c": {"a"}}
+    order = reloader.reload_order({"a", "b", "c"}, {})
+    assert order.index("c") > min(order.index("a"), order.index("b")) and sorted(order) == ["a", "b", "c"]
@@ -0,0 +1,70 @@
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QImage, QPainter, QPixmap
+
+
+def plain_icon(polygon, size=32):
+    # How test.py drew toolbar icons before the atlas
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setPen(Qt.black)
+    painter.setBrush(Qt.blue)
+    painter.drawPolygon(polygon)
+    painter.end()
+    return pixmap.toImage().convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+
+def atlas_icon(atlas, polygon):
+    return atlas.pixmap(polygon, Qt.black, Qt.blue).toImage().convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+
+def test_icons_match_plain_pixmaps(qapp, tmp_path):
+    from iconAtlas import IconAtlas
+    from shapeLibrary import get_polygon
+    atlas = IconAtlas(str(tmp_path), icon_size=32)
+    for polygon in (get_polygon("triangle", 32, 32), get_polygon("square", 32)):
+        assert atlas_icon(atlas, polygon) == plain_icon(polygon)
+
+
+def test_outlines_stay_in_their_slot(qapp, tmp_path):
+    from PySide2.QtCore import QPointF
+    from PySide2.QtGui import QPolygonF
+    from iconAtlas import IconAtlas
+    from shapeLibrary import get_polygon
+    atlas = IconAtlas(str(tmp_path), icon_size=16, columns=2)
+    for size in (4, 6, 8):
+        atlas.icon(get_polygon("square", size))
+    before = atlas.image.copy()
+    # Slot 3 (bottom right), drawn well past all four sides of its slot
+    atlas.icon(QPolygonF([QPointF(-40, -40), QPointF(56, -40), QPointF(56, 56), QPointF(-40, 56)]))
+    for slot in range(3):
+        assert atlas.image.copy(atlas.slot_rect(slot)) == before.copy(atlas.slot_rect(slot))
+
+
+def test_warm_start_renders_nothing(qapp, tmp_path):
+    from iconAtlas import IconAtlas
+    from shapeLibrary import get_polygon
+    polygons = [get_polygon("triangle", 32, 32), get_polygon("square", 32), get_polygon("square", 20)]
+    cold = IconAtlas(str(tmp_path), icon_size=32)
+    images = [atlas_icon(cold, polygon) for polygon in polygons]
+    cold.save()
+    assert cold.rendered == len(polygons)
+    warm = IconAtlas(str(tmp_path), icon_size=32)
+    assert [atlas_icon(warm, polygon) for polygon in polygons] == images
+    assert warm.rendered == 0
+
+
+def test_save_prunes_unused_icons(qapp, tmp_path):
+    from iconAtlas import IconAtlas
+    from shapeLibrary import get_polygon
+    triangle, square = get_polygon("triangle", 32, 32), get_polygon("square", 32)
+    first = IconAtlas(str(tmp_path))
+    first.icon(triangle)
+    first.icon(square)
+    first.save()
+    second = IconAtlas(str(tmp_path))
+    image = atlas_icon(second, square)
+    second.save()
+    third = IconAtlas(str(tmp_path))
+    assert list(third.slots) == [third.key(square, Qt.black, Qt.blue)]
+    assert atlas_icon(third, square) == image and third.rendered == 0
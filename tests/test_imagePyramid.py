@@ -0,0 +1,57 @@
+import time
+from PySide2.QtGui import QColor, QImage
+from PySide2.QtWidgets import QGraphicsScene
+
+
+def wait_for(condition, qapp, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def write_image(path, width=600, height=400):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(40, 80, 120))
+    assert image.save(str(path), "PNG")
+    return str(path)
+
+
+def test_failed_build_is_reported(qapp, tmp_path):
+    from imagePyramid import ReferenceImageItem
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+    item = ReferenceImageItem(str(path), cache_dir=str(tmp_path / "cache"))
+    messages = []
+    item.failed.connect(messages.append)
+    wait_for(lambda: messages, qapp)
+    assert item.error == messages[0] and "broken.png" in item.error
+    assert item.builder is None and item.index is None
+
+
+def test_threads_stop_when_the_item_leaves_the_scene(qapp, tmp_path):
+    from imagePyramid import ReferenceImageItem
+    item = ReferenceImageItem(write_image(tmp_path / "art.png"), cache_dir=str(tmp_path / "cache"))
+    scene = QGraphicsScene()
+    scene.addItem(item)
+    wait_for(lambda: item.index is not None, qapp)
+    loader = item.loader
+    assert loader.isRunning()
+    scene.removeItem(item)
+    assert item.loader is None and not loader.isRunning()
+    scene.addItem(item)
+    assert item.loader.isRunning()
+    item.close()
+
+
+def test_threads_stop_when_the_scene_is_deleted(qapp, tmp_path):
+    import shiboken2
+    from imagePyramid import ReferenceImageItem
+    item = ReferenceImageItem(write_image(tmp_path / "art.png", 4000, 4000), cache_dir=str(tmp_path / "cache"))
+    builder = item.builder
+    scene = QGraphicsScene()
+    scene.addItem(item)
+    assert builder.isRunning()
+    shiboken2.delete(scene)
+    assert not builder.isRunning()
@@ -0,0 +1,61 @@
+def visible_items(scene):
+    from polygons import PolygonItems
+    return [item for item in scene.items() if isinstance(item, PolygonItems) and item.isVisible()]
+
+
+def test_pan_recycles_pooled_items(virtual_scene):
+    scene, view = virtual_scene
+    virtualizer = scene.virtualizer
+    first = set(virtualizer.active)
+    assert 0 < len(first) < len(scene.model)
+    created = virtualizer.created
+    view.centerOn(3000, 3000)
+    virtualizer.refresh()
+    assert virtualizer.active and not first & set(virtualizer.active)
+    assert virtualizer.created <= created + len(first)
+    assert len(visible_items(scene)) == len(virtualizer.active)
+    rect = virtualizer.visible_rect()
+    for control_id, item in virtualizer.active.items():
+        assert item.control_id == control_id
+        assert item.sceneBoundingRect().intersects(rect)
+
+
+def test_selection_survives_recycling(virtual_scene):
+    scene, view = virtual_scene
+    virtualizer = scene.virtualizer
+    control_id, item = next(iter(virtualizer.active.items()))
+    item.setSelected(True)
+    assert control_id in scene.selected_control_ids()
+    view.centerOn(3000, 3000)
+    virtualizer.refresh()
+    assert control_id not in virtualizer.active
+    assert control_id in scene.selected_control_ids()
+    view.centerOn(0, 0)
+    virtualizer.refresh()
+    assert virtualizer.active[control_id].isSelected()
+
+
+def test_deselect_hidden_keeps_items_selection(virtual_scene):
+    scene, view = virtual_scene
+    virtualizer = scene.virtualizer
+    shown = next(iter(virtualizer.active))
+    hidden = int(next(control_id for control_id in scene.model.ids[:scene.model.count].tolist()
+                      if control_id not in virtualizer.active))
+    scene.model.select([shown, hidden])
+    scene.deselect_hidden()
+    assert scene.selected_control_ids().tolist() == [shown]
+    assert virtualizer.active[shown].isSelected()
+
+
+def test_clear_controls_releases_items(virtual_scene):
+    scene, view = virtual_scene
+    virtualizer = scene.virtualizer
+    pooled = len(virtualizer.active)
+    scene.clear_controls()
+    assert len(scene.model) == 0
+    assert not virtualizer.active and len(virtualizer.pool) == pooled
+    assert not visible_items(scene)
+    assert all(item.scene() is scene for item in virtualizer.pool)
+    scene.model.add_controls([0], [(0.0, 0.0)])
+    virtualizer.refresh()
+    assert len(visible_items(scene)) == 1
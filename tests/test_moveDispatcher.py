@@ -0,0 +1,46 @@
+import time
+import numpy as np
+
+
+def run_frame(qapp, dispatcher):
+    deadline = time.monotonic() + 1.0
+    while len(dispatcher) and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.002)
+
+
+def test_one_batch_per_frame(qapp):
+    from polygons import CustomGraphicsScene
+    scene = CustomGraphicsScene()
+    items = [scene.add_star_polygon_item(40.0 * i, 0.0) for i in range(500)]
+    dispatcher = scene.move_dispatcher
+    dispatcher.flush()
+    batches = []
+    dispatcher.moved.connect(lambda ids, positions, moved: batches.append((ids, positions)))
+    for frame in range(3):
+        for step in range(4):  # several moves of every item within one frame
+            for item in items:
+                item.moveBy(1.0, 0.5)
+        assert not batches[frame:]
+        run_frame(qapp, dispatcher)
+        assert len(batches) == frame + 1
+    ids, positions = batches[-1]
+    assert ids.tolist() == [item.control_id for item in items]
+    assert np.allclose(positions, [(40.0 * i + 12.0, 6.0) for i in range(500)])
+
+
+def test_flush_reports_at_once_and_discard_drops(qapp):
+    from polygons import CustomGraphicsScene
+    scene = CustomGraphicsScene()
+    first, second = scene.add_star_polygon_item(0.0, 0.0), scene.add_star_polygon_item(50.0, 0.0)
+    dispatcher = scene.move_dispatcher
+    dispatcher.flush()
+    batches = []
+    dispatcher.moved.connect(lambda ids, positions, moved: batches.append(ids.tolist()))
+    first.moveBy(5.0, 0.0)
+    second.moveBy(5.0, 0.0)
+    dispatcher.discard(second)
+    dispatcher.flush()
+    assert batches == [[first.control_id]]
+    dispatcher.flush()
+    assert len(batches) == 1
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+PACKAGE = os.path.basename(SRC_DIR)
+
+
+def run(code):
+    # A fresh interpreter, so nothing imported by other tests hides a slow import
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join((os.path.dirname(SRC_DIR), os.path.join(SRC_DIR, "fakeUnreal")))
+    completed = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout.split()
+
+
+def test_import_loads_neither_qt_nor_engine():
+    loaded = run(f"import sys, {PACKAGE}\n"
+                 "print(*[name for name in ('PySide2', 'numpy', 'unreal', 'spatialIndex') if name in sys.modules])")
+    assert loaded == []
+
+
+def test_submodules_load_on_first_access():
+    result = run(f"import sys, {PACKAGE}\n"
+                 f"index = {PACKAGE}.spatialIndex\n"
+                 f"print(index is sys.modules['spatialIndex'], 'spatialIndex' in vars({PACKAGE}))\n"
+                 f"try:\n    {PACKAGE}.no_such_module\nexcept AttributeError:\n    print('missing')")
+    assert result == ["True", "True", "missing"]
+
+
+def test_log_goes_to_the_engine():
+    result = run(f"import {PACKAGE}, unreal\n{PACKAGE}.log('hello')\nprint(*unreal.log_messages)")
+    assert result == ["hello"]
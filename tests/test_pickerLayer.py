@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from PySide2.QtCore import QPointF, QRectF, Qt
+
+
+@pytest.fixture
+def layer(qapp):
+    from pickerLayer import PickerLayer
+    from shapeLibrary import get_polygon
+    layer = PickerLayer(capacity=16)  # small, so adding grows the arrays
+    star = layer.register_shape(get_polygon("star", 5, 20))
+    square = layer.register_shape(get_polygon("rounded_rect", 30, 30, 6))
+    rng = np.random.default_rng(2)
+    ids = layer.add_controls(rng.integers(0, 2, 400), rng.uniform(0, 1000, (400, 2)),
+                             np.full(400, 0xFF3050E0, dtype=np.uint32))
+    layer.remove_controls(ids[::7])
+    moved = layer.ids[1:50:3].copy()
+    layer.update_controls(moved, positions=rng.uniform(0, 1000, (len(moved), 2)), shapes=np.full(len(moved), square))
+    return layer
+
+
+def brute_rows_in_rect(layer, rect):
+    rows = []
+    for row in range(layer.count):
+        radius = layer.shape_radius[layer.shape[row]]
+        x, y = layer.pos[row]
+        if x + radius >= rect.left() and x - radius <= rect.right() and y + radius >= rect.top() \
+                and y - radius <= rect.bottom():
+            rows.append(row)
+    return rows
+
+
+def test_rows_in_rect_matches_full_filter(layer):
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        left, top = rng.uniform(-100, 1000, 2)
+        rect = QRectF(left, top, *rng.uniform(0, 400, 2))
+        assert layer.rows_in_rect(rect).tolist() == brute_rows_in_rect(layer, rect)
+
+
+def test_control_at_matches_brute_force(layer):
+    rng = np.random.default_rng(4)
+    for x, y in rng.uniform(0, 1000, (300, 2)):
+        expected = -1
+        for row in range(layer.count):
+            local = QPointF(x - layer.pos[row, 0], y - layer.pos[row, 1])
+            if layer.shapes[layer.shape[row]].containsPoint(local, Qt.OddEvenFill):
+                expected = int(layer.ids[row])  # later rows are drawn on top
+        assert layer.control_at(QPointF(x, y)) == expected
+
+
+def test_ids_survive_removal(layer):
+    ids = layer.ids[:layer.count].copy()
+    positions = layer.pos[:layer.count].copy()
+    layer.remove_controls(ids[:10])
+    assert np.array_equal(layer.pos[layer.rows(ids[10:])], positions[10:])
+    with pytest.raises(KeyError):
+        layer.rows(ids[:1])
+
+
+def test_click_selects_and_ctrl_click_adds(layer):
+    from PySide2.QtCore import QEvent
+    from PySide2.QtWidgets import QGraphicsSceneMouseEvent
+    first, second = [control_id for control_id in layer.ids[:layer.count].tolist()
+                     if layer.control_at(QPointF(*layer.pos[layer.rows([control_id])[0]])) == control_id][:2]
+
+    def click(control_id, modifiers=Qt.NoModifier):
+        event = QGraphicsSceneMouseEvent(QEvent.GraphicsSceneMousePress)
+        event.setButton(Qt.LeftButton)
+        event.setPos(QPointF(*layer.pos[layer.rows([control_id])[0]]))
+        event.setModifiers(modifiers)
+        layer.mousePressEvent(event)
+
+    click(first)
+    assert layer.selected_ids().tolist() == [first]
+    click(second, Qt.ControlModifier)
+    assert sorted(layer.selected_ids().tolist()) == sorted([first, second])
+    click(second)
+    assert layer.selected_ids().tolist() == [second]
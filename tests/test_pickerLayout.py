@@ -0,0 +1,80 @@
+import json
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def layout_file(tmp_path):
+    from pickerLayout import write_layout
+    rng = np.random.default_rng(5)
+    shapes = [np.array(((-5, -5), (5, -5), (0, 8)), dtype=np.float32),
+              np.array(((-40, -10), (40, -10), (40, 10), (-40, 10)), dtype=np.float32)]
+    count = 3000
+    controls = {
+        "positions": rng.uniform(-2000, 3000, (count, 2)).astype(np.float32),
+        "shape_ids": rng.integers(0, 2, count),
+        "colors": rng.integers(0, 2 ** 32, count, dtype=np.uint32),
+        "flags": rng.integers(0, 4, count, dtype=np.uint32),
+        "names": [f"ctrl_{i}_é" if i % 3 else "" for i in range(count)],
+        "ids": rng.permutation(100000)[:count].astype(np.uint32),
+    }
+    path = str(tmp_path / "layout.upk")
+    write_layout(path, shapes, cell_size=200.0, **controls)
+    return path, shapes, controls
+
+
+def test_round_trip(layout_file):
+    from pickerLayout import PickerLayout
+    path, shapes, controls = layout_file
+    with PickerLayout(path) as layout:
+        assert len(layout) == len(controls["ids"])
+        order = np.argsort(controls["ids"])
+        rows = np.argsort(layout.controls["id"])
+        stored = layout.controls[rows]
+        assert np.array_equal(stored["id"], controls["ids"][order])
+        assert np.array_equal(np.column_stack((stored["x"], stored["y"])), controls["positions"][order])
+        assert np.array_equal(stored["shape"], controls["shape_ids"][order])
+        assert np.array_equal(stored["color"], controls["colors"][order])
+        assert np.array_equal(stored["flags"], controls["flags"][order])
+        assert [layout.control_name(row) for row in rows.tolist()] == [controls["names"][i] for i in order]
+        for shape_id, points in enumerate(shapes):
+            assert np.array_equal(layout.shape_points(shape_id), points)
+
+
+def test_rows_in_rect_matches_full_filter(layout_file):
+    from pickerLayout import PickerLayout
+    path, shapes, controls = layout_file
+    rng = np.random.default_rng(6)
+    with PickerLayout(path) as layout:
+        table = np.array(layout.controls)
+        bounds = np.array([(points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max())
+                           for points in shapes])[table["shape"]]
+        for _ in range(100):
+            left, top = rng.uniform(-2500, 3000, 2)
+            right, bottom = left + rng.uniform(0, 900), top + rng.uniform(0, 900)
+            expected = np.flatnonzero((table["x"] + bounds[:, 2] >= left) & (table["x"] + bounds[:, 0] <= right)
+                                      & (table["y"] + bounds[:, 3] >= top) & (table["y"] + bounds[:, 1] <= bottom))
+            assert np.array_equal(np.sort(layout.rows_in_rect(left, top, right, bottom)), expected)
+
+
+def test_rejects_other_files(tmp_path):
+    from pickerLayout import LayoutError, PickerLayout
+    short = tmp_path / "short.upk"
+    short.write_bytes(b"UPKL")
+    wrong = tmp_path / "wrong.upk"
+    wrong.write_bytes(b"NOPE" + bytes(200))
+    for path in (short, wrong):
+        with pytest.raises(LayoutError):
+            PickerLayout(str(path))
+
+
+def test_convert_json_centres_shapes(tmp_path):
+    from pickerLayout import PickerLayout, convert_json
+    source = tmp_path / "polygons.json"
+    source.write_text(json.dumps({"polybar": [[(0, 32), (16, 0), (32, 32)], [(100, 100), (140, 100), (140, 120)]]}))
+    assert convert_json(str(source), str(tmp_path / "out.upk")) == 2
+    with PickerLayout(str(tmp_path / "out.upk")) as layout:
+        rows = np.argsort(layout.controls["id"])
+        stored = layout.controls[rows]
+        assert np.allclose(np.column_stack((stored["x"], stored["y"])), [(16, 16), (120, 110)])
+        assert np.allclose(layout.shape_points(int(stored["shape"][0])), [(-16, 16), (0, -16), (16, 16)])
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+from PySide2.QtCore import QEvent
+from PySide2.QtWidgets import QGraphicsSceneMouseEvent
+
+
+@pytest.fixture
+def scene(qapp):
+    from polygons import CustomGraphicsScene
+    return CustomGraphicsScene()
+
+
+def release(item):
+    item.mouseReleaseEvent(QGraphicsSceneMouseEvent(QEvent.GraphicsSceneMouseRelease))
+
+
+def test_programmatic_adds_are_not_recorded(scene):
+    count = scene.control_model().count
+    for i in range(50):
+        scene.add_star_polygon_item(i * 10.0, 0.0)
+    assert len(scene.journal) == 0
+    assert scene.model.count == count  # staged, not flushed per item
+    assert scene.control_model().count == count + 50
+
+
+def test_record_added_is_one_undo_step(scene):
+    items = [scene.add_star_polygon_item(i * 10.0, 0.0) for i in range(20)]
+    scene.record_added(items)
+    assert len(scene.journal) == 1
+    scene.journal.undo()
+    model = scene.control_model()
+    assert not any(item.control_id in model for item in items)
+    scene.journal.redo()
+    model = scene.control_model()
+    assert all(item.control_id in model for item in items)
+
+
+def test_separate_drags_are_separate_undo_steps(scene):
+    item = scene.add_star_polygon_item(0.0, 0.0)
+    scene.control_model()
+    for x in (10.0, 20.0):
+        item.setPos(x, 0.0)
+        release(item)
+    assert len(scene.journal) == 2
+    scene.journal.undo()
+    model = scene.control_model()
+    assert np.allclose(model.pos[model.rows([item.control_id])], [[10.0, 0.0]])
+
+
+@pytest.fixture
+def band_view(qapp, scene):
+    from polygons import CustomGraphicsView
+    for item in list(scene.selectedItems()):
+        item.setSelected(False)
+    view = CustomGraphicsView(scene)
+    view.resize(400, 400)
+    view.show()
+    view.centerOn(1000, 1100)
+    qapp.processEvents()
+    yield view
+    view.close()
+
+
+def band_select(view, scene_rect):
+    rect = view.mapFromScene(scene_rect).boundingRect()
+    view.band_origin = rect.topLeft()
+    view.update_rubber_band(rect.bottomRight())
+    selected = set(view.band_selection)
+    view.band_origin = None
+    return selected
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_rubber_band_contain_mode(band_view, buffered):
+    from PySide2.QtCore import QRectF, Qt
+    view = band_view
+    view.set_pick_buffer(buffered)
+    view.setRubberBandSelectionMode(Qt.ContainsItemShape)
+    star = view.pick_item(view.mapFromScene(1000, 1000))
+    assert star is not None
+    assert band_select(view, QRectF(940, 940, 60, 120)) == set()  # left half of the star only
+    assert band_select(view, QRectF(940, 940, 120, 120)) == {star}
+    view.setRubberBandSelectionMode(Qt.IntersectsItemShape)
+    assert band_select(view, QRectF(940, 940, 60, 120)) == {star}
+
+
+def render_item(item, direct=False, size=160):
+    from PySide2.QtGui import QImage, QPainter
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.translate(size // 2, size // 2)
+    if direct:
+        item.draw(painter)
+    else:
+        item.paint(painter, None)
+    painter.end()
+    return np.frombuffer(image.constBits(), dtype=np.uint8).reshape(size, size, 4).astype(int)
+
+
+def test_paint_uses_item_pen(qapp):
+    from PySide2.QtGui import QColor, QPen
+    from polygons import PolygonItems
+    item = PolygonItems()
+    item.setPen(QPen(QColor(255, 0, 0), 6))
+    tip = render_item(item)[80, 80 + 50 - 1]  # just inside the right spike, under the pen
+    blue, green, red = tip[:3]
+    assert red > 200 and blue < 60
+
+
+def test_edge_color_can_be_set(qapp):
+    from PySide2.QtGui import QColor
+    from polygons import PolygonItems
+    item = PolygonItems()
+    assert item.edge_color.alpha() == 0
+    item.edge_color = QColor("red")
+    assert item.edge_color == QColor("red")
+    item.set_hovered(True)
+    assert item.edge_color == QColor("green")
+
+
+def test_sprites_match_direct_drawing(qapp):
+    from PySide2.QtGui import QColor
+    from polygons import PolygonItems
+    PolygonItems.sprites.clear()
+    renders = PolygonItems.sprites.renders
+    items = [PolygonItems() for _ in range(3)]
+    items[1].set_hovered(True)
+    items[2].edge_color = QColor("red")
+    for item in items:
+        assert np.abs(render_item(item) - render_item(item, direct=True)).max() <= 2
+    render_item(PolygonItems())
+    assert PolygonItems.sprites.renders - renders == 3  # the plain stars share one sprite
+
+
+def test_rubber_band_drag_with_and_without_ctrl(band_view):
+    from PySide2.QtCore import QEvent, QPointF, Qt
+    from PySide2.QtGui import QMouseEvent
+    view = band_view
+    star = view.pick_item(view.mapFromScene(1000, 1000))
+
+    def drag(start, end, modifiers=Qt.NoModifier):
+        start, end = QPointF(view.mapFromScene(*start)), QPointF(view.mapFromScene(*end))
+        view.mousePressEvent(QMouseEvent(QEvent.MouseButtonPress, start, Qt.LeftButton, Qt.LeftButton, modifiers))
+        view.mouseMoveEvent(QMouseEvent(QEvent.MouseMove, end, Qt.NoButton, Qt.LeftButton, modifiers))
+        view.mouseReleaseEvent(QMouseEvent(QEvent.MouseButtonRelease, end, Qt.LeftButton, Qt.NoButton, modifiers))
+
+    drag((900, 900), (1100, 1100))
+    assert star.isSelected()
+    drag((1100, 1250), (1150, 1280), Qt.ControlModifier)  # empty band adds nothing, keeps the rest
+    assert star.isSelected()
+    drag((1100, 1250), (1150, 1280))
+    assert not star.isSelected()
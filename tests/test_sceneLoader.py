@@ -0,0 +1,129 @@
+import time
+import numpy as np
+from PySide2.QtWidgets import QGraphicsPolygonItem, QGraphicsScene
+
+
+def wait_for(condition, qapp, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def write_grid(path, count, x=0.0):
+    from pickerLayout import write_layout
+    square = np.array(((-5, -5), (5, -5), (5, 5), (-5, 5)), dtype=np.float32)
+    positions = np.stack((np.full(count, x), np.arange(count) * 20.0), axis=1)
+    write_layout(str(path), [square], positions, np.zeros(count), np.full(count, 0xFF0000FF, dtype=np.uint32))
+    return str(path)
+
+
+def make_loader(qapp):
+    from sceneLoader import SceneLoader
+    scene = QGraphicsScene()
+
+    def factory(polygon, x, y, color, flags, name, control_id):
+        item = QGraphicsPolygonItem(polygon)
+        item.setPos(x, y)
+        return item
+    return SceneLoader(scene, factory)
+
+
+def test_parse_layout_stops_when_asked(tmp_path):
+    from sceneLoader import parse_layout
+    path = write_grid(tmp_path / "grid.upk", 5000)
+    assert parse_layout(path, should_stop=lambda: True) is None
+    assert len(parse_layout(path, should_stop=lambda: False)) == 5000
+
+
+def test_cancel_does_not_wait_and_drops_queued_results(qapp, tmp_path):
+    loader = make_loader(qapp)
+    path = write_grid(tmp_path / "grid.upk", 200000)
+    loader.start(path)
+    parser = loader._parser
+    start = time.perf_counter()
+    loader.cancel()
+    assert time.perf_counter() - start < 0.05
+    assert not loader.is_loading()
+    parser.wait()
+    qapp.processEvents()
+    assert not loader.is_loading() and not loader.items and not loader.scene.items()
+
+
+def test_restart_ignores_superseded_parser(qapp, tmp_path):
+    loader = make_loader(qapp)
+    old = write_grid(tmp_path / "old.upk", 50, x=0.0)
+    new = write_grid(tmp_path / "new.upk", 30, x=500.0)
+    loader.start(old)
+    loader._parser.wait()  # its result is queued but not delivered yet
+    loader.start(new)
+    wait_for(lambda: not loader.is_loading(), qapp)
+    assert len(loader.scene.items()) == 30
+    assert all(item.x() == 500.0 for item in loader.scene.items())
+
+
+def test_scene_save_and_load_keep_control_ids(qapp, tmp_path):
+    from polygons import CustomGraphicsScene
+    source = CustomGraphicsScene()
+    for i in range(20):
+        source.add_star_polygon_item(60.0 * i, 0.0)
+    path = str(tmp_path / "scene.upk")
+    source.save_layout(path)
+    saved = source.control_model()
+    expected = {int(control_id): tuple(saved.pos[row]) for control_id, row in saved.row_of_id.items()}
+
+    target = CustomGraphicsScene()
+    loader = target.load_layout(path)
+    wait_for(lambda: not loader.is_loading(), qapp)
+    assert {item.control_id: (item.x(), item.y()) for item in loader.items} == expected
+    model = target.control_model()
+    assert all(control_id in model for control_id in expected)
+
+    # Into the scene that still has the saved controls: clashing ids get new, unused ones
+    loader = source.load_layout(path)
+    wait_for(lambda: not loader.is_loading(), qapp)
+    loaded = [item.control_id for item in loader.items]
+    assert not set(loaded) & set(expected) and len(set(loaded)) == len(loaded) == len(expected)
+    assert len(source.control_model()) == 2 * len(expected)
+
+
+def test_parse_layout_matches_the_table(tmp_path):
+    from pickerLayout import PickerLayout
+    from sceneLoader import CHECK_EVERY, parse_layout
+    path = write_grid(tmp_path / "grid.upk", 3 * CHECK_EVERY + 17)
+    parsed = parse_layout(path)
+    with PickerLayout(path) as layout:
+        table = np.array(layout.controls)
+        names = [layout.control_name(row) for row in range(len(layout))]
+    assert np.array_equal(parsed.x, table["x"]) and np.array_equal(parsed.y, table["y"])
+    assert np.array_equal(parsed.ids, table["id"]) and np.array_equal(parsed.shape, table["shape"])
+    assert np.array_equal(parsed.color, table["color"]) and parsed.names == names
+    stops = iter([False, False, True])
+    assert parse_layout(path, should_stop=lambda: next(stops)) is None  # stops mid-table
+
+
+def test_close_waits_for_cancelled_parsers(qapp, tmp_path):
+    loader = make_loader(qapp)
+    path = write_grid(tmp_path / "grid.upk", 200000)
+    loader.start(path)
+    first = loader._parser
+    loader.start(path)  # cancels the first parser without waiting
+    second = loader._parser
+    loader.close()
+    assert first.isFinished() and second.isFinished()
+    assert not loader.is_loading()
+
+
+def test_deleting_the_scene_stops_its_parser(qapp, tmp_path):
+    import gc
+    import shiboken2
+    from polygons import CustomGraphicsScene
+    path = write_grid(tmp_path / "grid.upk", 200000)
+    scene = CustomGraphicsScene()
+    scene.load_layout(path)
+    parser = scene.loader._parser
+    assert parser.isRunning()
+    del scene
+    gc.collect()  # a running QThread destroyed with the loader would abort the process
+    assert not shiboken2.isValid(parser)
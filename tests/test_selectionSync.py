@@ -0,0 +1,105 @@
+import pytest
+
+
+class FakeBridge:
+    def __init__(self):
+        self.calls = []
+        self.engine = set()
+
+    def set_selection(self, names):
+        self.calls.append(set(names))
+        self.engine = set(names)
+
+    def selected_controls(self):
+        return set(self.engine)
+
+
+@pytest.fixture
+def virtual_sync(virtual_scene):
+    from selectionSync import SelectionSync
+    scene, view = virtual_scene
+    sync = SelectionSync(scene, FakeBridge())
+    yield scene, sync
+    sync.close()
+
+
+def test_offscreen_selection_is_sent(qapp, virtual_sync):
+    scene, sync = virtual_sync
+    model = scene.model
+    hidden = [control_id for control_id in model.ids[:model.count].tolist()
+              if control_id not in scene.virtualizer.active][:5]
+    shown = list(scene.virtualizer.active)[:2]
+    scene.select_controls(hidden + shown)
+    qapp.processEvents()
+    expected = set(model.names[model.rows(hidden + shown)].tolist()) - {""}
+    assert sync.bridge.calls == [expected]
+
+
+def test_engine_selection_reaches_rows_without_items(qapp, virtual_sync):
+    scene, sync = virtual_sync
+    model = scene.model
+    names = {"ctrl_0", "ctrl_899"}  # one on screen, one far off
+    sync.engine_selection_changed(names)
+    qapp.processEvents()
+    assert set(model.names[model.rows(model.selected_ids())].tolist()) == names
+    assert sync.picker_selection() == names
+    assert sync.bridge.calls == []  # the echo is not sent back
+
+
+def test_items_follow_engine_selection(qapp):
+    from polygons import CustomGraphicsScene
+    from selectionSync import SelectionSync
+    scene = CustomGraphicsScene()
+    items = [scene.add_star_polygon_item(40.0 * i, 0.0) for i in range(10)]
+    for i, item in enumerate(items):
+        item.control_name = f"ctrl_{i}"
+    sync = SelectionSync(scene, FakeBridge())
+    sync.engine_selection_changed({"ctrl_2", "ctrl_7"})
+    assert {item.control_name for item in scene.selectedItems()} == {"ctrl_2", "ctrl_7"}
+    sync.engine_selection_changed({"ctrl_3"})
+    assert [item.control_name for item in scene.selectedItems()] == ["ctrl_3"]
+    items[5].setSelected(True)
+    qapp.processEvents()
+    assert sync.bridge.calls == [{"ctrl_3", "ctrl_5"}]
+    sync.close()
+
+
+@pytest.fixture
+def fake_unreal():
+    # src/fakeUnreal/unreal.py, loaded without putting it on sys.path for other tests
+    import importlib.util
+    import os
+    import selectionSync
+    path = os.path.join(os.path.dirname(selectionSync.__file__), "fakeUnreal", "unreal.py")
+    spec = importlib.util.spec_from_file_location("unreal", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_control_rig_gets_one_call_and_its_echo_is_ignored(qapp, virtual_scene, fake_unreal):
+    from selectionSync import ControlRigBridge, SelectionSync
+    scene, view = virtual_scene
+    model = scene.model
+    blueprint = fake_unreal.ControlRigBlueprint()
+    controller = blueprint.get_hierarchy_controller()
+    sync = SelectionSync(scene, ControlRigBridge(blueprint, fake_unreal))
+    try:
+        hidden = [control_id for control_id in model.ids[:model.count].tolist()
+                  if control_id not in scene.virtualizer.active][:20]
+        shown = list(scene.virtualizer.active)[:3]
+        scene.select_controls(hidden + shown)
+        qapp.processEvents()
+        expected = set(model.names[model.rows(hidden + shown)].tolist()) - {""}
+        assert [call[0] for call in controller.calls] == ["set_selection"]
+        assert {key.name for key in blueprint.hierarchy.selected} == expected
+        sync.poll_engine()  # the engine reports back what it was sent
+        qapp.processEvents()
+        assert sync.bridge.calls == 1 and len(controller.calls) == 1
+        controller.set_selection([sync.bridge.control_key("ctrl_5")])
+        sync.poll_engine()
+        qapp.processEvents()
+        assert set(model.names[model.rows(model.selected_ids())].tolist()) == {"ctrl_5"}
+        assert sync.bridge.calls == 1
+    finally:
+        sync.close()
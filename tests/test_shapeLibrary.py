@@ -0,0 +1,54 @@
+from math import cos, pi, sin
+import numpy as np
+import pytest
+
+
+def loop_star(num_points, radius):
+    # The per-point loop PolygonItems.update_polygon used before the library
+    points = []
+    for i in range(num_points * 2):
+        factor = 1.0 if i % 2 == 0 else 0.5
+        angle = (2 * pi * i) / (num_points * 2)
+        points.append((radius * factor * cos(angle), radius * factor * sin(angle)))
+    return np.array(points)
+
+
+@pytest.mark.parametrize("num_points, radius", [(3, 10), (5, 50), (12, 33.5)])
+def test_star_matches_loop(num_points, radius):
+    from shapeLibrary import star_points
+    assert np.allclose(star_points(num_points, radius), loop_star(num_points, radius))
+
+
+def test_regular_polygon_and_rounded_rect_bounds():
+    from shapeLibrary import regular_polygon_points, rounded_rect_points
+    hexagon = regular_polygon_points(6, 40)
+    assert np.allclose(np.hypot(hexagon[:, 0], hexagon[:, 1]), 40)
+    rect = rounded_rect_points(100, 60, 10, 4)
+    assert len(rect) == 4 * 5
+    assert np.allclose(rect.min(axis=0), (-50, -30)) and np.allclose(rect.max(axis=0), (50, 30))
+
+
+def test_outlines_are_memoized_and_read_only(qapp):
+    from shapeLibrary import ShapeLibrary, points_to_polygon, star_points
+    library = ShapeLibrary()
+    first = library.polygon("star", 5, 20)
+    assert library.polygon("star", 5, 20) is first
+    assert (library.hits, library.misses) == (1, 1)
+    assert first == points_to_polygon(star_points(5, 20))
+    with pytest.raises(ValueError):
+        library.points("star", 5, 20)[0, 0] = 1.0
+
+
+def test_lru_eviction(qapp):
+    from shapeLibrary import ShapeLibrary
+    library = ShapeLibrary(max_entries=2)
+    library.points("square", 10)
+    library.points("square", 20)
+    library.points("square", 10)  # most recent now
+    library.points("square", 30)
+    assert len(library) == 2
+    misses = library.misses
+    library.points("square", 10)
+    assert library.misses == misses
+    library.points("square", 20)
+    assert library.misses == misses + 1
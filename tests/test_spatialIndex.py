@@ -0,0 +1,83 @@
+import random
+import pytest
+from PySide2.QtCore import QPointF, QRectF
+
+
+class Item:
+    def __init__(self, z=0.0):
+        self.z = z
+
+    def zValue(self):
+        return self.z
+
+
+def random_rect(rng, extent=2000.0):
+    return QRectF(rng.uniform(-extent, extent), rng.uniform(-extent, extent), rng.uniform(0, 300), rng.uniform(0, 300))
+
+
+def intersects(a, b):
+    return a.left() <= b.right() and a.right() >= b.left() and a.top() <= b.bottom() and a.bottom() >= b.top()
+
+
+def contains(outer, inner):
+    return (inner.left() >= outer.left() and inner.right() <= outer.right()
+            and inner.top() >= outer.top() and inner.bottom() <= outer.bottom())
+
+
+@pytest.fixture
+def populated():
+    # An index after inserts, moves and removals, and the rects it should hold (in insertion order)
+    from spatialIndex import SpatialIndex
+    rng = random.Random(4)
+    index = SpatialIndex(cell_size=100.0)
+    rects = {}
+    for _ in range(600):
+        item = Item(rng.choice((0.0, 0.0, 1.0)))
+        rects[item] = random_rect(rng)
+        index.insert(item, rects[item])
+    for item in rng.sample(list(rects), 150):
+        rects[item] = random_rect(rng)
+        index.update(item, rects[item])
+    for item in rng.sample(list(rects), 100):
+        del rects[item]
+        index.remove(item)
+    return index, rects, rng
+
+
+def test_query_rect_matches_linear_scan(populated):
+    index, rects, rng = populated
+    assert len(index) == len(rects)
+    for _ in range(100):
+        query = QRectF(rng.uniform(-2200, 2000), rng.uniform(-2200, 2000), rng.uniform(0, 800), rng.uniform(0, 800))
+        assert set(index.query_rect(query)) == {item for item, rect in rects.items() if intersects(rect, query)}
+        assert set(index.query_rect(query, contained=True)) == {item for item, rect in rects.items()
+                                                                if contains(query, rect)}
+    everything = QRectF(-5000, -5000, 10000, 10000)
+    assert set(index.query_rect(everything)) == set(rects)
+
+
+def test_query_point_matches_linear_scan(populated):
+    index, rects, rng = populated
+    order = {item: position for position, item in enumerate(rects)}
+    for _ in range(300):
+        point = QPointF(rng.uniform(-2000, 2300), rng.uniform(-2000, 2300))
+        hits = [item for item in order if rects[item].left() <= point.x() <= rects[item].right()
+                and rects[item].top() <= point.y() <= rects[item].bottom()]
+        # Topmost first: higher z, then later insertion
+        expected = sorted(hits, key=lambda item: (item.zValue(), order[item]), reverse=True)
+        assert index.query_point(point) == expected
+
+
+def test_revision_follows_changes():
+    from spatialIndex import SpatialIndex
+    index = SpatialIndex()
+    item = Item()
+    revisions = [index.revision]
+    index.insert(item, QRectF(0, 0, 10, 10))
+    revisions.append(index.revision)
+    index.update(item, QRectF(500, 500, 10, 10))
+    revisions.append(index.revision)
+    assert index.query_rect(QRectF(0, 0, 20, 20)) == []
+    index.remove(item)
+    revisions.append(index.revision)
+    assert revisions == sorted(set(revisions)) and not index._cells
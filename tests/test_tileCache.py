@@ -0,0 +1,58 @@
+import numpy as np
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QColor, QImage, QPainter, QTransform
+
+
+def channels(image):
+    return np.frombuffer(image.constBits(), dtype=np.uint8).reshape(image.height(), image.width(), 4).astype(int)
+
+
+def test_lru_evicts_least_recently_used():
+    from tileCache import TileCache
+    cache = TileCache(tile_size=16, memory_budget=3 * 16 * 16 * 4)
+    assert cache.max_tiles == 3
+    for key in "abc":
+        cache.put(key, key)
+    assert cache.get("a") == "a"  # now the most recent
+    cache.put("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert len(cache) == 3 and cache.memory_used() == cache.memory_budget
+    assert (cache.hits, cache.misses) == (4, 1)
+
+
+def test_tiny_budget_keeps_one_tile():
+    from tileCache import TileCache
+    cache = TileCache(tile_size=256, memory_budget=1)
+    cache.put(1, "one")
+    cache.put(2, "two")
+    assert len(cache) == 1 and cache.get(2) == "two"
+
+
+def test_tiles_match_direct_rendering(qapp):
+    from PySide2.QtWidgets import QGraphicsScene
+    from tileCache import TiledBackground
+    scene = QGraphicsScene()
+    item = scene.addRect(10, 10, 60, 40, Qt.NoPen, QColor(200, 30, 30))
+    background = TiledBackground(tile_size=32)
+    background.set_background_color(QColor(0, 0, 80))
+    background.add_layer(item)
+    transform = QTransform.fromTranslate(5, 7)
+    tiled = QImage(100, 80, QImage.Format_RGB32)
+    painter = QPainter(tiled)
+    painter.setTransform(transform)  # as in QGraphicsView.drawBackground
+    background.draw(painter, tiled.rect(), transform)
+    painter.end()
+    assert len(background.cache) == len(range(-1, 3)) * len(range(-1, 3))
+    direct = QImage(100, 80, QImage.Format_RGB32)
+    direct.fill(QColor(0, 0, 80))
+    painter = QPainter(direct)
+    painter.fillRect(15, 17, 60, 40, QColor(200, 30, 30))
+    painter.end()
+    assert np.abs(channels(tiled) - channels(direct)).max() <= 1  # tile blits may round a channel
+    hits = background.cache.hits
+    painter = QPainter(tiled)
+    painter.setTransform(transform)
+    background.draw(painter, tiled.rect(), transform)
+    painter.end()
+    assert background.cache.hits == hits + len(background.cache)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def scene(qapp):
+    from polygons import CustomGraphicsScene
+    scene = CustomGraphicsScene()
+    for item in scene.items():
+        item.setSelected(True)
+    return scene
+
+
+def bounds(scene):
+    # Left and right of the selected outlines, from the model and from the items (whose
+    # rects also hold the pen, hence the looser tolerance)
+    model = scene.control_model()
+    rows = model.rows(scene.selected_control_ids())
+    items = sorted((item.sceneBoundingRect().left(), item.sceneBoundingRect().right()) for item in scene.selectedItems())
+    return model.bounds(rows)[:, [0, 2]], np.array(items)
+
+
+def test_mirror_about_picker_centre_keeps_bounds(scene):
+    from transformEngine import TransformEngine
+    model_before, items_before = bounds(scene)
+    TransformEngine(scene).mirror()
+    model_after, items_after = bounds(scene)
+    assert np.allclose(model_after, model_before)
+    assert np.allclose(items_after, items_before, atol=1.0)
+
+
+def test_mirror_reflects_bounds_and_outline(scene):
+    from transformEngine import TransformEngine
+    model_before, items_before = bounds(scene)
+    TransformEngine(scene).mirror(500.0)
+    model_after, items_after = bounds(scene)
+    assert np.allclose(model_after, 1000.0 - model_before[:, ::-1])
+    assert np.allclose(items_after, 1000.0 - items_before[:, ::-1], atol=1.0)
+
+
+def test_mirror_twice_restores_shapes(scene):
+    from transformEngine import TransformEngine
+    model = scene.control_model()
+    rows = model.rows(scene.selected_control_ids())
+    shapes = model.shape[rows].copy()
+    positions = model.pos[rows].copy()
+    engine = TransformEngine(scene)
+    engine.mirror(500.0)
+    engine.mirror(500.0)
+    assert np.array_equal(model.shape[rows], shapes)
+    assert np.allclose(model.pos[rows], positions)
+
+
+def test_mirror_without_selection_does_nothing(qapp):
+    from polygons import CustomGraphicsScene
+    from transformEngine import TransformEngine
+    scene = CustomGraphicsScene()
+    scene.clear_controls()
+    assert TransformEngine(scene).mirror() is None
+    scene.add_star_polygon_item(0.0, 0.0)
+    assert TransformEngine(scene).mirror(100.0) is None